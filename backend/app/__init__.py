@@ -1,13 +1,30 @@
 def create_app() -> 'CustomFastAPI':
+    from fastapi.responses import ORJSONResponse
+
+    from app.config import settings
     from app.custom_fastapi import CustomFastAPI
+    from app.external_services import init_external_services
     from app.handlers import init_handlers
     from app.services import init_services
     from app.routes import init_routes
+    from app.utils.app_utils import set_app
+    from app.utils.metrics import MetricsMiddleware
+    from app.utils.recycling import RecycleMiddleware, WorkerRecycler
 
-    app = CustomFastAPI()
+    # orjson renders every JSON response; execution bodies with results are assembled by the execution service.
+    app = CustomFastAPI(default_response_class=ORJSONResponse)
+    app.recycler = WorkerRecycler(settings.WEB_MAX_REQUESTS, settings.WEB_MAX_REQUESTS_JITTER, settings.WEB_MAX_MEMORY_MB)
+    # Only the production launcher restarts a recycled worker.
+    if app.recycler.enabled and not settings.DEV_MODE:
+        app.add_middleware(RecycleMiddleware, recycler=app.recycler)
+    if settings.METRICS_ENABLED:
+        app.add_middleware(MetricsMiddleware)
 
+    init_external_services(app)
     init_handlers(app)
     init_services(app)
     init_routes(app)
 
-    return app
\ No newline at end of file
+    set_app(app)
+
+    return app
@@ -1,12 +1,114 @@
+from typing import Literal, Optional
 from pydantic_settings import BaseSettings
 
 class Settings(BaseSettings):
     SECRET_KEY: str
     ALGORITHM: str
     ACCESS_TOKEN_EXPIRE_MINUTES: int
+    AUTH_PRINCIPAL_CACHE_SIZE: int = 10000
+    # Also how long a deactivated user's tokens keep working in processes that did not deactivate them.
+    AUTH_PRINCIPAL_CACHE_TTL_SECONDS: int = 60
+    # bcrypt cost; stored hashes with a different cost are rehashed on the next login.
+    PASSWORD_HASH_ROUNDS: int = 12
+    # Processes doing bcrypt work; 0 runs it on the default thread pool instead.
+    PASSWORD_HASH_WORKERS: int = 2
+    # Hashes in flight or queued before /auth requests are shed with a 503.
+    PASSWORD_HASH_QUEUE_LIMIT: int = 64
     GEMINI_API_KEY: str
     PORT: int = 8000
+    LOG_LEVEL: str = "INFO"
+    LOG_FORMAT: Literal["text", "json"] = "text"
+    # Format and write log records on a background thread instead of the caller's.
+    LOG_ASYNC: bool = True
+    # Longest rendered log argument or message; 0 disables truncation.
+    LOG_MAX_FIELD_CHARS: int = 2000
+    # Rotate app.log at this size (0 never rotates), keeping LOG_FILE_BACKUP_COUNT old files.
+    LOG_FILE_MAX_BYTES: int = 10485760
+    LOG_FILE_BACKUP_COUNT: int = 5
+    # Fraction of INFO and DEBUG records kept; warnings and errors are never dropped.
+    LOG_SAMPLE_RATE: float = 1.0
+    # Serves /metrics and times requests, nodes, Gemini calls and DB queries.
+    METRICS_ENABLED: bool = True
     DEV_MODE: bool = True
+    # Create and migrate the schema on startup even outside DEV_MODE; otherwise run `python migrate.py` once per deploy.
+    AUTO_MIGRATE: bool = False
+    # Production server processes; 0 starts one per CPU.
+    WEB_WORKERS: int = 0
+    # Recycle a production worker after this many requests (plus up to the jitter) or above this RSS; 0 disables.
+    WEB_MAX_REQUESTS: int = 0
+    WEB_MAX_REQUESTS_JITTER: int = 0
+    WEB_MAX_MEMORY_MB: int = 0
+    # How long a stopping worker waits for in-flight requests (SSE streams included) before closing them.
+    WEB_GRACEFUL_TIMEOUT_SECONDS: float = 30
+    DATABASE_URL: str = "sqlite:///./sql_app.db"
+    ASYNC_DATABASE_URL: Optional[str] = None
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT_SECONDS: float = 30
+    DB_POOL_RECYCLE_SECONDS: int = 1800
+    DB_POOL_PRE_PING: bool = False
+    SQLITE_PROFILE: Literal["default", "production"] = "default"
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000
+    SQLITE_MMAP_SIZE: int = 268435456
+    SQLITE_CACHE_SIZE: int = -65536  # negative values are KiB, i.e. 64 MiB
+    EXECUTION_WRITE_BEHIND: bool = False
+    WRITE_BEHIND_FLUSH_INTERVAL_MS: int = 20
+    WRITE_BEHIND_MAX_BATCH: int = 500
+    EXECUTION_MODE: Literal["async", "thread"] = "async"
+    EXECUTION_MAX_CONCURRENCY: int = 4
+    # Processes running CPU-bound node types; 0 runs them on threads instead.
+    NODE_PROCESS_WORKERS: int = 2
+    EXECUTION_BACKEND: Literal["background", "queue"] = "background"
+    EXECUTION_STREAM_POLL_SECONDS: float = 2.0
+    # Deadlines from the moment an execution starts running and for each node (a node's
+    # data.timeout_seconds overrides the latter); 0 disables.
+    EXECUTION_TIMEOUT_SECONDS: float = 600
+    NODE_TIMEOUT_SECONDS: float = 120
+    # How often running executions check the database for a cancellation made by another process.
+    EXECUTION_CANCEL_POLL_SECONDS: float = 1.0
+    WORKFLOW_PLAN_CACHE_SIZE: int = 1024
+    # Serialised GET /execution/{id} bodies kept for finished executions; 0 disables.
+    EXECUTION_RESPONSE_CACHE_SIZE: int = 1024
+    # Reuse node outputs of earlier COMPLETED runs whose fingerprints match, looking back this many runs.
+    # Gemini answers are only reused with GEMINI_CACHE_ENABLED or a node's explicit data.cache = true.
+    EXECUTION_INCREMENTAL: bool = True
+    EXECUTION_INCREMENTAL_LOOKBACK: int = 20
+    BATCH_MAX_ITEMS: int = 10000
+    BATCH_CONCURRENCY: int = 8
+    BATCH_WRITE_SIZE: int = 100
+    BATCH_WRITE_INTERVAL_MS: int = 500
+    # Node outputs larger than this (as JSON) are compressed into the blob store; 0 keeps all inline.
+    RESULT_INLINE_MAX_BYTES: int = 8192
+    RESULT_BLOB_DIR: str = "./result_blobs"
+    # "zstd" needs the optional zstandard package.
+    RESULT_BLOB_CODEC: Literal["gzip", "zstd"] = "gzip"
+    WORKER_CONCURRENCY: int = 8
+    WORKER_POLL_INTERVAL_SECONDS: float = 1.0
+    WORKER_LEASE_SECONDS: int = 60
+    WORKER_MAX_ATTEMPTS: int = 3
+    # Client-side quota; 0 disables the requests/minute or tokens/minute bucket.
+    GEMINI_REQUESTS_PER_MINUTE: int = 0
+    GEMINI_TOKENS_PER_MINUTE: int = 0
+    GEMINI_ESTIMATED_OUTPUT_TOKENS: int = 256
+    GEMINI_MAX_IN_FLIGHT: int = 16
+    GEMINI_MAX_RETRIES: int = 4
+    GEMINI_BACKOFF_BASE_SECONDS: float = 0.5
+    GEMINI_BACKOFF_MAX_SECONDS: float = 20.0
+    # Consecutive retryable failures before calls fail fast; 0 disables the breaker.
+    GEMINI_BREAKER_THRESHOLD: int = 5
+    GEMINI_BREAKER_RESET_SECONDS: float = 30.0
+    # Identical prompts in flight at the same time share one upstream call.
+    GEMINI_SINGLE_FLIGHT: bool = True
+    # Answer prompts with a local echo model instead of Gemini, for load tests; never enable in production.
+    GEMINI_STUB: bool = False
+    GEMINI_STUB_LATENCY_MS: float = 50
+    GEMINI_STUB_JITTER_MS: float = 0
+    GEMINI_STUB_ERROR_RATE: float = 0.0
+    # Answer repeated prompts from a cache; off by default, as a cached answer replaces a fresh non-deterministic sample.
+    GEMINI_CACHE_ENABLED: bool = False
+    GEMINI_CACHE_MAX_ENTRIES: int = 1024
+    GEMINI_CACHE_TTL_SECONDS: int = 3600
+    GEMINI_CACHE_PERSISTENT: bool = False
 
     class Config:
         env_file = ".env"
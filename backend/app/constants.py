@@ -3,4 +3,6 @@ from enum import Enum
 class NodeTypes(str, Enum):
     TEXT_INPUT = "text_input"
     GEMINI_PROMPT = "gemini_prompt" 
-    OUTPUT = "output"
\ No newline at end of file
+    OUTPUT = "output"
+    TEXT_TRANSFORM = "text_transform"
+    TEMPLATE = "template"
\ No newline at end of file
@@ -1,21 +1,30 @@
-from fastapi import FastAPI
+from typing import TYPE_CHECKING
 
-class CustomFastAPI(FastAPI):
-    def __init__(self, *args, **kwargs):
-        super().__init__(*args, **kwargs)
+from fastapi import FastAPI
 
-        from app.services.auth_service import AuthService
-        from app.services.workflow_service import WorkflowService
-        from app.services.execution_service import ExecutionService
+if TYPE_CHECKING:
+    from app.services.auth_service import AuthService
+    from app.services.workflow_service import WorkflowService
+    from app.services.execution_service import ExecutionService
+    from app.handlers.auth_handler import AuthHandler
+    from app.handlers.workflow_handler import WorkflowHandler
+    from app.handlers.execution_handler import ExecutionHandler
+    from app.external_services.gemini_client import GeminiClient
+    from app.utils.recycling import WorkerRecycler
 
-        from app.handlers.auth_handler import AuthHandler
-        from app.handlers.workflow_handler import WorkflowHandler
-        from app.handlers.execution_handler import ExecutionHandler
+class CustomFastAPI(FastAPI):
+    """
+    FastAPI application acting as the container for services, handlers and
+    external clients. They are attached once by create_app() and reused by
+    every request through get_app().
+    """
+    gemini_client: 'GeminiClient'
+    recycler: 'WorkerRecycler'
 
-        self.auth_service = AuthService()
-        self.workflow_service = WorkflowService()
-        self.execution_service = ExecutionService()
+    auth_handler: 'AuthHandler'
+    workflow_handler: 'WorkflowHandler'
+    execution_handler: 'ExecutionHandler'
 
-        self.auth_handler = AuthHandler()
-        self.workflow_handler = WorkflowHandler()
-        self.execution_handler = ExecutionHandler()
\ No newline at end of file
+    auth_service: 'AuthService'
+    workflow_service: 'WorkflowService'
+    execution_service: 'ExecutionService'
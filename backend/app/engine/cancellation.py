@@ -0,0 +1,140 @@
+import asyncio
+import threading
+import time
+from typing import Dict, List, Optional
+
+from sqlalchemy import select
+
+from app.models import models
+from app.models.models import ExecutionStatus
+from app.utils.database import SessionLocal
+from app.utils.exceptions import ExecutionCancelledError, ExecutionTimeoutError
+from app.utils.logger import logger
+
+class CancelScope:
+    """
+    Cancellation flag and deadline of one running execution. The thread
+    runner polls `check`; on the event loop, `arun` runs the work as a task
+    that `cancel` and the deadline cancel directly, so in-flight awaits
+    (Gemini calls, concurrency permits) are released straight away.
+    """
+    def __init__(self, execution_id: int, timeout_seconds: float = 0):
+        self.execution_id = execution_id
+        self.timeout_seconds = timeout_seconds
+        self.deadline = time.monotonic() + timeout_seconds if timeout_seconds > 0 else None
+        self._cancelled = threading.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._lock = threading.Lock()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled.is_set()
+
+    def remaining(self) -> Optional[float]:
+        return None if self.deadline is None else max(0.0, self.deadline - time.monotonic())
+
+    def cancel(self):
+        """Safe to call from any thread"""
+        self._cancelled.set()
+        with self._lock:
+            task = self._task
+        if task is not None and not task.done():
+            task.get_loop().call_soon_threadsafe(task.cancel)
+
+    def check(self):
+        """Raises once the execution is cancelled or past its deadline"""
+        if self.cancelled:
+            raise ExecutionCancelledError()
+        if self.deadline is not None and time.monotonic() >= self.deadline:
+            raise ExecutionTimeoutError(f"Execution exceeded its {self.timeout_seconds:g}s deadline")
+
+    async def arun(self, coro):
+        """Awaits `coro` as a task bound to this scope, turning cancellation and the deadline into errors"""
+        task = asyncio.ensure_future(coro)
+        with self._lock:
+            self._task = task
+        if self.cancelled:
+            task.cancel()
+        try:
+            async with asyncio.timeout(self.remaining()) as deadline:
+                return await task
+        except asyncio.CancelledError:
+            # Only this scope's cancellation becomes an error; anything else (shutdown) propagates.
+            if self.cancelled and not deadline.expired():
+                raise ExecutionCancelledError()
+            raise
+        except TimeoutError:
+            if deadline.expired():
+                raise ExecutionTimeoutError(f"Execution exceeded its {self.timeout_seconds:g}s deadline")
+            raise
+        finally:
+            with self._lock:
+                self._task = None
+
+class CancellationRegistry:
+    """
+    Scopes of the executions running in this process. A cancellation made
+    here takes effect at once; one made by another process (another API
+    worker, or the API while a queue worker runs the execution) is found by
+    a background thread that looks for CANCELLED rows among the registered
+    executions every `poll_seconds`.
+    """
+    def __init__(self, poll_seconds: float):
+        self.poll_seconds = poll_seconds
+        self._scopes: Dict[int, CancelScope] = {}
+        self._lock = threading.Lock()
+        self._watcher: Optional[threading.Thread] = None
+
+    def open(self, execution_id: int, timeout_seconds: float) -> CancelScope:
+        scope = CancelScope(execution_id, timeout_seconds)
+        with self._lock:
+            self._scopes[execution_id] = scope
+            if self.poll_seconds > 0 and (self._watcher is None or not self._watcher.is_alive()):
+                self._watcher = threading.Thread(target=self._watch, name="execution-cancel-watcher", daemon=True)
+                self._watcher.start()
+        return scope
+
+    def close(self, scope: CancelScope):
+        with self._lock:
+            if self._scopes.get(scope.execution_id) is scope:
+                del self._scopes[scope.execution_id]
+
+    def cancel(self, execution_id: int) -> bool:
+        """Cancels the execution if it runs in this process; returns whether it did"""
+        with self._lock:
+            scope = self._scopes.get(execution_id)
+        if scope is None:
+            return False
+        scope.cancel()
+        return True
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._scopes)
+
+    def _watch(self):
+        while True:
+            time.sleep(self.poll_seconds)
+            with self._lock:
+                if not self._scopes:
+                    # Exit while holding the lock so `open` starts a new watcher when needed.
+                    self._watcher = None
+                    return
+                execution_ids = [execution_id for execution_id, scope in self._scopes.items() if not scope.cancelled]
+            if not execution_ids:
+                continue
+            try:
+                for execution_id in self._cancelled_rows(execution_ids):
+                    logger.info("Execution %s was cancelled elsewhere; stopping it", execution_id, extra={"execution_id": execution_id})
+                    self.cancel(execution_id)
+            except Exception as e:
+                logger.error(f"Failed to check for cancelled executions: {e}")
+
+    def _cancelled_rows(self, execution_ids: List[int]) -> List[int]:
+        with SessionLocal() as db:
+            return list(db.scalars(
+                select(models.Execution.id).where(
+                    models.Execution.id.in_(execution_ids),
+                    models.Execution.status == ExecutionStatus.CANCELLED,
+                )
+            ))
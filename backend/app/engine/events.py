@@ -0,0 +1,69 @@
+import asyncio
+import json
+import threading
+from typing import Any, Dict, List, Optional, Set
+
+TERMINAL_EVENTS = {"execution_completed", "execution_failed", "execution_cancelled", "execution_timed_out"}
+
+class Subscription:
+    def __init__(self, loop: asyncio.AbstractEventLoop):
+        self.loop = loop
+        self.queue: "asyncio.Queue[Dict[str, Any]]" = asyncio.Queue()
+
+    def deliver(self, event: Dict[str, Any]):
+        try:
+            running_loop = asyncio.get_running_loop()
+        except RuntimeError:
+            running_loop = None
+        if running_loop is self.loop:
+            self.queue.put_nowait(event)
+        elif not self.loop.is_closed():
+            self.loop.call_soon_threadsafe(self.queue.put_nowait, event)
+
+class ExecutionEventBus:
+    """
+    In-process publish/subscribe of execution progress (node started/completed,
+    token chunks, final status). Events may be published from the event loop
+    or from runner threads. Events of running executions are kept so that a
+    subscriber arriving mid-run first receives what it missed.
+    """
+    def __init__(self):
+        self._subscribers: Dict[int, Set[Subscription]] = {}
+        self._history: Dict[int, List[Dict[str, Any]]] = {}
+        self._lock = threading.Lock()
+
+    def has_subscribers(self, execution_id: int) -> bool:
+        return bool(self._subscribers.get(execution_id))
+
+    def publish(self, execution_id: int, event_type: str, **payload):
+        event = {"event": event_type, "execution_id": execution_id, **payload}
+        with self._lock:
+            if event_type in TERMINAL_EVENTS:
+                self._history.pop(execution_id, None)
+            elif event_type != "token":
+                self._history.setdefault(execution_id, []).append(event)
+            subscribers = list(self._subscribers.get(execution_id, ()))
+        for subscription in subscribers:
+            subscription.deliver(event)
+
+    def subscribe(self, execution_id: int) -> Subscription:
+        subscription = Subscription(asyncio.get_running_loop())
+        with self._lock:
+            for event in self._history.get(execution_id, ()):
+                subscription.queue.put_nowait(event)
+            self._subscribers.setdefault(execution_id, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, execution_id: int, subscription: Subscription):
+        with self._lock:
+            subscribers = self._subscribers.get(execution_id)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._subscribers[execution_id]
+
+def format_sse(event: Optional[Dict[str, Any]]) -> str:
+    """Server-Sent Events framing; None becomes a keep-alive comment"""
+    if event is None:
+        return ": keep-alive\n\n"
+    return f"event: {event['event']}\ndata: {json.dumps(event, default=str)}\n\n"
@@ -0,0 +1,72 @@
+from typing import Any, Dict, List
+
+from app.utils.exceptions import InvalidWorkflowGraphError, MissingStartNodeError
+
+JOIN_SEPARATOR = "\n\n"
+
+class WorkflowGraph:
+    """
+    Directed acyclic view of a workflow's `nodes` and `edges` JSON.
+
+    Predecessors keep the order in which their edges were declared, which is
+    the order inputs are merged in at join nodes (see merge_inputs).
+    """
+    def __init__(self, nodes: List[Dict[str, Any]], edges: List[Dict[str, Any]]):
+        self.nodes: Dict[str, Dict[str, Any]] = {node.get('id'): node for node in nodes}
+        self.predecessors: Dict[str, List[str]] = {node_id: [] for node_id in self.nodes}
+        self.successors: Dict[str, List[str]] = {node_id: [] for node_id in self.nodes}
+
+        for edge in edges:
+            source, target = edge.get('source'), edge.get('target')
+            if source not in self.nodes or target not in self.nodes:
+                raise InvalidWorkflowGraphError(f"Edge {source} -> {target} references an unknown node")
+            if source in self.predecessors[target]:
+                continue
+            self.predecessors[target].append(source)
+            self.successors[source].append(target)
+
+        if not self.nodes:
+            raise MissingStartNodeError("Could not find a starting node.")
+        # With nodes present, having no start node means every node sits on a cycle,
+        # which _topological_order reports.
+        self.start_nodes = [node_id for node_id in self.nodes if not self.predecessors[node_id]]
+
+        self.order = self._topological_order()
+
+    def _topological_order(self) -> List[str]:
+        """Kahn's algorithm; raises when a cycle leaves nodes unvisited"""
+        in_degree = {node_id: len(preds) for node_id, preds in self.predecessors.items()}
+        ready = list(self.start_nodes)
+        order = []
+
+        while ready:
+            node_id = ready.pop(0)
+            order.append(node_id)
+            for successor in self.successors[node_id]:
+                in_degree[successor] -= 1
+                if in_degree[successor] == 0:
+                    ready.append(successor)
+
+        if len(order) != len(self.nodes):
+            cyclic = sorted(node_id for node_id, degree in in_degree.items() if degree > 0)
+            raise InvalidWorkflowGraphError(f"Workflow contains a cycle through nodes: {cyclic}")
+        return order
+
+def merge_inputs(graph: WorkflowGraph, node_id: str, results: Dict[str, Any]) -> Any:
+    """
+    Builds the input of a node from the outputs of its predecessors.
+
+    - no predecessors: None
+    - one predecessor: its output, unchanged
+    - several predecessors (a join): string outputs are concatenated in edge
+      declaration order separated by a blank line; if any output is not a
+      string, the outputs are passed on as a list in that same order
+    """
+    inputs = [results[source] for source in graph.predecessors[node_id]]
+    if not inputs:
+        return None
+    if len(inputs) == 1:
+        return inputs[0]
+    if all(isinstance(value, str) for value in inputs):
+        return JOIN_SEPARATOR.join(inputs)
+    return inputs
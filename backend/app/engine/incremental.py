@@ -0,0 +1,81 @@
+import hashlib
+import json
+from typing import Any, Dict, Optional, Set
+
+from app.engine.graph import WorkflowGraph
+from app.engine.plan import WorkflowPlan
+
+def shares_results(node: Dict[str, Any], cache_enabled: bool) -> bool:
+    """Whether a node accepts answers produced for someone else (the workflow and node cache switches)"""
+    return cache_enabled and (node.get('data') or {}).get('cache', True) is not False
+
+def reuses_answers(node: Dict[str, Any], cache_enabled: bool, reuse_impure: bool) -> bool:
+    """
+    Whether an impure node's earlier output may stand in for a new call: it
+    must accept shared answers, and either `reuse_impure` is set (the response
+    cache is on) or the node opts in with an explicit `data.cache = true`.
+    """
+    opted_in = (node.get('data') or {}).get('cache') is True
+    return shares_results(node, cache_enabled) and (reuse_impure or opted_in)
+
+def node_fingerprints(
+    plan: WorkflowPlan,
+    inputs: Optional[dict] = None,
+    salt: str = "",
+    pinned: Optional[Dict[str, Optional[str]]] = None,
+    reuse_impure: bool = False,
+) -> Dict[str, Optional[str]]:
+    """
+    Fingerprints every node from its type, its effective `data` (with this
+    execution's `inputs` overrides) and the fingerprints of its predecessors
+    in merge order, so equal fingerprints mean equal outputs. Pure nodes
+    always get one; impure ones (Gemini) only as reuses_answers allows.
+    Nodes without a fingerprint, and everything downstream of them, get None
+    and are never reused. `salt` covers what the data does not, like the
+    model name. `pinned` fixes the fingerprints of outputs taken over from
+    another execution to the ones recorded there, so whatever is derived
+    from them describes the outputs actually used, not the current data.
+    """
+    fingerprints: Dict[str, Optional[str]] = {}
+    for node_id in plan.graph.order:
+        if pinned and node_id in pinned:
+            fingerprints[node_id] = pinned[node_id]
+            continue
+        node = plan.graph.nodes[node_id]
+        spec = plan.specs.get(node_id)
+        upstream = [fingerprints[source] for source in plan.graph.predecessors[node_id]]
+        if spec is None or None in upstream or not (spec.pure or reuses_answers(node, plan.cache_enabled, reuse_impure)):
+            fingerprints[node_id] = None
+            continue
+
+        data = node.get('data') or {}
+        if inputs and node_id in inputs:
+            data = {**data, **inputs[node_id]}
+        payload = json.dumps(
+            {"type": spec.type, "data": data, "inputs": upstream, "salt": "" if spec.pure else salt},
+            sort_keys=True, separators=(",", ":"), default=str,
+        )
+        fingerprints[node_id] = hashlib.sha256(payload.encode("utf-8")).hexdigest()
+    return fingerprints
+
+def downstream_of(graph: WorkflowGraph, node_id: str) -> Set[str]:
+    """`node_id` and every node reachable from it"""
+    seen = {node_id}
+    stack = [node_id]
+    while stack:
+        for successor in graph.successors[stack.pop()]:
+            if successor not in seen:
+                seen.add(successor)
+                stack.append(successor)
+    return seen
+
+def select_reusable(graph: WorkflowGraph, candidates: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Keeps the candidates whose predecessors are all reused as well, so a
+    reused output never sits downstream of a freshly executed node.
+    """
+    reused: Dict[str, Any] = {}
+    for node_id in graph.order:
+        if node_id in candidates and all(source in reused for source in graph.predecessors[node_id]):
+            reused[node_id] = candidates[node_id]
+    return reused
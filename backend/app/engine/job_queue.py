@@ -0,0 +1,105 @@
+from datetime import datetime, timedelta
+from typing import List, Tuple
+
+from sqlalchemy import select, update
+
+from app.models import models
+from app.models.models import ExecutionStatus
+from app.utils.database import SessionLocal
+from app.utils.logger import logger
+
+class ExecutionQueue:
+    """
+    Job queue on top of the `executions` table. PENDING rows are jobs; a worker
+    claims one by flipping it to RUNNING with a conditional UPDATE, so two
+    workers can never both win the same row. Claimed rows carry a heartbeat
+    that lets stale claims from dead workers be recovered.
+    """
+    def claim(self, worker_id: str, limit: int) -> List[Tuple[int, int]]:
+        """Claims up to `limit` PENDING executions, oldest first. Returns (execution_id, workflow_id) pairs"""
+        if limit <= 0:
+            return []
+
+        db = SessionLocal()
+        try:
+            candidates = db.execute(
+                select(models.Execution.id, models.Execution.workflow_id)
+                .where(models.Execution.status == ExecutionStatus.PENDING)
+                .order_by(models.Execution.id)
+                .limit(limit)
+                .with_for_update(skip_locked=True)
+            ).all()
+
+            claimed = []
+            now = datetime.utcnow()
+            for execution_id, workflow_id in candidates:
+                result = db.execute(
+                    update(models.Execution)
+                    .where(models.Execution.id == execution_id, models.Execution.status == ExecutionStatus.PENDING)
+                    .values(
+                        status=ExecutionStatus.RUNNING,
+                        claimed_by=worker_id,
+                        heartbeat_at=now,
+                        attempts=models.Execution.attempts + 1,
+                        updated_at=now,
+                    )
+                )
+                if result.rowcount == 1:
+                    claimed.append((execution_id, workflow_id))
+            db.commit()
+            return claimed
+        finally:
+            db.close()
+
+    def heartbeat(self, worker_id: str, execution_ids: List[int]):
+        """Extends the lease on executions this worker is still running"""
+        if not execution_ids:
+            return
+
+        db = SessionLocal()
+        try:
+            db.execute(
+                update(models.Execution)
+                .where(
+                    models.Execution.id.in_(execution_ids),
+                    models.Execution.claimed_by == worker_id,
+                    models.Execution.status == ExecutionStatus.RUNNING,
+                )
+                .values(heartbeat_at=datetime.utcnow())
+            )
+            db.commit()
+        finally:
+            db.close()
+
+    def recover_stale(self, lease_seconds: int, max_attempts: int) -> int:
+        """
+        Returns RUNNING executions whose heartbeat is older than the lease to
+        PENDING, or marks them FAILED once they have used up `max_attempts`.
+        Rows started without a heartbeat (by the in-process background runner)
+        are judged by updated_at instead.
+        """
+        cutoff = datetime.utcnow() - timedelta(seconds=lease_seconds)
+        db = SessionLocal()
+        try:
+            stale = db.scalars(
+                select(models.Execution).where(
+                    models.Execution.status == ExecutionStatus.RUNNING,
+                    (models.Execution.heartbeat_at < cutoff)
+                    | ((models.Execution.heartbeat_at.is_(None)) & (models.Execution.updated_at < cutoff)),
+                )
+            ).all()
+
+            for execution in stale:
+                if execution.attempts < max_attempts:
+                    execution.status = ExecutionStatus.PENDING
+                    logger.warning(f"Requeueing execution {execution.id} abandoned by {execution.claimed_by}")
+                else:
+                    execution.status = ExecutionStatus.FAILED
+                    execution.results = {"error": f"Execution abandoned after {execution.attempts} attempts"}
+                    logger.error(f"Giving up on execution {execution.id} after {execution.attempts} attempts")
+                execution.claimed_by = None
+                execution.heartbeat_at = None
+            db.commit()
+            return len(stale)
+        finally:
+            db.close()
@@ -0,0 +1,96 @@
+import threading
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Dict, Optional, Set
+
+from app.utils.logger import logger
+
+class NodePool:
+    """
+    Runs CPU node types in a process pool of `workers`, or on threads when
+    `workers` is 0; created on first use.
+
+    A running node cannot be interrupted, so one abandoned past its deadline
+    (or cancelled) keeps its worker busy, and repeated timeouts would starve
+    the pool. Abandoning a node therefore retires its process pool: new nodes
+    go to a fresh one, and the old one's processes are killed once only
+    abandoned nodes are left in it. Threads cannot be killed; with 0 workers
+    an abandoned node still runs to the end.
+    """
+    def __init__(self, workers: int):
+        self.workers = workers
+        self._executor: Optional[Executor] = None
+        # Unfinished futures of the current and retired executors, and the abandoned ones among them.
+        self._running: Dict[Executor, Set[Future]] = {}
+        self._abandoned: Dict[Executor, Set[Future]] = {}
+        self._lock = threading.Lock()
+
+    def _current(self) -> Executor:
+        if self._executor is None:
+            if self.workers > 0:
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+            else:
+                self._executor = ThreadPoolExecutor(thread_name_prefix="workflow-cpu-node")
+            self._running[self._executor] = set()
+        return self._executor
+
+    def submit(self, fn, *args) -> Future:
+        with self._lock:
+            executor = self._current()
+            future = executor.submit(fn, *args)
+            self._running[executor].add(future)
+        future.add_done_callback(lambda done: self._finished(executor, done))
+        return future
+
+    def abandon(self, future: Future):
+        """Called when the caller stops waiting for `future`; a node still running retires its pool"""
+        if future.cancel() or future.done():
+            return
+        with self._lock:
+            executor = next((executor for executor, running in self._running.items() if future in running), None)
+            if not isinstance(executor, ProcessPoolExecutor):
+                return
+            if executor is self._executor:
+                logger.warning("Retiring the CPU node process pool, as a node is still running past its deadline")
+                self._executor = None
+            abandoned = self._abandoned.setdefault(executor, set())
+            abandoned.add(future)
+            idle = self._running[executor] <= abandoned
+        if idle:
+            self._kill(executor)
+
+    def _finished(self, executor: Executor, future: Future):
+        with self._lock:
+            running = self._running.get(executor)
+            if running is None:
+                return
+            running.discard(future)
+            abandoned = self._abandoned.get(executor)
+            if abandoned is None:
+                return
+            abandoned.discard(future)
+            idle = running <= abandoned
+        if idle:
+            self._kill(executor)
+
+    def _kill(self, executor: ProcessPoolExecutor):
+        with self._lock:
+            if self._running.pop(executor, None) is None:
+                return
+            self._abandoned.pop(executor, None)
+        # ProcessPoolExecutor has no public way to stop a busy worker.
+        processes = list((executor._processes or {}).values())
+        executor.shutdown(wait=False, cancel_futures=True)
+        for process in processes:
+            process.kill()
+
+    def close(self):
+        """Waits for the current pool's nodes and kills retired pools; called on shutdown"""
+        with self._lock:
+            executor, self._executor = self._executor, None
+            retired = [retired for retired in self._abandoned if retired is not executor]
+        for retired in retired:
+            self._kill(retired)
+        if executor is not None:
+            with self._lock:
+                self._running.pop(executor, None)
+            executor.shutdown(wait=True, cancel_futures=True)
@@ -0,0 +1,2 @@
+from app.engine.nodes.registry import CostClass, NodeContext, NodeRegistry, NodeSpec, node_registry, run_cpu_node
+from app.engine.nodes import builtin  # noqa: F401 - registers the built-in node types
@@ -0,0 +1,107 @@
+import re
+from string import Template
+from typing import Annotated, Any, List, Literal, Optional, Union
+
+from pydantic import BaseModel, ConfigDict, StringConstraints, model_validator
+
+from app.constants import NodeTypes
+from app.engine.nodes.registry import CostClass, NodeContext, NodeSpec, node_registry
+
+NonEmptyText = Annotated[str, StringConstraints(min_length=1)]
+TextOrTexts = Union[str, List[str]]
+
+def _text_input(ctx: NodeContext, input_data: Any) -> str:
+    return ctx.data.get('text', '')
+
+def _output(ctx: NodeContext, input_data: Any) -> Any:
+    return input_data
+
+def _gemini_prompt(ctx: NodeContext, prompt: str) -> str:
+    return ctx.gemini_client.generate_text(prompt, use_cache=ctx.use_cache, on_chunk=ctx.on_chunk, timeout=ctx.timeout)
+
+async def _agemini_prompt(ctx: NodeContext, prompt: str) -> str:
+    return await ctx.gemini_client.agenerate_text(prompt, use_cache=ctx.use_cache, on_chunk=ctx.on_chunk)
+
+class TextTransformConfig(BaseModel):
+    model_config = ConfigDict(extra="allow")
+
+    operation: Literal["upper", "lower", "strip", "collapse_whitespace", "regex_replace", "truncate"]
+    pattern: Optional[str] = None
+    replacement: str = ""
+    max_chars: Optional[int] = None
+
+    @model_validator(mode="after")
+    def check_operation_arguments(self):
+        if self.operation == "regex_replace":
+            if self.pattern is None:
+                raise ValueError("regex_replace needs a pattern")
+            try:
+                re.compile(self.pattern)
+            except re.error as e:
+                raise ValueError(f"invalid pattern: {e}")
+        if self.operation == "truncate" and (self.max_chars is None or self.max_chars < 0):
+            raise ValueError("truncate needs a non-negative max_chars")
+        return self
+
+def _transform(config: TextTransformConfig, text: str) -> str:
+    if config.operation == "upper":
+        return text.upper()
+    if config.operation == "lower":
+        return text.lower()
+    if config.operation == "strip":
+        return text.strip()
+    if config.operation == "collapse_whitespace":
+        return " ".join(text.split())
+    if config.operation == "regex_replace":
+        return re.sub(config.pattern, config.replacement, text)
+    return text[:config.max_chars]
+
+def _text_transform(ctx: NodeContext, input_data: TextOrTexts) -> TextOrTexts:
+    """Applies `data.operation` to the input, element-wise when a join produced a list"""
+    config = TextTransformConfig.model_validate(ctx.data)
+    if isinstance(input_data, list):
+        return [_transform(config, text) for text in input_data]
+    return _transform(config, input_data)
+
+class TemplateConfig(BaseModel):
+    model_config = ConfigDict(extra="allow")
+
+    template: str
+
+    @model_validator(mode="after")
+    def check_template(self):
+        if not Template(self.template).is_valid():
+            raise ValueError("template has an invalid $placeholder")
+        return self
+
+def _template(ctx: NodeContext, input_data: Optional[TextOrTexts]) -> str:
+    """
+    Renders `data.template` with string.Template: `$input` is the input (list
+    inputs joined by newlines, empty for a start node) and `$input_1`..`$input_n`
+    the items of a list input. Unknown placeholders are left as they are.
+    """
+    config = TemplateConfig.model_validate(ctx.data)
+    values = {"input": input_data or ""}
+    if isinstance(input_data, list):
+        values = {"input": "\n".join(input_data)}
+        values.update({f"input_{index}": text for index, text in enumerate(input_data, start=1)})
+    return Template(config.template).safe_substitute(values)
+
+node_registry.register(NodeSpec(
+    NodeTypes.TEXT_INPUT.value, execute=_text_input, output_type=str, pure=True, cost=CostClass.INLINE,
+))
+node_registry.register(NodeSpec(
+    NodeTypes.OUTPUT.value, execute=_output, pure=True, cost=CostClass.INLINE,
+))
+node_registry.register(NodeSpec(
+    NodeTypes.GEMINI_PROMPT.value, execute=_gemini_prompt, aexecute=_agemini_prompt,
+    input_type=NonEmptyText, output_type=str, pure=False, cost=CostClass.IO,
+))
+node_registry.register(NodeSpec(
+    NodeTypes.TEXT_TRANSFORM.value, execute=_text_transform, input_type=TextOrTexts, output_type=TextOrTexts,
+    config_model=TextTransformConfig, pure=True, cost=CostClass.CPU,
+))
+node_registry.register(NodeSpec(
+    NodeTypes.TEMPLATE.value, execute=_template, input_type=Optional[TextOrTexts], output_type=str,
+    config_model=TemplateConfig, pure=True, cost=CostClass.CPU,
+))
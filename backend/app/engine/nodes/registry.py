@@ -0,0 +1,130 @@
+import threading
+from enum import Enum
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Type
+
+from pydantic import BaseModel, TypeAdapter, ValidationError
+
+from app.utils.exceptions import InvalidNodeInputError, InvalidNodeOutputError
+
+class CostClass(str, Enum):
+    """How the engine schedules a node type"""
+    INLINE = "inline"  # trivial, runs directly on the runner
+    IO = "io"          # waits on the network; counts against EXECUTION_MAX_CONCURRENCY
+    CPU = "cpu"        # burns CPU; runs in the node process pool
+
+class NodeContext:
+    """
+    Everything an executor may use besides its input. CPU nodes run in another
+    process and only get `node_id` and `data`.
+    """
+    def __init__(
+        self,
+        node_id: str,
+        data: Dict[str, Any],
+        use_cache: bool = True,
+        on_chunk: Optional[Callable[[str], None]] = None,
+        gemini_client: Any = None,
+        timeout: Optional[float] = None,
+    ):
+        self.node_id = node_id
+        self.data = data
+        self.use_cache = use_cache
+        self.on_chunk = on_chunk
+        self.gemini_client = gemini_client
+        # Seconds the node may take; blocking executors pass it to their upstream calls.
+        self.timeout = timeout
+
+Execute = Callable[[NodeContext, Any], Any]
+AsyncExecute = Callable[[NodeContext, Any], Awaitable[Any]]
+
+class NodeSpec:
+    """
+    Declares a node type: its input and output types (anything pydantic can
+    validate; both are checked strictly around every run), an optional model
+    for the node's `data`, whether it is pure
+    (same data and input always give the same output), its cost class, and a
+    sync and/or async execute function taking (context, input).
+    """
+    def __init__(
+        self,
+        type: str,
+        execute: Optional[Execute] = None,
+        aexecute: Optional[AsyncExecute] = None,
+        input_type: Any = Any,
+        output_type: Any = Any,
+        config_model: Optional[Type[BaseModel]] = None,
+        pure: bool = False,
+        cost: CostClass = CostClass.INLINE,
+    ):
+        if execute is None and aexecute is None:
+            raise ValueError(f"Node type {type} needs an execute or aexecute function")
+        if cost == CostClass.CPU and execute is None:
+            raise ValueError(f"CPU node type {type} needs a sync execute function")
+        self.type = type
+        self.execute = execute
+        self.aexecute = aexecute
+        self.input_type = input_type
+        self.output_type = output_type
+        self.config_model = config_model
+        self.pure = pure
+        self.cost = cost
+        self._input_adapter = TypeAdapter(input_type) if input_type is not Any else None
+        self._output_adapter = TypeAdapter(output_type) if output_type is not Any else None
+
+    def validate_input(self, node_id: str, input_data: Any) -> Any:
+        if self._input_adapter is None:
+            return input_data
+        try:
+            return self._input_adapter.validate_python(input_data, strict=True)
+        except ValidationError as e:
+            reason = e.errors()[0]["msg"]
+            raise InvalidNodeInputError(f"Input for {self.type} node {node_id} is invalid ({reason}). Got: {input_data!r}")
+
+    def validate_output(self, node_id: str, output: Any) -> Any:
+        if self._output_adapter is None:
+            return output
+        try:
+            return self._output_adapter.validate_python(output, strict=True)
+        except ValidationError as e:
+            reason = e.errors()[0]["msg"]
+            raise InvalidNodeOutputError(f"Output of {self.type} node {node_id} is invalid ({reason}). Got: {output!r}")
+
+    def validate_config(self, data: Dict[str, Any]) -> Optional[str]:
+        """Returns a description of what is wrong with a node's data, or None"""
+        if self.config_model is None:
+            return None
+        try:
+            self.config_model.model_validate(data)
+        except ValidationError as e:
+            return "; ".join(f"{'.'.join(map(str, error['loc'])) or 'data'}: {error['msg']}" for error in e.errors())
+        return None
+
+class NodeRegistry:
+    def __init__(self):
+        self._specs: Dict[str, NodeSpec] = {}
+        self._lock = threading.Lock()
+
+    def register(self, spec: NodeSpec) -> NodeSpec:
+        with self._lock:
+            if spec.type in self._specs:
+                raise ValueError(f"Node type {spec.type} is already registered")
+            self._specs[spec.type] = spec
+        return spec
+
+    def get(self, node_type: Optional[str]) -> Optional[NodeSpec]:
+        return self._specs.get(node_type)
+
+    def types(self) -> List[str]:
+        return sorted(self._specs)
+
+    def __contains__(self, node_type: object) -> bool:
+        return node_type in self._specs
+
+node_registry = NodeRegistry()
+
+def run_cpu_node(node_type: str, node_id: str, data: Dict[str, Any], input_data: Any) -> Any:
+    """Entry point of CPU nodes in the process pool; the child resolves the type from its own registry"""
+    import app.engine.nodes  # noqa: F401 - registers the built-in node types in the child process
+
+    spec = node_registry.get(node_type)
+    return spec.execute(NodeContext(node_id, data), input_data)
@@ -0,0 +1,124 @@
+import asyncio
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from app.engine.cancellation import CancelScope
+from app.engine.graph import WorkflowGraph, merge_inputs
+
+NodeExecutor = Callable[[Dict[str, Any], Any], Any]
+
+# How often the thread runner looks at its CancelScope while nodes are running.
+SCOPE_POLL_SECONDS = 0.1
+
+def _initial_state(graph: WorkflowGraph, completed: Optional[Dict[str, Any]]) -> Tuple[Dict[str, Any], Dict[str, int], List[str]]:
+    # `completed` must be closed under predecessors (see engine.incremental.select_reusable),
+    # so a completed node never waits on one that still has to run.
+    results: Dict[str, Any] = dict(completed or {})
+    pending_inputs = {
+        node_id: sum(1 for source in preds if source not in results)
+        for node_id, preds in graph.predecessors.items()
+        if node_id not in results
+    }
+    ready = [node_id for node_id in graph.order if node_id in pending_inputs and pending_inputs[node_id] == 0]
+    return results, pending_inputs, ready
+
+def run_graph(
+    graph: WorkflowGraph,
+    execute_node: NodeExecutor,
+    max_concurrency: int = 1,
+    completed: Optional[Dict[str, Any]] = None,
+    scope: Optional[CancelScope] = None,
+) -> Dict[str, Any]:
+    """
+    Runs every node once its predecessors have finished. Independent branches
+    run concurrently on up to `max_concurrency` threads, so wall-clock time
+    follows the critical path rather than the sum of node latencies.
+    Outputs in `completed` are taken as already produced and those nodes are
+    not executed again.
+
+    The first node failure cancels nodes that have not started yet and is
+    re-raised to the caller. So does the cancellation or deadline of `scope`,
+    without waiting for nodes still running: threads cannot be interrupted,
+    so those finish in the background (bounded by their node deadline) and
+    their results are dropped.
+    """
+    results, pending_inputs, start = _initial_state(graph, completed)
+    ready = deque(start)
+    running = {}
+    abandoned = False
+
+    pool = ThreadPoolExecutor(max_workers=max(1, max_concurrency), thread_name_prefix="workflow-node")
+    try:
+        while ready or running:
+            while ready:
+                node_id = ready.popleft()
+                node_input = merge_inputs(graph, node_id, results)
+                future = pool.submit(execute_node, graph.nodes[node_id], node_input)
+                running[future] = node_id
+
+            if scope is None:
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+            else:
+                done, _ = wait(running, timeout=SCOPE_POLL_SECONDS, return_when=FIRST_COMPLETED)
+                try:
+                    scope.check()
+                except Exception:
+                    abandoned = True
+                    raise
+            for future in done:
+                node_id = running.pop(future)
+                results[node_id] = future.result()
+                for successor in graph.successors[node_id]:
+                    pending_inputs[successor] -= 1
+                    if pending_inputs[successor] == 0:
+                        ready.append(successor)
+    finally:
+        pool.shutdown(wait=not abandoned, cancel_futures=True)
+
+    return results
+
+AsyncNodeExecutor = Callable[[Dict[str, Any], Any], Awaitable[Any]]
+
+async def arun_graph(
+    graph: WorkflowGraph,
+    execute_node: AsyncNodeExecutor,
+    max_concurrency: int = 1,
+    throttled: Optional[Callable[[str], bool]] = None,
+    completed: Optional[Dict[str, Any]] = None,
+) -> Dict[str, Any]:
+    """
+    Event-loop counterpart of run_graph: nodes are tasks and at most
+    `max_concurrency` of them execute at once, without holding a thread each.
+    When `throttled` is given, only nodes it returns True for take a slot;
+    the others (trivial nodes, or CPU nodes bounded by their own pool) start
+    as soon as their inputs are ready. `completed` works as in run_graph.
+    """
+    results, pending_inputs, start = _initial_state(graph, completed)
+    semaphore = asyncio.Semaphore(max(1, max_concurrency))
+
+    async def run_node(node_id: str):
+        node_input = merge_inputs(graph, node_id, results)
+        if throttled is not None and not throttled(node_id):
+            return node_id, await execute_node(graph.nodes[node_id], node_input)
+        async with semaphore:
+            return node_id, await execute_node(graph.nodes[node_id], node_input)
+
+    running = {asyncio.create_task(run_node(node_id)) for node_id in start}
+    try:
+        while running:
+            done, running = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                node_id, result = task.result()
+                results[node_id] = result
+                for successor in graph.successors[node_id]:
+                    pending_inputs[successor] -= 1
+                    if pending_inputs[successor] == 0:
+                        running.add(asyncio.create_task(run_node(successor)))
+    finally:
+        for task in running:
+            task.cancel()
+        if running:
+            await asyncio.gather(*running, return_exceptions=True)
+
+    return results
@@ -0,0 +1,65 @@
+import asyncio
+import os
+import socket
+import time
+from typing import Dict
+
+from app.config import settings
+from app.engine.job_queue import ExecutionQueue
+from app.utils.app_utils import get_app
+from app.utils.logger import logger
+
+class ExecutionWorker:
+    """
+    Claims PENDING executions from the database queue and runs up to
+    `concurrency` of them at a time on this process's event loop.
+    """
+    def __init__(self, concurrency: int, poll_interval: float):
+        self.concurrency = concurrency
+        self.poll_interval = poll_interval
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}"
+        self.queue = ExecutionQueue()
+        self.running: Dict[int, asyncio.Task] = {}
+        self._stopping = asyncio.Event()
+
+    def stop(self):
+        self._stopping.set()
+
+    async def run(self):
+        logger.info(f"Worker {self.worker_id} started with concurrency {self.concurrency}")
+        lease_interval = settings.WORKER_LEASE_SECONDS / 3
+        last_maintenance = 0.0
+
+        while not self._stopping.is_set():
+            if time.monotonic() - last_maintenance >= lease_interval:
+                await asyncio.to_thread(self.queue.heartbeat, self.worker_id, list(self.running))
+                await asyncio.to_thread(self.queue.recover_stale, settings.WORKER_LEASE_SECONDS, settings.WORKER_MAX_ATTEMPTS)
+                last_maintenance = time.monotonic()
+
+            free_slots = self.concurrency - len(self.running)
+            claimed = await asyncio.to_thread(self.queue.claim, self.worker_id, free_slots)
+            for execution_id, workflow_id in claimed:
+                task = asyncio.create_task(self._execute(workflow_id, execution_id))
+                self.running[execution_id] = task
+
+            # A full batch means more work is probably waiting; poll again right away.
+            if not claimed or len(claimed) < free_slots:
+                try:
+                    await asyncio.wait_for(self._stopping.wait(), timeout=self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+
+        if self.running:
+            logger.info(f"Worker {self.worker_id} draining {len(self.running)} running executions")
+            await asyncio.gather(*self.running.values(), return_exceptions=True)
+        logger.info(f"Worker {self.worker_id} stopped")
+
+    async def _execute(self, workflow_id: int, execution_id: int):
+        handler = get_app().execution_handler
+        try:
+            if settings.EXECUTION_MODE == "async":
+                await handler.arun_workflow(workflow_id, execution_id)
+            else:
+                await asyncio.to_thread(handler.run_workflow, workflow_id, execution_id)
+        finally:
+            self.running.pop(execution_id, None)
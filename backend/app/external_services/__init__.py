@@ -0,0 +1,19 @@
+from app.custom_fastapi import CustomFastAPI
+
+def init_external_services(app: CustomFastAPI):
+    """Initiate external clients in the app state"""
+    from app.config import settings
+    from app.external_services.gemini_client import GeminiClient
+
+    model = None
+    if settings.GEMINI_STUB:
+        from app.external_services.stub_model import StubGenerativeModel
+        from app.utils.logger import logger
+
+        logger.warning("GEMINI_STUB is enabled: prompts are answered by a local stub model, not Gemini")
+        model = StubGenerativeModel(
+            latency_ms=settings.GEMINI_STUB_LATENCY_MS,
+            jitter_ms=settings.GEMINI_STUB_JITTER_MS,
+            error_rate=settings.GEMINI_STUB_ERROR_RATE,
+        )
+    app.gemini_client = GeminiClient(model=model)
@@ -1,23 +1,203 @@
+import asyncio
+import time
+from typing import Any, Callable, Optional
 import google.generativeai as genai
 from app.config import settings
+from app.external_services.request_governor import RequestGovernor
+from app.external_services.response_cache import ResponseCache, cache_key
+from app.external_services.single_flight import SingleFlight
 from app.utils.logger import logger
+from app.utils.metrics import GEMINI_CACHE_HITS, GEMINI_CALL_SECONDS, GEMINI_TOKENS
 
 class GeminiClient:
-    def __init__(self):
+    model_name = 'gemini-2.0-flash-exp'
+
+    def __init__(self, model: Any = None, governor: Optional[RequestGovernor] = None):
+        """`model` replaces the real GenerativeModel, e.g. with a StubGenerativeModel in tests"""
+        self.generation_config = {}
+        self.cache = ResponseCache(
+            max_entries=settings.GEMINI_CACHE_MAX_ENTRIES,
+            ttl_seconds=settings.GEMINI_CACHE_TTL_SECONDS,
+            persistent=settings.GEMINI_CACHE_PERSISTENT,
+        ) if settings.GEMINI_CACHE_ENABLED else None
+        self.single_flight = SingleFlight() if settings.GEMINI_SINGLE_FLIGHT else None
+        self.governor = governor or RequestGovernor(
+            requests_per_minute=settings.GEMINI_REQUESTS_PER_MINUTE,
+            tokens_per_minute=settings.GEMINI_TOKENS_PER_MINUTE,
+            max_in_flight=settings.GEMINI_MAX_IN_FLIGHT,
+            max_retries=settings.GEMINI_MAX_RETRIES,
+            backoff_base_seconds=settings.GEMINI_BACKOFF_BASE_SECONDS,
+            backoff_max_seconds=settings.GEMINI_BACKOFF_MAX_SECONDS,
+            breaker_threshold=settings.GEMINI_BREAKER_THRESHOLD,
+            breaker_reset_seconds=settings.GEMINI_BREAKER_RESET_SECONDS,
+        )
+
+        if model is not None:
+            self.model = model
+            return
         try:
             genai.configure(api_key=settings.GEMINI_API_KEY)
-            self.model = genai.GenerativeModel('gemini-2.0-flash-exp')
+            self.model = genai.GenerativeModel(self.model_name, generation_config=self.generation_config)
             logger.info("Gemini client configured successfully.")
         except Exception as e:
             logger.error(f"Failed to configure Gemini client: {e}")
             self.model = None
 
-    def generate_text(self, prompt: str) -> str:
+    def _cache_key(self, prompt: str) -> str:
+        return cache_key(self.model_name, prompt, self.generation_config)
+
+    def _estimate_tokens(self, prompt: str) -> int:
+        # Roughly four characters per token, plus the expected size of the answer.
+        return len(prompt) // 4 + settings.GEMINI_ESTIMATED_OUTPUT_TOKENS
+
+    def _used_tokens(self, response) -> Optional[int]:
+        usage = getattr(response, 'usage_metadata', None)
+        return getattr(usage, 'total_token_count', None) or None
+
+    def _settle(self, estimated_tokens: int, response):
+        used_tokens = self._used_tokens(response)
+        if used_tokens is not None:
+            GEMINI_TOKENS.observe(used_tokens)
+        self.governor.settle_tokens(estimated_tokens, used_tokens)
+
+    def generate_text(
+        self,
+        prompt: str,
+        use_cache: bool = True,
+        on_chunk: Optional[Callable[[str], None]] = None,
+        timeout: Optional[float] = None,
+    ) -> str:
+        """
+        Returns the model's full response. With `on_chunk`, the response is
+        streamed (generate_content(stream=True)) and each text chunk is passed
+        to the callback as it arrives.
+
+        With `use_cache` the caller accepts a shared answer: it may come from
+        the response cache, or from an identical request already in flight
+        (single-flight), in which case `on_chunk` gets the whole text once.
+
+        `timeout` bounds the whole call, retries included, since a blocked
+        thread cannot be cancelled any other way.
+        """
         if not self.model:
             raise ConnectionError("Gemini client is not configured.")
+
+        key = self._cache_key(prompt) if use_cache else None
+        if key and self.cache is not None:
+            cached = self.cache.get(key)
+            if cached is not None:
+                GEMINI_CACHE_HITS.inc()
+                if on_chunk:
+                    on_chunk(cached)
+                return cached
+
+        if key and self.single_flight is not None:
+            text, shared = self.single_flight.do(key, lambda: self._fetch(prompt, key, on_chunk, timeout), timeout=timeout)
+            if shared and on_chunk:
+                on_chunk(text)
+            return text
+        return self._fetch(prompt, key, on_chunk, timeout)
+
+    def _fetch(self, prompt: str, key: Optional[str], on_chunk: Optional[Callable[[str], None]], timeout: Optional[float] = None) -> str:
+        estimated_tokens = self._estimate_tokens(prompt)
+        streamed = []
+        deadline = time.monotonic() + timeout if timeout else None
+
+        def request_options() -> dict:
+            return {} if deadline is None else {"request_options": {"timeout": max(0.001, deadline - time.monotonic())}}
+
+        def can_retry() -> bool:
+            return not streamed and (deadline is None or time.monotonic() < deadline)
+
+        def call():
+            if on_chunk:
+                response = self.model.generate_content(prompt, stream=True, **request_options())
+                chunks = []
+                for chunk in response:
+                    chunks.append(chunk.text)
+                    streamed.append(True)
+                    on_chunk(chunk.text)
+                return "".join(chunks), response
+            response = self.model.generate_content(prompt, **request_options())
+            return response.text, response
+
+        start = time.perf_counter()
         try:
-            response = self.model.generate_content(prompt)
-            return response.text
+            # Once chunks have reached the listener a retry would repeat them, so only retry before that.
+            text, response = self.governor.call(call, estimated_tokens, can_retry=can_retry, deadline=deadline)
         except Exception as e:
+            GEMINI_CALL_SECONDS.labels("error").observe(time.perf_counter() - start)
             logger.error(f"Error during Gemini API call: {e}")
-            raise
\ No newline at end of file
+            raise
+        GEMINI_CALL_SECONDS.labels("ok").observe(time.perf_counter() - start)
+        self._settle(estimated_tokens, response)
+
+        if key and self.cache is not None:
+            self.cache.set(key, self.model_name, text)
+        return text
+
+    async def agenerate_text(self, prompt: str, use_cache: bool = True, on_chunk: Optional[Callable[[str], None]] = None) -> str:
+        """Non-blocking variant of generate_text for the async execution path"""
+        if not self.model:
+            raise ConnectionError("Gemini client is not configured.")
+
+        key = self._cache_key(prompt) if use_cache else None
+        if key and self.cache is not None:
+            cached = await self._cache_call(self.cache.get, key)
+            if cached is not None:
+                GEMINI_CACHE_HITS.inc()
+                if on_chunk:
+                    on_chunk(cached)
+                return cached
+
+        if key and self.single_flight is not None:
+            text, shared = await self.single_flight.ado(key, lambda: self._afetch(prompt, key, on_chunk))
+            if shared and on_chunk:
+                on_chunk(text)
+            return text
+        return await self._afetch(prompt, key, on_chunk)
+
+    async def _afetch(self, prompt: str, key: Optional[str], on_chunk: Optional[Callable[[str], None]]) -> str:
+        estimated_tokens = self._estimate_tokens(prompt)
+        streamed = []
+
+        async def call():
+            if on_chunk:
+                response = await self.model.generate_content_async(prompt, stream=True)
+                chunks = []
+                async for chunk in response:
+                    chunks.append(chunk.text)
+                    streamed.append(True)
+                    on_chunk(chunk.text)
+                return "".join(chunks), response
+            response = await self.model.generate_content_async(prompt)
+            return response.text, response
+
+        start = time.perf_counter()
+        try:
+            text, response = await self.governor.acall(call, estimated_tokens, can_retry=lambda: not streamed)
+        except Exception as e:
+            GEMINI_CALL_SECONDS.labels("error").observe(time.perf_counter() - start)
+            logger.error(f"Error during Gemini API call: {e}")
+            raise
+        GEMINI_CALL_SECONDS.labels("ok").observe(time.perf_counter() - start)
+        self._settle(estimated_tokens, response)
+
+        if key and self.cache is not None:
+            await self._cache_call(self.cache.set, key, self.model_name, text)
+        return text
+
+    async def _cache_call(self, fn, *args):
+        # The persistent tier does blocking database I/O; keep it off the event loop.
+        if self.cache.persistent:
+            return await asyncio.to_thread(fn, *args)
+        return fn(*args)
+
+    def governor_stats(self) -> dict:
+        return self.governor.stats()
+
+    def cache_stats(self) -> dict:
+        stats = {"enabled": False} if self.cache is None else {"enabled": True, **self.cache.stats()}
+        if self.single_flight is not None:
+            stats["single_flight"] = self.single_flight.stats()
+        return stats
@@ -0,0 +1,371 @@
+import asyncio
+import random
+import threading
+import time
+from collections import deque
+from typing import Awaitable, Callable, Optional, TypeVar
+
+from google.api_core import exceptions as google_exceptions
+
+from app.utils.exceptions import UpstreamUnavailableError
+from app.utils.logger import logger
+
+T = TypeVar("T")
+
+RETRYABLE_ERRORS = (
+    google_exceptions.ResourceExhausted,
+    google_exceptions.TooManyRequests,
+    google_exceptions.ServiceUnavailable,
+    google_exceptions.InternalServerError,
+    google_exceptions.DeadlineExceeded,
+    google_exceptions.GatewayTimeout,
+    ConnectionError,
+    TimeoutError,
+)
+
+def is_retryable(error: Exception) -> bool:
+    return isinstance(error, RETRYABLE_ERRORS)
+
+class TokenBucket:
+    """
+    Refills at `per_minute / 60` per second up to `capacity`. Callers reserve
+    what they need up front, going into debt if the bucket is short, and wait
+    for the returned delay; this keeps the long-run rate at the limit while
+    serving waiters in arrival order.
+    """
+    def __init__(self, per_minute: float, capacity: Optional[float] = None):
+        self.rate = per_minute / 60
+        self.capacity = capacity if capacity is not None else max(1.0, per_minute / 6)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def reserve(self, amount: float) -> float:
+        """Takes `amount` and returns how many seconds to wait before using it"""
+        with self._lock:
+            self._refill(time.monotonic())
+            self.tokens -= amount
+            return max(0.0, -self.tokens / self.rate)
+
+    def refund(self, amount: float):
+        with self._lock:
+            self._refill(time.monotonic())
+            self.tokens = min(self.capacity, self.tokens + amount)
+
+class _Waiter:
+    def __init__(self, wake: Callable[[], None]):
+        self.wake = wake
+        self.handed = False
+
+class InFlightLimiter:
+    """
+    Caps concurrent calls across threads and event loops alike (the thread
+    and async runners share one client). Slots are handed to waiters first
+    come, first served.
+    """
+    def __init__(self, limit: int):
+        self.limit = max(1, limit)
+        self.in_flight = 0
+        self._waiters: "deque[_Waiter]" = deque()
+        self._lock = threading.Lock()
+
+    def _try_acquire(self) -> bool:
+        if self.in_flight < self.limit and not self._waiters:
+            self.in_flight += 1
+            return True
+        return False
+
+    def acquire(self, timeout: Optional[float] = None):
+        """Blocks for a slot; raises TimeoutError if none is handed over within `timeout` seconds"""
+        with self._lock:
+            if self._try_acquire():
+                return
+            event = threading.Event()
+            waiter = _Waiter(event.set)
+            self._waiters.append(waiter)
+        if event.wait(timeout):
+            return
+        with self._lock:
+            handed = waiter.handed
+            if not handed:
+                self._waiters.remove(waiter)
+        if not handed:
+            raise TimeoutError(f"No Gemini call slot freed up within {timeout:g}s")
+
+    async def aacquire(self):
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+
+        def resolve():
+            if not future.done():
+                future.set_result(None)
+
+        with self._lock:
+            if self._try_acquire():
+                return
+            waiter = _Waiter(lambda: loop.call_soon_threadsafe(resolve))
+            self._waiters.append(waiter)
+        try:
+            await future
+        except asyncio.CancelledError:
+            with self._lock:
+                handed = waiter.handed
+                if not handed:
+                    self._waiters.remove(waiter)
+            if handed:
+                self.release()
+            raise
+
+    def release(self):
+        with self._lock:
+            if self._waiters:
+                waiter = self._waiters.popleft()
+                waiter.handed = True
+            else:
+                self.in_flight -= 1
+                return
+        waiter.wake()
+
+class CircuitBreaker:
+    """
+    Opens after `threshold` consecutive retryable failures and fails calls
+    fast for `reset_seconds`; then lets a single trial call through and closes
+    again if it succeeds. A trial that ends without an outcome (cancelled)
+    hands the slot to the next call.
+    """
+    CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+    def __init__(self, threshold: int, reset_seconds: float):
+        self.threshold = threshold
+        self.reset_seconds = reset_seconds
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    def before_call(self) -> bool:
+        """Raises while open; returns whether this call is the half-open trial"""
+        if self.threshold <= 0:
+            return False
+        with self._lock:
+            if self.state == self.OPEN and time.monotonic() - self.opened_at >= self.reset_seconds:
+                self.state = self.HALF_OPEN
+                self._trial_in_flight = False
+            if self.state == self.OPEN or (self.state == self.HALF_OPEN and self._trial_in_flight):
+                raise UpstreamUnavailableError()
+            if self.state == self.HALF_OPEN:
+                self._trial_in_flight = True
+                return True
+            return False
+
+    def release_trial(self):
+        with self._lock:
+            if self.state == self.HALF_OPEN:
+                self._trial_in_flight = False
+
+    def record_success(self):
+        with self._lock:
+            self.state = self.CLOSED
+            self.failures = 0
+            self._trial_in_flight = False
+
+    def record_failure(self) -> bool:
+        """Returns whether the breaker is now open"""
+        with self._lock:
+            self.failures += 1
+            self._trial_in_flight = False
+            if self.state == self.HALF_OPEN or (self.threshold > 0 and self.failures >= self.threshold):
+                if self.state != self.OPEN:
+                    logger.warning(f"Gemini circuit breaker opened after {self.failures} consecutive failures")
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+            return self.state == self.OPEN
+
+class RequestGovernor:
+    """
+    Wraps upstream calls with request/minute and token/minute buckets (a limit
+    of 0 disables that bucket), a cap on in-flight calls, retries with
+    exponential backoff and full jitter on retryable errors, and a circuit
+    breaker. Works the same for blocking and async calls. A failure that
+    opens the breaker (including a failed half-open trial) is not retried:
+    the retry could only be rejected, so the upstream error is raised at once.
+    """
+    def __init__(
+        self,
+        requests_per_minute: int = 0,
+        tokens_per_minute: int = 0,
+        max_in_flight: int = 16,
+        max_retries: int = 4,
+        backoff_base_seconds: float = 0.5,
+        backoff_max_seconds: float = 20.0,
+        breaker_threshold: int = 5,
+        breaker_reset_seconds: float = 30.0,
+    ):
+        self.requests = TokenBucket(requests_per_minute) if requests_per_minute > 0 else None
+        self.tokens = TokenBucket(tokens_per_minute) if tokens_per_minute > 0 else None
+        self.limiter = InFlightLimiter(max_in_flight)
+        self.breaker = CircuitBreaker(breaker_threshold, breaker_reset_seconds)
+        self.max_retries = max_retries
+        self.backoff_base_seconds = backoff_base_seconds
+        self.backoff_max_seconds = backoff_max_seconds
+        self.calls = 0
+        self.retries = 0
+        self.failures = 0
+        self.throttled_seconds = 0.0
+        # Guards the counters above, which calls on any thread update.
+        self._lock = threading.Lock()
+
+    def _rate_delay(self, estimated_tokens: int) -> float:
+        delay = 0.0
+        if self.requests is not None:
+            delay = max(delay, self.requests.reserve(1))
+        if self.tokens is not None:
+            delay = max(delay, self.tokens.reserve(estimated_tokens))
+        with self._lock:
+            self.throttled_seconds += delay
+        return delay
+
+    def _cancel_reservation(self, estimated_tokens: int, delay: float):
+        """Returns what _rate_delay took for a call that will not be made"""
+        if self.requests is not None:
+            self.requests.refund(1)
+        if self.tokens is not None:
+            self.tokens.refund(estimated_tokens)
+        with self._lock:
+            self.throttled_seconds -= delay
+
+    def _backoff(self, attempt: int) -> float:
+        return random.uniform(0, min(self.backoff_max_seconds, self.backoff_base_seconds * 2 ** attempt))
+
+    def _should_retry(
+        self,
+        error: Exception,
+        attempt: int,
+        can_retry: Optional[Callable[[], bool]],
+        backoff: float = 0.0,
+        deadline: Optional[float] = None,
+    ) -> bool:
+        """Records the outcome with the breaker and decides whether to try again after `backoff` seconds"""
+        if not is_retryable(error):
+            # The provider answered; the request itself was bad.
+            self.breaker.record_success()
+            return False
+        if self.breaker.record_failure():
+            return False
+        if attempt >= self.max_retries or (can_retry is not None and not can_retry()):
+            return False
+        if deadline is not None and time.monotonic() + backoff >= deadline:
+            return False
+        with self._lock:
+            self.retries += 1
+        logger.warning(f"Retryable Gemini error (attempt {attempt + 1}/{self.max_retries + 1}): {error}")
+        return True
+
+    def settle_tokens(self, estimated_tokens: int, used_tokens: Optional[int]):
+        """Corrects the token bucket once the real usage of a call is known"""
+        if self.tokens is None or used_tokens is None:
+            return
+        if used_tokens < estimated_tokens:
+            self.tokens.refund(estimated_tokens - used_tokens)
+        elif used_tokens > estimated_tokens:
+            self.tokens.reserve(used_tokens - estimated_tokens)
+
+    def call(
+        self,
+        fn: Callable[[], T],
+        estimated_tokens: int = 0,
+        can_retry: Optional[Callable[[], bool]] = None,
+        deadline: Optional[float] = None,
+    ) -> T:
+        """
+        Runs a blocking upstream call under the governor; `can_retry` may veto
+        retries (e.g. after streaming began). A blocked thread cannot be
+        cancelled, so waits are bounded by `deadline` (a time.monotonic()
+        instant) instead: a quota or slot wait that would pass it raises
+        TimeoutError at once, and a retry whose backoff would pass it is not
+        attempted, the last error being raised.
+        """
+        attempt = 0
+        while True:
+            trial = self.breaker.before_call()
+            settled = False
+            try:
+                delay = self._rate_delay(estimated_tokens)
+                if deadline is not None and delay >= deadline - time.monotonic():
+                    self._cancel_reservation(estimated_tokens, delay)
+                    raise TimeoutError(f"Waiting {delay:.1f}s for the Gemini quota would pass the call's deadline")
+                if delay:
+                    time.sleep(delay)
+                self.limiter.acquire(None if deadline is None else max(0.0, deadline - time.monotonic()))
+                with self._lock:
+                    self.calls += 1
+                try:
+                    result = fn()
+                except Exception as e:
+                    with self._lock:
+                        self.failures += 1
+                    settled = True
+                    backoff = self._backoff(attempt)
+                    if not self._should_retry(e, attempt, can_retry, backoff, deadline):
+                        raise
+                else:
+                    settled = True
+                    self.breaker.record_success()
+                    return result
+                finally:
+                    self.limiter.release()
+            finally:
+                # Cancelled (or failed before reaching upstream): neither a success nor a failure.
+                if trial and not settled:
+                    self.breaker.release_trial()
+            time.sleep(backoff)
+            attempt += 1
+
+    async def acall(self, fn: Callable[[], Awaitable[T]], estimated_tokens: int = 0, can_retry: Optional[Callable[[], bool]] = None) -> T:
+        """Async counterpart of call; waiting never blocks the event loop"""
+        attempt = 0
+        while True:
+            trial = self.breaker.before_call()
+            settled = False
+            try:
+                delay = self._rate_delay(estimated_tokens)
+                if delay:
+                    await asyncio.sleep(delay)
+                await self.limiter.aacquire()
+                with self._lock:
+                    self.calls += 1
+                try:
+                    result = await fn()
+                except Exception as e:
+                    with self._lock:
+                        self.failures += 1
+                    settled = True
+                    if not self._should_retry(e, attempt, can_retry):
+                        raise
+                else:
+                    settled = True
+                    self.breaker.record_success()
+                    return result
+                finally:
+                    self.limiter.release()
+            finally:
+                if trial and not settled:
+                    self.breaker.release_trial()
+            await asyncio.sleep(self._backoff(attempt))
+            attempt += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            counters = {"calls": self.calls, "retries": self.retries, "failures": self.failures}
+            throttled_seconds = self.throttled_seconds
+        return {
+            **counters,
+            "in_flight": self.limiter.in_flight,
+            "breaker": self.breaker.state,
+            "throttled_seconds": round(throttled_seconds, 3),
+        }
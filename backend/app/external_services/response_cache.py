@@ -0,0 +1,112 @@
+import hashlib
+import json
+import threading
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional
+
+from cachetools import TTLCache
+
+from app.utils.logger import logger
+
+def cache_key(model_name: str, prompt: str, params: Optional[Dict[str, Any]] = None) -> str:
+    """Stable hash of everything that determines a model response"""
+    payload = json.dumps({"model": model_name, "prompt": prompt, "params": params or {}}, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+class ResponseCache:
+    """
+    Two-tier cache for model responses: a bounded in-memory TTL cache in
+    front of an optional table in the application database shared by all
+    processes. Runner threads and the event loop share one instance, so the
+    memory tier and the counters are guarded by one lock.
+    """
+    def __init__(self, max_entries: int, ttl_seconds: float, persistent: bool = False):
+        self.memory: TTLCache = TTLCache(maxsize=max(1, max_entries), ttl=ttl_seconds)
+        self.ttl_seconds = ttl_seconds
+        self.persistent = persistent
+        self.hits = 0
+        self.persistent_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self._lock = threading.Lock()
+
+    def _remember(self, key: str, value: str):
+        # Caller holds the lock.
+        self.expirations += len(self.memory.expire())
+        if key not in self.memory and len(self.memory) >= self.memory.maxsize:
+            self.evictions += 1
+        self.memory[key] = value
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            self.expirations += len(self.memory.expire())
+            value = self.memory.get(key)
+            if value is not None:
+                self.hits += 1
+                return value
+
+        if self.persistent:
+            value = self._load(key)
+            if value is not None:
+                with self._lock:
+                    self.persistent_hits += 1
+                    self._remember(key, value)
+                return value
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def set(self, key: str, model_name: str, value: str):
+        with self._lock:
+            self._remember(key, value)
+        if self.persistent:
+            self._store(key, model_name, value)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.persistent_hits + self.misses
+            return {
+                "entries": len(self.memory),
+                "max_entries": self.memory.maxsize,
+                "hits": self.hits,
+                "persistent_hits": self.persistent_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "hit_ratio": (self.hits + self.persistent_hits) / lookups if lookups else 0.0,
+            }
+
+    def _load(self, key: str) -> Optional[str]:
+        from app.models import models
+        from app.utils.database import SessionLocal
+
+        db = SessionLocal()
+        try:
+            entry = db.get(models.CachedResponse, key)
+            if entry is None:
+                return None
+            if entry.created_at < datetime.utcnow() - timedelta(seconds=self.ttl_seconds):
+                db.delete(entry)
+                db.commit()
+                return None
+            return entry.response
+        except Exception as e:
+            logger.warning(f"Response cache lookup failed: {e}")
+            return None
+        finally:
+            db.close()
+
+    def _store(self, key: str, model_name: str, value: str):
+        from app.models import models
+        from app.utils.database import SessionLocal
+
+        db = SessionLocal()
+        try:
+            db.merge(models.CachedResponse(key=key, model=model_name, response=value, created_at=datetime.utcnow()))
+            db.commit()
+        except Exception as e:
+            logger.warning(f"Response cache write failed: {e}")
+        finally:
+            db.close()
@@ -0,0 +1,106 @@
+import asyncio
+import threading
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple, TypeVar
+
+T = TypeVar("T")
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+class _Flight:
+    def __init__(self, task: "asyncio.Task[Any]"):
+        self.task = task
+        self.waiters = 0
+
+class SingleFlight:
+    """
+    Collapses concurrent calls with the same key into one: the first caller
+    runs the function and the others wait for it and share its result or
+    exception. Blocking calls are grouped across threads, coroutines per event
+    loop. Nothing is kept once a call finishes; that is the cache's job.
+    """
+    def __init__(self):
+        self._calls: Dict[str, _Call] = {}
+        self._flights: Dict[Tuple[int, str], _Flight] = {}
+        self._lock = threading.Lock()
+        self.leaders = 0
+        self.shared = 0
+
+    def do(self, key: str, fn: Callable[[], T], timeout: Optional[float] = None) -> Tuple[T, bool]:
+        """
+        Returns (result, shared); `shared` is True when another caller's call
+        was reused. A caller that joins waits at most `timeout` seconds (its
+        own deadline; the leader's may be longer) and then raises TimeoutError,
+        leaving the call to the others.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self.leaders += 1
+            else:
+                self.shared += 1
+
+        if not leader:
+            if not call.done.wait(timeout):
+                raise TimeoutError(f"Identical call still in flight after {timeout:g}s")
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result, False
+
+    async def ado(self, key: str, fn: Callable[[], Awaitable[T]]) -> Tuple[T, bool]:
+        """
+        Async counterpart of do. The upstream call runs as its own task, so a
+        cancelled waiter (even the first one) does not cancel it for the rest;
+        it is only cancelled once every waiter has gone, which frees its
+        concurrency permit.
+        """
+        task_key = (id(asyncio.get_running_loop()), key)
+        with self._lock:
+            flight = self._flights.get(task_key)
+            shared = flight is not None
+            if shared:
+                self.shared += 1
+            else:
+                flight = self._flights[task_key] = _Flight(asyncio.ensure_future(fn()))
+                self.leaders += 1
+                flight.task.add_done_callback(lambda finished: self._forget(task_key, finished))
+            flight.waiters += 1
+        try:
+            return await asyncio.shield(flight.task), shared
+        finally:
+            with self._lock:
+                flight.waiters -= 1
+                abandoned = flight.waiters == 0 and not flight.task.done()
+                if abandoned and self._flights.get(task_key) is flight:
+                    # Later callers start a fresh call rather than joining one being cancelled.
+                    del self._flights[task_key]
+            if abandoned:
+                flight.task.cancel()
+
+    def _forget(self, task_key: Tuple[int, str], task: "asyncio.Task[Any]"):
+        with self._lock:
+            flight = self._flights.get(task_key)
+            if flight is not None and flight.task is task:
+                del self._flights[task_key]
+        if not task.cancelled():
+            # Mark the exception retrieved even if every waiter went away.
+            task.exception()
+
+    def stats(self) -> dict:
+        return {"leaders": self.leaders, "shared": self.shared}
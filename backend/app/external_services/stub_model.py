@@ -0,0 +1,65 @@
+import asyncio
+import random
+import time
+from typing import List, Optional
+
+from google.api_core import exceptions as google_exceptions
+
+class _Usage:
+    def __init__(self, total_token_count: int):
+        self.total_token_count = total_token_count
+
+class StubResponse:
+    def __init__(self, text: str, chunks: Optional[List[str]] = None):
+        self.text = text
+        self.chunks = chunks or [text]
+        self.usage_metadata = _Usage(max(1, len(text) // 4))
+
+    def __iter__(self):
+        return iter(StubResponse(chunk) for chunk in self.chunks)
+
+    def __aiter__(self):
+        return self._achunks()
+
+    async def _achunks(self):
+        for chunk in self.chunks:
+            yield StubResponse(chunk)
+
+class StubGenerativeModel:
+    """
+    Local stand-in for genai.GenerativeModel for tests and benchmarks. Echoes
+    the prompt after `latency_ms` (plus up to `jitter_ms`), and fails a
+    fraction `error_rate` of calls with the provider's 429 error. Like the real
+    client, blocking calls honour `request_options={"timeout": ...}`.
+    """
+    def __init__(self, latency_ms: float = 50, jitter_ms: float = 0, error_rate: float = 0.0, chunk_count: int = 3, seed: Optional[int] = None):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.chunk_count = max(1, chunk_count)
+        self.calls = 0
+        self._random = random.Random(seed)
+
+    def _latency(self) -> float:
+        return (self.latency_ms + self._random.uniform(0, self.jitter_ms)) / 1000
+
+    def _respond(self, prompt: str) -> StubResponse:
+        self.calls += 1
+        if self.error_rate and self._random.random() < self.error_rate:
+            raise google_exceptions.ResourceExhausted("Stub model: quota exceeded")
+        text = f"echo: {prompt}"
+        size = max(1, -(-len(text) // self.chunk_count))
+        return StubResponse(text, [text[start:start + size] for start in range(0, len(text), size)])
+
+    def generate_content(self, prompt: str, stream: bool = False, request_options: Optional[dict] = None, **kwargs) -> StubResponse:
+        latency = self._latency()
+        timeout = (request_options or {}).get("timeout")
+        if timeout is not None and timeout < latency:
+            time.sleep(timeout)
+            raise google_exceptions.DeadlineExceeded("Stub model: request timed out")
+        time.sleep(latency)
+        return self._respond(prompt)
+
+    async def generate_content_async(self, prompt: str, stream: bool = False, **kwargs) -> StubResponse:
+        await asyncio.sleep(self._latency())
+        return self._respond(prompt)
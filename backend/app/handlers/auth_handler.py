@@ -1,17 +1,52 @@
-from sqlalchemy.orm import Session
+from typing import Optional
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.config import settings
 from app.models import schemas, models
-from app.utils.auth import get_password_hash
+from app.utils.auth import invalidate_principal
+from app.utils.logger import logger
+from app.utils.password_hasher import PasswordHasher
 
 class AuthHandler:
-    def get_user_by_email(self, db: Session, email: str):
-        return db.query(models.User).filter(models.User.email == email).first()
+    def __init__(self):
+        self.password_hasher = PasswordHasher(
+            rounds=settings.PASSWORD_HASH_ROUNDS,
+            workers=settings.PASSWORD_HASH_WORKERS,
+            queue_limit=settings.PASSWORD_HASH_QUEUE_LIMIT,
+        )
 
-    def create_user(self, db: Session, user: schemas.UserCreate):
-        hashed_password = get_password_hash(user.password)
+    def close(self):
+        self.password_hasher.close()
+
+    async def get_user_by_email(self, db: AsyncSession, email: str):
+        return await db.scalar(select(models.User).where(models.User.email == email))
+
+    async def authenticate_user(self, db: AsyncSession, email: str, password: str) -> Optional[models.User]:
+        """
+        Returns the user when the password matches. Hashes made with older
+        parameters (e.g. a lower PASSWORD_HASH_ROUNDS) are upgraded in place.
+        """
+        user = await self.get_user_by_email(db, email)
+        if not user:
+            return None
+
+        valid, new_hash = await self.password_hasher.verify_and_update(password, user.hashed_password)
+        if not valid:
+            return None
+        if new_hash:
+            user.hashed_password = new_hash
+            await db.commit()
+            invalidate_principal(user.email)
+            logger.info(f"Rehashed password for user {user.id} with current parameters")
+        return user
+
+    async def create_user(self, db: AsyncSession, user: schemas.UserCreate):
+        hashed_password = await self.password_hasher.hash(user.password)
         db_user = models.User(email=user.email, hashed_password=hashed_password)
         db.add(db_user)
         
-        db.commit()
-        db.refresh(db_user)
-        return db_user
\ No newline at end of file
+        await db.commit()
+        await db.refresh(db_user)
+        invalidate_principal(db_user.email)
+        return db_user
@@ -1,126 +1,994 @@
+import asyncio
+import json
+import time
+from contextlib import asynccontextmanager, contextmanager
+from concurrent.futures import Future
+from functools import partial
+from typing import Any, Dict, List, Optional, Tuple
+from sqlalchemy import Text, insert, select, type_coerce, update
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from datetime import datetime
 
-from app.models import models
-from app.models.models import ExecutionStatus
+from app.models import models, schemas
+from app.models.models import TERMINAL_EXECUTION_STATUSES, ExecutionStatus
+from app.config import settings
 from app.constants import NodeTypes
-from app.external_services.gemini_client import GeminiClient
-from app.utils.database import get_db
-from app.utils.exceptions import MissingStartNodeError, InvalidNodeInputError
+from app.engine.cancellation import CancellationRegistry, CancelScope
+from app.engine.events import TERMINAL_EVENTS, ExecutionEventBus
+from app.engine.incremental import downstream_of, node_fingerprints, select_reusable, shares_results
+from app.engine.node_pool import NodePool
+from app.engine.nodes import CostClass, NodeContext, NodeSpec, node_registry, run_cpu_node
+from app.engine.plan import WorkflowPlan, WorkflowPlanCache, compile_workflow
+from app.engine.runner import arun_graph, run_graph
+from app.utils.app_utils import get_app
+from app.utils.database import AsyncSessionLocal, SessionLocal
+from app.utils.exceptions import (
+    ExecutionCancelledError,
+    ExecutionNotCancellableError,
+    ExecutionTimeoutError,
+    InvalidBatchInputError,
+    NodeResultNotFoundError,
+    NodeTimeoutError,
+    WorkflowNotFoundError,
+)
+from app.utils.http_cache import SerializedResponseCache
 from app.utils.logger import logger
+from app.utils.metrics import NODE_SECONDS, observe_queue_wait
+from app.utils.pagination import decode_cursor, encode_cursor
+from app.utils.result_store import FileBlobStore, ResultStore
+from app.utils.serialization import dumps, json_object, raw_json
+from app.utils.write_behind import ExecutionStatusWriter
+
+OUTCOME_EVENTS = {
+    ExecutionStatus.COMPLETED: "execution_completed",
+    ExecutionStatus.FAILED: "execution_failed",
+    ExecutionStatus.CANCELLED: "execution_cancelled",
+    ExecutionStatus.TIMED_OUT: "execution_timed_out",
+}
+
+def execution_document_columns():
+    """schemas.Execution's columns, with the JSON ones read as text so they can be served without parsing"""
+    Execution = models.Execution
+    return (
+        Execution.id,
+        Execution.workflow_id,
+        Execution.status,
+        type_coerce(Execution.results, Text).label("results"),
+        type_coerce(Execution.node_timings, Text).label("node_timings"),
+        Execution.rerun_from,
+        Execution.parent_execution_id,
+        Execution.created_at,
+        Execution.updated_at,
+    )
 
 class ExecutionHandler:
     def __init__(self):
-        self.gemini_client = GeminiClient()
+        self.events = ExecutionEventBus()
+        self.cancellations = CancellationRegistry(settings.EXECUTION_CANCEL_POLL_SECONDS)
+        self.plans = WorkflowPlanCache(settings.WORKFLOW_PLAN_CACHE_SIZE)
+        self.responses = SerializedResponseCache(settings.EXECUTION_RESPONSE_CACHE_SIZE)
+        self.node_pool = NodePool(settings.NODE_PROCESS_WORKERS)
+        self.result_store = ResultStore(
+            FileBlobStore(settings.RESULT_BLOB_DIR),
+            inline_max_bytes=settings.RESULT_INLINE_MAX_BYTES,
+            codec=settings.RESULT_BLOB_CODEC,
+        )
+        self.status_writer = ExecutionStatusWriter(
+            flush_interval_ms=settings.WRITE_BEHIND_FLUSH_INTERVAL_MS,
+            max_batch=settings.WRITE_BEHIND_MAX_BATCH,
+        ) if settings.EXECUTION_WRITE_BEHIND else None
+
+    def close(self):
+        """Flushes buffered status writes and stops the node process pool; called on shutdown"""
+        if self.status_writer:
+            self.status_writer.close()
+        self.node_pool.close()
+
+    @property
+    def gemini_client(self):
+        return get_app().gemini_client
 
-    def create_execution_entry(self, db: Session, workflow_id: int):
-        db_execution = models.Execution(workflow_id=workflow_id, status=ExecutionStatus.PENDING, updated_at=datetime.utcnow(), )
+    async def create_execution_entry(
+        self,
+        db: AsyncSession,
+        workflow_id: int,
+        rerun_from: Optional[str] = None,
+        parent_execution_id: Optional[int] = None,
+    ):
+        db_execution = models.Execution(
+            workflow_id=workflow_id,
+            status=ExecutionStatus.PENDING,
+            rerun_from=rerun_from,
+            parent_execution_id=parent_execution_id,
+            updated_at=datetime.utcnow(),
+        )
         db.add(db_execution)
-        db.commit()
-        db.refresh(db_execution)
+        await db.commit()
+        await db.refresh(db_execution)
         return db_execution
 
-    def run_workflow(self, workflow_id: int, execution_id: int):
-        db = next(get_db())
+    def execute_node(
+        self,
+        node: dict,
+        input_data,
+        execution_id: Optional[int] = None,
+        use_cache: bool = True,
+        inputs: Optional[dict] = None,
+        timings: Optional[Dict[str, dict]] = None,
+    ):
+        """
+        Runs a single node on the merged output of its predecessors, using the
+        executor registered for its type (see app.engine.nodes). `inputs` maps
+        node ids to `data` overrides for this execution (batch items). Gemini
+        responses come from the response cache unless the workflow or the node
+        (`data.cache = false`) opts out. Progress is published on `events`, and
+        the node's start and end times are recorded in `timings` when given.
+        A node running past its deadline (see _node_timeout) fails with
+        NodeTimeoutError.
+        """
+        with self._node_timer(node, timings):
+            spec, context = self._start_node(node, input_data, execution_id, use_cache, inputs)
+            with self._node_deadline(context):
+                if spec is None:
+                    result = input_data
+                elif spec.cost == CostClass.CPU:
+                    future = self._cpu_call(spec, context, input_data)
+                    try:
+                        result = future.result(timeout=context.timeout)
+                    except BaseException:
+                        self.node_pool.abandon(future)
+                        raise
+                elif spec.execute is not None:
+                    result = spec.execute(context, input_data)
+                else:
+                    result = asyncio.run(asyncio.wait_for(spec.aexecute(context, input_data), context.timeout))
+        return self._finish_node(execution_id, spec, context.node_id, result)
+
+    async def aexecute_node(
+        self,
+        node: dict,
+        input_data,
+        execution_id: Optional[int] = None,
+        use_cache: bool = True,
+        inputs: Optional[dict] = None,
+        timings: Optional[Dict[str, dict]] = None,
+    ):
+        """
+        Async variant of execute_node: I/O nodes are awaited on the event loop,
+        CPU nodes run in the node process pool and trivial nodes inline. The
+        node deadline cancels the await, releasing any Gemini permit it holds.
+        """
+        with self._node_timer(node, timings):
+            spec, context = self._start_node(node, input_data, execution_id, use_cache, inputs)
+            async with self._anode_deadline(context):
+                if spec is None:
+                    result = input_data
+                elif spec.cost == CostClass.CPU:
+                    future = self._cpu_call(spec, context, input_data)
+                    try:
+                        result = await asyncio.wrap_future(future)
+                    except BaseException:
+                        self.node_pool.abandon(future)
+                        raise
+                elif spec.aexecute is not None:
+                    result = await spec.aexecute(context, input_data)
+                elif spec.cost == CostClass.IO:
+                    result = await asyncio.to_thread(spec.execute, context, input_data)
+                else:
+                    result = spec.execute(context, input_data)
+        return self._finish_node(execution_id, spec, context.node_id, result)
+
+    @contextmanager
+    def _node_timer(self, node: dict, timings: Optional[Dict[str, dict]]):
+        """Observes the node's duration per node type and records its start and end in `timings`"""
+        node_type = node.get('type')
+        started_at = datetime.utcnow()
+        start = time.perf_counter()
+        status = "completed"
         try:
-            workflow = db.query(models.Workflow).get(workflow_id)
-            execution = db.query(models.Execution).get(execution_id)
+            yield
+        except (asyncio.CancelledError, ExecutionCancelledError):
+            status = "cancelled"
+            raise
+        except ExecutionTimeoutError:
+            status = "timed_out"
+            raise
+        except BaseException:
+            status = "failed"
+            raise
+        finally:
+            elapsed = time.perf_counter() - start
+            NODE_SECONDS.labels(node_type if node_type in node_registry else "unknown", status).observe(elapsed)
+            if timings is not None:
+                timings[node.get('id')] = {
+                    "type": node_type,
+                    "status": status,
+                    "started_at": started_at.isoformat(),
+                    "finished_at": datetime.utcnow().isoformat(),
+                    "duration_ms": round(elapsed * 1000, 3),
+                }
 
-            if not workflow or not execution:
-                logger.error(f"Workflow or Execution not found in background task. WF_ID: {workflow_id}, EXEC_ID: {execution_id}")
-                return
+    def _node_timeout(self, data: dict) -> Optional[float]:
+        """The node's `data.timeout_seconds` when positive, else NODE_TIMEOUT_SECONDS; None means no deadline"""
+        timeout = data.get('timeout_seconds')
+        if not isinstance(timeout, (int, float)) or isinstance(timeout, bool) or timeout <= 0:
+            timeout = settings.NODE_TIMEOUT_SECONDS
+        return timeout if timeout > 0 else None
 
+    def _timeout_error(self, context: NodeContext) -> NodeTimeoutError:
+        return NodeTimeoutError(f"Node {context.node_id} exceeded its {context.timeout:g}s deadline")
+
+    @contextmanager
+    def _node_deadline(self, context: NodeContext):
+        """
+        Blocking executors cannot be interrupted, so they are handed the
+        deadline (context.timeout) and whatever they raise once it has
+        passed is reported as the timeout.
+        """
+        start = time.monotonic()
+        try:
+            yield
+        except ExecutionTimeoutError:
+            raise
+        except Exception as e:
+            if context.timeout is not None and time.monotonic() - start >= context.timeout:
+                raise self._timeout_error(context) from e
+            raise
+
+    @asynccontextmanager
+    async def _anode_deadline(self, context: NodeContext):
+        try:
+            async with asyncio.timeout(context.timeout) as deadline:
+                yield
+        except TimeoutError as e:
+            if deadline.expired():
+                raise self._timeout_error(context) from e
+            raise
+
+    def is_throttled(self, plan: WorkflowPlan, node_id: str) -> bool:
+        """Only I/O nodes count against EXECUTION_MAX_CONCURRENCY"""
+        spec = plan.specs.get(node_id)
+        return spec is not None and spec.cost == CostClass.IO
+
+    def _start_node(self, node: dict, input_data, execution_id: Optional[int], use_cache: bool, inputs: Optional[dict]):
+        node_id = node.get('id')
+        node_type = node.get('type')
+        logger.debug("Executing node %s of type %s", node_id, node_type, extra={"execution_id": execution_id, "node_id": node_id})
+        self._publish(execution_id, "node_started", node_id=node_id, node_type=node_type)
+
+        spec = node_registry.get(node_type)
+        if spec is None:
+            logger.warning(f"Unknown node type: {node_type}, passing input through")
+        else:
+            spec.validate_input(node_id, input_data)
+        data = node.get('data') or {}
+        if inputs and node_id in inputs:
+            data = {**data, **inputs[node_id]}
+        context = NodeContext(
+            node_id,
+            data,
+            use_cache=self._use_cache(node, use_cache),
+            on_chunk=self._token_listener(execution_id, node_id),
+            gemini_client=self.gemini_client,
+            timeout=self._node_timeout(data),
+        )
+        return spec, context
+
+    def _finish_node(self, execution_id: Optional[int], spec: Optional[NodeSpec], node_id: str, result):
+        if spec is not None:
+            spec.validate_output(node_id, result)
+        logger.debug("Stored result for %s: %s", node_id, result, extra={"execution_id": execution_id, "node_id": node_id})
+        self._publish(execution_id, "node_completed", node_id=node_id, output=result)
+        return result
+
+    def _cpu_call(self, spec: NodeSpec, context: NodeContext, input_data) -> Future:
+        """Submits a CPU node to the process pool, or to a thread when NODE_PROCESS_WORKERS is 0"""
+        return self.node_pool.submit(run_cpu_node, spec.type, context.node_id, context.data, input_data)
+
+    def _publish(self, execution_id: Optional[int], event_type: str, **payload):
+        if execution_id is not None:
+            self.events.publish(execution_id, event_type, **payload)
+
+    def _token_listener(self, execution_id: Optional[int], node_id: str):
+        """Streams Gemini output as token events, but only while someone is listening"""
+        if execution_id is None or not self.events.has_subscribers(execution_id):
+            return None
+        return lambda text: self.events.publish(execution_id, "token", node_id=node_id, text=text)
+
+    def _publish_outcome(self, execution_id: int, status: ExecutionStatus, results: dict):
+        self._publish(execution_id, OUTCOME_EVENTS[status], status=status.value, results=results)
+
+    def _use_cache(self, node: dict, workflow_cache_enabled: bool) -> bool:
+        return shares_results(node, workflow_cache_enabled)
+
+    # The status bookkeeping below takes a plain Session so the thread runner can
+    # call it directly and the async runner through AsyncSession.run_sync.
+
+    def _begin_execution(self, db: Session, workflow_id: int, execution_id: int):
+        """
+        Marks the execution RUNNING and returns the workflow's current version,
+        the execution's input overrides and its rerun settings (rerun_from,
+        parent_execution_id), or None when either row no longer exists or the
+        execution has already finished. The graph itself is only loaded when no plan is cached for that
+        version (see _compile_plan).
+        """
+        version = db.scalar(select(models.Workflow.version).where(models.Workflow.id == workflow_id))
+        execution = db.get(models.Execution, execution_id)
+
+        if version is None or not execution:
+            logger.error(f"Workflow or Execution not found in background task. WF_ID: {workflow_id}, EXEC_ID: {execution_id}")
+            return None
+        if execution.status in TERMINAL_EXECUTION_STATUSES:
+            # Cancelled before it got to run.
+            logger.info("Skipping execution %s, already %s", execution_id, execution.status.value, extra={"execution_id": execution_id})
+            return None
+
+        # Retried queue jobs would count their earlier attempts as waiting.
+        if execution.attempts <= 1:
+            observe_queue_wait(execution.created_at)
+
+        if self.status_writer:
+            self.status_writer.submit(execution_id, ExecutionStatus.RUNNING)
+        else:
             execution.status = ExecutionStatus.RUNNING
             db.commit()
-        
-            node_map = {}
-            for node in workflow.nodes:
-                node_id = node.get('id')
-                node_map[node_id] = node
-                logger.info(f"Added node to map: {node_id} -> {node}")
-        
-            edge_map = {edge['source']: edge['target'] for edge in workflow.edges}
-        
-            all_targets = {edge['target'] for edge in workflow.edges}
-            start_node_id = next((nid for nid in node_map if nid not in all_targets), None)
-
-            if not start_node_id:
-                raise MissingStartNodeError("Could not find a starting node.")
-
-            current_node_id = start_node_id
-            current_data = None
-            results = {}
-
-            logger.info(f"Starting workflow execution with start node: {start_node_id}")
-
-            while current_node_id:
-                node = node_map[current_node_id]
-                node_type = node.get('type')
-                
-                logger.info(f"Executing node {current_node_id} of type {node_type}")
-
-                if node_type == NodeTypes.TEXT_INPUT:
-                    current_data = node.get('data', {}).get('text', '')
-                    logger.info(f"Text input node result: {current_data}")
-                elif node_type == NodeTypes.GEMINI_PROMPT:
-                    if not isinstance(current_data, str) or not current_data:
-                        raise InvalidNodeInputError(f"Input for Gemini node must be a non-empty string. Got: {current_data}")
-                    prompt = current_data
-                    current_data = self.gemini_client.generate_text(prompt)
-                    logger.info(f"Gemini node result: {current_data}")
-                elif node_type == NodeTypes.OUTPUT:
-                    logger.info(f"Output node result: {current_data}")
-                else:
-                    logger.warning(f"Unknown node type: {node_type}, skipping processing")
-                
-                results[current_node_id] = current_data
-                logger.info(f"Stored result for {current_node_id}: {current_data}")
-                
-                # Move to next node
-                next_node_id = edge_map.get(current_node_id)
-                logger.info(f"Next node: {next_node_id}")
-                current_node_id = next_node_id
-
-            logger.info(f"Final results: {results}")
-            execution.status = ExecutionStatus.COMPLETED
+        return version, execution.inputs, execution.rerun_from, execution.parent_execution_id
+
+    def get_plan(self, workflow: models.Workflow) -> WorkflowPlan:
+        """
+        Returns the compiled plan for a loaded workflow row, compiling it on a
+        cache miss. Raises for graphs that cannot run, so callers can reject
+        them before an execution row exists.
+        """
+        plan = self.plans.get(workflow.id, workflow.version)
+        if plan is None:
+            plan = compile_workflow(workflow.nodes or [], workflow.edges or [], cache_enabled=workflow.cache_enabled is not False)
+            self.plans.put(workflow.id, workflow.version, plan)
+        return plan
+
+    def _compile_plan(self, db: Session, workflow_id: int) -> WorkflowPlan:
+        """Loads and compiles the workflow, caching the plan under the version that was read"""
+        row = db.execute(
+            select(models.Workflow.version, models.Workflow.nodes, models.Workflow.edges, models.Workflow.cache_enabled)
+            .where(models.Workflow.id == workflow_id)
+        ).first()
+        if row is None:
+            raise WorkflowNotFoundError()
+
+        plan = compile_workflow(row.nodes or [], row.edges or [], cache_enabled=row.cache_enabled is not False)
+        self.plans.put(workflow_id, row.version, plan)
+        return plan
+
+    def _finish_execution(
+        self,
+        db: Session,
+        execution_id: int,
+        status: ExecutionStatus,
+        results: dict,
+        node_timings: Optional[dict] = None,
+        fingerprints: Optional[dict] = None,
+    ):
+        execution = db.get(models.Execution, execution_id)
+        # A cancellation is final; the runner's own outcome arrives after it.
+        if execution and execution.status != ExecutionStatus.CANCELLED:
+            execution.status = status
             execution.results = results
-            
+            execution.node_timings = node_timings
+            execution.fingerprints = fingerprints
+            db.commit()
+
+    def fingerprint_plan(
+        self,
+        plan: WorkflowPlan,
+        inputs: Optional[dict] = None,
+        reused: Optional[Dict[str, Tuple[int, Any, Optional[str]]]] = None,
+    ) -> Dict[str, Optional[str]]:
+        """
+        Node fingerprints for one execution of `plan`; the Gemini model and
+        its settings are part of them. Reused outputs keep the fingerprint of
+        the execution they come from. Like the response cache, reusing a
+        Gemini answer replaces a fresh sample, so it follows GEMINI_CACHE_ENABLED
+        unless the node opts in.
+        """
+        client = self.gemini_client
+        salt = json.dumps([client.model_name, client.generation_config], sort_keys=True, default=str)
+        pinned = {node_id: fingerprint for node_id, (_, _, fingerprint) in (reused or {}).items()}
+        return node_fingerprints(plan, inputs, salt, pinned, reuse_impure=settings.GEMINI_CACHE_ENABLED)
+
+    def _reuse_candidates(
+        self,
+        db: Session,
+        workflow_id: int,
+        execution_id: int,
+        plan: WorkflowPlan,
+        fingerprints: Dict[str, Optional[str]],
+        rerun_from: Optional[str],
+        parent_execution_id: Optional[int],
+    ) -> Dict[str, Tuple[int, Any, Optional[str]]]:
+        """
+        Stored outputs this execution may take over, as node id -> (source
+        execution id, stored output, fingerprint recorded with it). A rerun takes every node outside
+        `rerun_from` and its downstream from the parent execution. Otherwise a
+        node is a candidate when its fingerprint was recorded by one of the
+        workflow's last EXECUTION_INCREMENTAL_LOOKBACK completed executions,
+        the newest match winning.
+        """
+        if rerun_from is not None:
+            parent = db.get(models.Execution, parent_execution_id) if parent_execution_id else None
+            if parent is None or parent.status != ExecutionStatus.COMPLETED or not parent.results:
+                return {}
+            forced = downstream_of(plan.graph, rerun_from) if rerun_from in plan.graph.nodes else set(plan.graph.nodes)
+            parent_fingerprints = parent.fingerprints or {}
+            return {
+                node_id: (parent.id, parent.results[node_id], parent_fingerprints.get(node_id))
+                for node_id in plan.graph.order
+                if node_id not in forced and node_id in parent.results
+            }
+
+        if not settings.EXECUTION_INCREMENTAL or not any(fingerprints.values()):
+            return {}
+        wanted: Dict[str, List[str]] = {}
+        for node_id, fingerprint in fingerprints.items():
+            if fingerprint is not None:
+                wanted.setdefault(fingerprint, []).append(node_id)
+
+        rows = db.execute(
+            select(models.Execution.id, models.Execution.results, models.Execution.fingerprints)
+            .where(
+                models.Execution.workflow_id == workflow_id,
+                models.Execution.status == ExecutionStatus.COMPLETED,
+                models.Execution.id != execution_id,
+            )
+            .order_by(models.Execution.id.desc())
+            .limit(settings.EXECUTION_INCREMENTAL_LOOKBACK)
+        ).all()
+        candidates = {}
+        for row in rows:
+            results = row.results or {}
+            for source_node_id, fingerprint in (row.fingerprints or {}).items():
+                if source_node_id not in results:
+                    continue
+                for node_id in wanted.get(fingerprint, ()):
+                    candidates.setdefault(node_id, (row.id, results[source_node_id], fingerprint))
+        return candidates
+
+    def _load_reused(
+        self, plan: WorkflowPlan, candidates: Dict[str, Tuple[int, Any, Optional[str]]]
+    ) -> Dict[str, Tuple[int, Any, Optional[str]]]:
+        """
+        Narrows the candidates to the ones that can be reused (see
+        select_reusable) and loads their outputs from the blob store. Outputs
+        whose blob has gone missing are executed again, with their downstream.
+        """
+        loaded = {}
+        for node_id, (source_id, value, fingerprint) in select_reusable(plan.graph, candidates).items():
+            if self.result_store.is_ref(value):
+                try:
+                    value = self.result_store.load(value)
+                except FileNotFoundError:
+                    logger.warning("Result blob for node %s of execution %s is missing; executing it again", node_id, source_id)
+                    continue
+            loaded[node_id] = (source_id, value, fingerprint)
+        return select_reusable(plan.graph, loaded)
+
+    def _record_reused(
+        self,
+        plan: WorkflowPlan,
+        execution_id: int,
+        reused: Dict[str, Tuple[int, Any, Optional[str]]],
+        timings: Dict[str, dict],
+    ) -> Dict[str, Any]:
+        """Records reused nodes in `timings`, publishes them as completed and returns their outputs"""
+        outputs = {}
+        for node_id, (source_id, value, _) in reused.items():
+            timings[node_id] = {"type": plan.graph.nodes[node_id].get('type'), "status": "reused", "reused_from": source_id}
+            self._publish(execution_id, "node_completed", node_id=node_id, output=value, reused=True)
+            outputs[node_id] = value
+        if outputs:
+            logger.info("Reusing %d of %d node outputs", len(outputs), len(plan.graph.nodes), extra={"execution_id": execution_id})
+        return outputs
+
+    def _failure_outcome(self, execution_id: int, error: Exception) -> Tuple[ExecutionStatus, dict]:
+        error_message = getattr(error, 'detail', str(error))
+        if isinstance(error, ExecutionCancelledError):
+            logger.info("Execution %s was cancelled", execution_id, extra={"execution_id": execution_id})
+            return ExecutionStatus.CANCELLED, {"error": error_message}
+        if isinstance(error, ExecutionTimeoutError):
+            logger.warning("Execution %s timed out: %s", execution_id, error_message, extra={"execution_id": execution_id})
+            return ExecutionStatus.TIMED_OUT, {"error": error_message}
+        logger.error(f"Workflow execution failed for execution ID {execution_id}: {error_message}", exc_info=error)
+        return ExecutionStatus.FAILED, {"error": str(error)}
+
+    def run_plan(
+        self,
+        plan: WorkflowPlan,
+        execution_id: Optional[int] = None,
+        inputs: Optional[dict] = None,
+        timings: Optional[Dict[str, dict]] = None,
+        completed: Optional[Dict[str, Any]] = None,
+        scope: Optional[CancelScope] = None,
+    ) -> dict:
+        """
+        Runs a compiled plan on worker threads and returns the results of every
+        node. Nodes in `completed` keep the output given there. `scope` stops
+        the run when the execution is cancelled or past its deadline.
+        """
+        logger.debug("Starting workflow execution with start nodes: %s", plan.graph.start_nodes, extra={"execution_id": execution_id})
+        execute_node = partial(self.execute_node, execution_id=execution_id, use_cache=plan.cache_enabled, inputs=inputs, timings=timings)
+        results = run_graph(
+            plan.graph, execute_node, max_concurrency=settings.EXECUTION_MAX_CONCURRENCY, completed=completed, scope=scope
+        )
+        logger.info("Final results: %s", results, extra={"execution_id": execution_id})
+        return results
+
+    async def arun_plan(
+        self,
+        plan: WorkflowPlan,
+        execution_id: Optional[int] = None,
+        inputs: Optional[dict] = None,
+        timings: Optional[Dict[str, dict]] = None,
+        completed: Optional[Dict[str, Any]] = None,
+    ) -> dict:
+        """Runs a compiled plan on the event loop and returns the results of every node (see run_plan)"""
+        logger.debug("Starting workflow execution with start nodes: %s", plan.graph.start_nodes, extra={"execution_id": execution_id})
+        execute_node = partial(self.aexecute_node, execution_id=execution_id, use_cache=plan.cache_enabled, inputs=inputs, timings=timings)
+        results = await arun_graph(
+            plan.graph,
+            execute_node,
+            max_concurrency=settings.EXECUTION_MAX_CONCURRENCY,
+            throttled=partial(self.is_throttled, plan),
+            completed=completed,
+        )
+        logger.info("Final results: %s", results, extra={"execution_id": execution_id})
+        return results
+
+    def run_workflow(self, workflow_id: int, execution_id: int):
+        """Runs an execution on worker threads (EXECUTION_MODE=thread)"""
+        with SessionLocal() as db:
+            started = self._begin_execution(db, workflow_id, execution_id)
+        if started is None:
+            return
+        version, inputs, rerun_from, parent_execution_id = started
+        self._publish(execution_id, "execution_started")
+        timings = {}
+        fingerprints = None
+        scope = self.cancellations.open(execution_id, settings.EXECUTION_TIMEOUT_SECONDS)
+
+        try:
+            plan = self.plans.get(workflow_id, version)
+            if plan is None:
+                with SessionLocal() as db:
+                    plan = self._compile_plan(db, workflow_id)
+            fingerprints = self.fingerprint_plan(plan, inputs)
+            with SessionLocal() as db:
+                candidates = self._reuse_candidates(db, workflow_id, execution_id, plan, fingerprints, rerun_from, parent_execution_id)
+            reused = self._load_reused(plan, candidates)
+            if reused:
+                fingerprints = self.fingerprint_plan(plan, inputs, reused)
+            completed = self._record_reused(plan, execution_id, reused, timings)
+            results = self.run_plan(plan, execution_id, inputs, timings, completed, scope)
+            status = ExecutionStatus.COMPLETED
         except Exception as e:
-            execution = db.query(models.Execution).get(execution_id)
-            error_message = getattr(e, 'detail', str(e))
-            logger.error(f"Workflow execution failed for execution ID {execution.id}: {error_message}", exc_info=True)
-            execution.status = ExecutionStatus.FAILED
-            execution.results = {"error": str(e)}
+            status, results = self._failure_outcome(execution_id, e)
+            fingerprints = None
         finally:
-            db.commit()
-            db.close()
-            logger.info(f"Finished execution for workflow {workflow_id}, execution {execution_id}.")
+            self.cancellations.close(scope)
+
+        stored = self.result_store.offload(results)
+        if self.status_writer:
+            self.status_writer.submit(execution_id, status, stored, timings, fingerprints)
+        else:
+            with SessionLocal() as db:
+                self._finish_execution(db, execution_id, status, stored, timings, fingerprints)
+        self._publish_outcome(execution_id, status, results)
+        logger.info("Finished execution for workflow %s, execution %s.", workflow_id, execution_id, extra={"execution_id": execution_id})
+
+    async def arun_workflow(self, workflow_id: int, execution_id: int):
+        """
+        Runs an execution on the event loop (EXECUTION_MODE=async); database
+        access and Gemini calls are both awaited.
+        """
+        async with AsyncSessionLocal() as db:
+            started = await db.run_sync(self._begin_execution, workflow_id, execution_id)
+        if started is None:
+            return
+        version, inputs, rerun_from, parent_execution_id = started
+        self._publish(execution_id, "execution_started")
+        timings = {}
+        fingerprints = None
+        scope = self.cancellations.open(execution_id, settings.EXECUTION_TIMEOUT_SECONDS)
+
+        try:
+            plan = self.plans.get(workflow_id, version)
+            if plan is None:
+                async with AsyncSessionLocal() as db:
+                    plan = await db.run_sync(self._compile_plan, workflow_id)
+            fingerprints = self.fingerprint_plan(plan, inputs)
+            async with AsyncSessionLocal() as db:
+                candidates = await db.run_sync(
+                    self._reuse_candidates, workflow_id, execution_id, plan, fingerprints, rerun_from, parent_execution_id
+                )
+            reused = await asyncio.to_thread(self._load_reused, plan, candidates) if candidates else {}
+            if reused:
+                fingerprints = self.fingerprint_plan(plan, inputs, reused)
+            completed = self._record_reused(plan, execution_id, reused, timings)
+            results = await scope.arun(self.arun_plan(plan, execution_id, inputs, timings, completed))
+            status = ExecutionStatus.COMPLETED
+        except Exception as e:
+            status, results = self._failure_outcome(execution_id, e)
+            fingerprints = None
+        finally:
+            self.cancellations.close(scope)
+
+        stored = await asyncio.to_thread(self.result_store.offload, results)
+        if self.status_writer:
+            self.status_writer.submit(execution_id, status, stored, timings, fingerprints)
+        else:
+            async with AsyncSessionLocal() as db:
+                await db.run_sync(self._finish_execution, execution_id, status, stored, timings, fingerprints)
+        self._publish_outcome(execution_id, status, results)
+        logger.info("Finished execution for workflow %s, execution %s.", workflow_id, execution_id, extra={"execution_id": execution_id})
+
+    def resolve_batch_inputs(self, plan: WorkflowPlan, items: List[Any]) -> List[dict]:
+        """
+        Turns batch items into per-execution `inputs`. An item is either a
+        string, which replaces the text of the workflow's only text_input node,
+        or an object mapping text_input node ids to their text.
+        """
+        text_inputs = [node_id for node_id, node in plan.graph.nodes.items() if node.get('type') == NodeTypes.TEXT_INPUT]
+        resolved = []
+        for index, item in enumerate(items):
+            if isinstance(item, str):
+                if len(text_inputs) != 1:
+                    raise InvalidBatchInputError(
+                        f"Item {index} is a string but the workflow has {len(text_inputs)} text_input nodes; "
+                        "use an object keyed by node id"
+                    )
+                item = {text_inputs[0]: item}
+            if not isinstance(item, dict) or not item or not all(isinstance(text, str) for text in item.values()):
+                raise InvalidBatchInputError(f"Item {index} must be a string or an object mapping node ids to text")
+            unknown = sorted(set(item) - set(text_inputs))
+            if unknown:
+                raise InvalidBatchInputError(f"Item {index} overrides {unknown}, which are not text_input nodes")
+            resolved.append({node_id: {"text": text} for node_id, text in item.items()})
+        return resolved
+
+    async def create_batch_entries(self, db: AsyncSession, workflow_id: int, inputs: List[dict], status: ExecutionStatus) -> List[int]:
+        """Inserts one execution per batch item in a single statement and returns their ids in item order"""
+        now = datetime.utcnow()
+        rows = [
+            {"workflow_id": workflow_id, "status": status, "inputs": item, "results": {}, "attempts": 0, "created_at": now, "updated_at": now}
+            for item in inputs
+        ]
+        execution_ids = (await db.scalars(
+            insert(models.Execution).returning(models.Execution.id, sort_by_parameter_order=True), rows
+        )).all()
+        await db.commit()
+        return list(execution_ids)
+
+    def _finish_executions(self, db: Session, outcomes: List[tuple]):
+        """Writes (execution_id, status, results, node_timings, fingerprints) outcomes with one bulk UPDATE"""
+        now = datetime.utcnow()
+        statement = (
+            update(models.Execution)
+            .where(models.Execution.status != ExecutionStatus.CANCELLED)
+            .execution_options(synchronize_session=None)
+        )
+        db.execute(statement, [
+            {
+                "id": execution_id, "status": status, "results": results,
+                "node_timings": node_timings, "fingerprints": fingerprints, "updated_at": now,
+            }
+            for execution_id, status, results, node_timings, fingerprints in outcomes
+        ])
+        db.commit()
+
+    async def _write_outcomes(self, outcomes: List[tuple]):
+        if not outcomes:
+            return
+        if self.status_writer:
+            for execution_id, status, results, node_timings, fingerprints in outcomes:
+                self.status_writer.submit(execution_id, status, results, node_timings, fingerprints)
+            return
+        async with AsyncSessionLocal() as db:
+            await db.run_sync(self._finish_executions, outcomes)
+
+    async def arun_batch(self, plan: WorkflowPlan, items: List[Tuple[int, dict]], concurrency: int):
+        """
+        Runs batch executions (rows already RUNNING) on one shared plan, at
+        most `concurrency` at a time, and yields each outcome as it finishes.
+        Outcomes are written back in bulk every BATCH_WRITE_SIZE items or
+        BATCH_WRITE_INTERVAL_MS. Items still unfinished when the consumer goes
+        away are cancelled and marked CANCELLED.
+
+        Items record their fingerprints but do not look for reusable outputs;
+        a batch's items differ in their inputs by construction.
+        """
+        async def run_item(index: int, execution_id: int, inputs: dict):
+            self._publish(execution_id, "execution_started")
+            timings = {}
+            scope = self.cancellations.open(execution_id, settings.EXECUTION_TIMEOUT_SECONDS)
+            try:
+                results = await scope.arun(self.arun_plan(plan, execution_id, inputs, timings))
+                status = ExecutionStatus.COMPLETED
+                fingerprints = self.fingerprint_plan(plan, inputs)
+            except Exception as e:
+                status, results = self._failure_outcome(execution_id, e)
+                fingerprints = None
+            finally:
+                self.cancellations.close(scope)
+            self._publish_outcome(execution_id, status, results)
+            stored = await asyncio.to_thread(self.result_store.offload, results)
+            return index, execution_id, status, results, stored, timings, fingerprints
+
+        waiting = iter(enumerate(items))
+        running = set()
+        unwritten = []
+        finished = set()
+        write_interval = settings.BATCH_WRITE_INTERVAL_MS / 1000
+        last_write = time.monotonic()
+
+        def start_more():
+            while len(running) < concurrency:
+                item = next(waiting, None)
+                if item is None:
+                    return
+                index, (execution_id, inputs) = item
+                running.add(asyncio.create_task(run_item(index, execution_id, inputs)))
+
+        try:
+            start_more()
+            while running:
+                done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                running.difference_update(done)
+                start_more()
+                for task in done:
+                    index, execution_id, status, results, stored, timings, fingerprints = task.result()
+                    finished.add(execution_id)
+                    unwritten.append((execution_id, status, stored, timings, fingerprints))
+                    yield {"index": index, "execution_id": execution_id, "status": status.value, "results": results}
+                if len(unwritten) >= settings.BATCH_WRITE_SIZE or time.monotonic() - last_write >= write_interval:
+                    outcomes, unwritten = unwritten, []
+                    await self._write_outcomes(outcomes)
+                    last_write = time.monotonic()
+        finally:
+            for task in running:
+                task.cancel()
+            abandoned = [
+                (execution_id, ExecutionStatus.CANCELLED, {"error": "Batch was cancelled before this item finished"}, None, None)
+                for execution_id, _ in items if execution_id not in finished
+            ]
+            # Shielded: when the client disconnects the stream is cancelled, but the rows must still be settled.
+            try:
+                await asyncio.shield(asyncio.ensure_future(self._write_outcomes(unwritten + abandoned)))
+            except asyncio.CancelledError:
+                pass
+
+    async def await_batch(self, execution_ids: List[int]):
+        """
+        Yields the outcomes of batch executions run by queue workers
+        (EXECUTION_BACKEND=queue) as their rows reach a terminal status.
+        """
+        index_of = {execution_id: index for index, execution_id in enumerate(execution_ids)}
+        remaining = set(execution_ids)
+        while remaining:
+            pending = sorted(remaining)
+            rows = []
+            async with AsyncSessionLocal() as db:
+                for start in range(0, len(pending), 500):
+                    rows.extend((await db.execute(
+                        select(models.Execution.id, models.Execution.status, models.Execution.results).where(
+                            models.Execution.id.in_(pending[start:start + 500]),
+                            models.Execution.status.in_(TERMINAL_EXECUTION_STATUSES),
+                        )
+                    )).all())
+            for row in rows:
+                remaining.discard(row.id)
+                results = await asyncio.to_thread(self.result_store.resolve, row.results)
+                yield {"index": index_of[row.id], "execution_id": row.id, "status": row.status.value, "results": results}
+            if remaining:
+                await asyncio.sleep(settings.EXECUTION_STREAM_POLL_SECONDS)
+
+    async def _load_outcome(self, execution_id: int):
+        async with AsyncSessionLocal() as db:
+            return (await db.execute(
+                select(models.Execution.status, models.Execution.results).where(models.Execution.id == execution_id)
+            )).first()
+
+    async def stream_events(self, execution_id: int):
+        """
+        Yields the progress events of one execution until it finishes, or None
+        as a keep-alive. Events come from this process's bus; the row is also
+        re-read every EXECUTION_STREAM_POLL_SECONDS so that executions run by a
+        queue worker in another process still end the stream.
+        """
+        subscription = self.events.subscribe(execution_id)
+        try:
+            # The row is read after subscribing, so an execution finishing in
+            # between is seen either in the row or as an event.
+            event = None
+            while True:
+                if event is not None:
+                    yield event
+                    if event["event"] in TERMINAL_EVENTS:
+                        return
+                else:
+                    outcome = await self._load_outcome(execution_id)
+                    if outcome is None:
+                        return
+                    if outcome.status in TERMINAL_EXECUTION_STATUSES:
+                        results = await asyncio.to_thread(self.result_store.resolve, outcome.results)
+                        yield {"event": OUTCOME_EVENTS[outcome.status], "execution_id": execution_id, "status": outcome.status.value, "results": results}
+                        return
+                    yield None
+
+                try:
+                    event = await asyncio.wait_for(subscription.queue.get(), timeout=settings.EXECUTION_STREAM_POLL_SECONDS)
+                except asyncio.TimeoutError:
+                    event = None
+        finally:
+            self.events.unsubscribe(execution_id, subscription)
+
+    async def get_executions_page(
+        self,
+        db: AsyncSession,
+        workflow_id: int,
+        user_id: int,
+        limit: int,
+        cursor: Optional[str] = None,
+        include_results: bool = False,
+    ):
+        """
+        Returns one page of a workflow's executions, newest first, plus the cursor for the next page.
+        Pages are keyed on the id, which grows with every insert, so deep pages cost the same as the
+        first one. created_at is not used: legacy rows store it without microseconds, which no
+        cursor value compares equal to.
+        """
+        Execution = models.Execution
+        if include_results:
+            query = select(*execution_document_columns())
+        else:
+            query = select(
+                Execution.id,
+                Execution.workflow_id,
+                Execution.status,
+                Execution.created_at,
+                Execution.updated_at,
+            )
+        query = (
+            query.join(models.Workflow)
+            .where(
+                Execution.workflow_id == workflow_id,
+                models.Workflow.owner_id == user_id
+            )
+            .order_by(Execution.id.desc())
+            .limit(limit + 1)
+        )
+        if cursor:
+            query = query.where(Execution.id < decode_cursor(cursor))
+
+        if include_results:
+            # Rows stay raw; execution_json serialises them without parsing results.
+            items = (await db.execute(query)).all()
+        else:
+            rows = (await db.execute(query)).all()
+            items = [schemas.ExecutionSummary.model_validate(row) for row in rows]
+
+        next_cursor = None
+        if len(items) > limit:
+            items = items[:limit]
+            next_cursor = encode_cursor(items[-1].id)
+        return items, next_cursor
 
-    def get_executions_by_workflow_id(self, db: Session, workflow_id: int, user_id: int):
+    async def get_rerun_base(self, db: AsyncSession, workflow_id: int, execution_id: Optional[int] = None) -> Optional[int]:
         """
-        Retrieves all executions for a given workflow_id, ensuring the user owns the workflow.
+        The given execution, or else the workflow's latest plain one (batch
+        items ran with their own inputs), if it belongs to the workflow and
+        COMPLETED.
         """
-        return (
-            db.query(models.Execution)
+        query = select(models.Execution.id).where(
+            models.Execution.workflow_id == workflow_id,
+            models.Execution.status == ExecutionStatus.COMPLETED,
+        )
+        if execution_id is not None:
+            query = query.where(models.Execution.id == execution_id)
+        else:
+            query = query.where(models.Execution.inputs.is_(None))
+        return await db.scalar(query.order_by(models.Execution.id.desc()).limit(1))
+
+    async def cancel_execution(self, db: AsyncSession, execution_id: int) -> ExecutionStatus:
+        """
+        Marks a PENDING or RUNNING execution CANCELLED and stops it: right away
+        when it runs in this process, otherwise within
+        EXECUTION_CANCEL_POLL_SECONDS through the process running it. Queued
+        executions are simply never started. Returns the previous status.
+        """
+        previous = await db.scalar(select(models.Execution.status).where(models.Execution.id == execution_id))
+        result = await db.execute(
+            update(models.Execution)
+            .where(
+                models.Execution.id == execution_id,
+                models.Execution.status.in_([ExecutionStatus.PENDING, ExecutionStatus.RUNNING]),
+            )
+            .values(status=ExecutionStatus.CANCELLED, results={"error": "Execution was cancelled"}, updated_at=datetime.utcnow())
+        )
+        await db.commit()
+        if result.rowcount == 0:
+            raise ExecutionNotCancellableError()
+
+        if not self.cancellations.cancel(execution_id):
+            # Nothing here will publish the outcome; tell this process's listeners directly.
+            self._publish_outcome(execution_id, ExecutionStatus.CANCELLED, {"error": "Execution was cancelled"})
+        logger.info("Cancelled execution %s (was %s)", execution_id, previous.value, extra={"execution_id": execution_id})
+        return previous
+
+    async def get_execution_version(self, db: AsyncSession, execution_id: int, user_id: int):
+        """(status, updated_at) of an execution owned by the user, or None"""
+        result = await db.execute(
+            select(models.Execution.status, models.Execution.updated_at)
             .join(models.Workflow)
-            .filter(
-                models.Execution.workflow_id == workflow_id,
+            .where(
+                models.Execution.id == execution_id,
                 models.Workflow.owner_id == user_id
             )
-            .order_by(models.Execution.created_at.desc())
-            .all()
         )
+        return result.first()
 
-    def get_execution_by_id(self, db: Session, execution_id: int, user_id: int):
+    async def get_execution_by_id(self, db: AsyncSession, execution_id: int, user_id: int):
         """
         Retrieves a single execution by its ID, ensuring the user owns the parent workflow.
         """
-        return (
-            db.query(models.Execution)
+        return await db.scalar(
+            select(models.Execution)
+            .join(models.Workflow)
+            .where(
+                models.Execution.id == execution_id,
+                models.Workflow.owner_id == user_id
+            )
+        )
+
+    async def get_execution_document(self, db: AsyncSession, execution_id: int, user_id: int):
+        """The `execution_document_columns` row of an execution owned by the user, or None"""
+        result = await db.execute(
+            select(*execution_document_columns())
             .join(models.Workflow)
-            .filter(
+            .where(
                 models.Execution.id == execution_id,
                 models.Workflow.owner_id == user_id
             )
-            .first()
-        )
\ No newline at end of file
+        )
+        return result.first()
+
+    def execution_json(self, row, results: Optional[bytes] = None) -> bytes:
+        """
+        Serialises an `execution_document_columns` row as schemas.Execution
+        would, splicing the stored JSON (or `results`, e.g. resolved) in
+        instead of parsing and re-encoding it.
+        """
+        return json_object((
+            ("status", dumps(row.status)),
+            ("results", raw_json(row.results) if results is None else results),
+            ("node_timings", raw_json(row.node_timings)),
+            ("rerun_from", dumps(row.rerun_from)),
+            ("parent_execution_id", dumps(row.parent_execution_id)),
+            ("created_at", dumps(row.created_at)),
+            ("updated_at", dumps(row.updated_at)),
+            ("id", dumps(row.id)),
+            ("workflow_id", dumps(row.workflow_id)),
+        ))
+
+    async def resolve_results_json(self, text: Optional[str]) -> bytes:
+        """`resolve_results` for results read as JSON text; blob reads only leave the loop when there are references"""
+        if not self.result_store.has_refs_json(text):
+            return raw_json(text)
+        return await asyncio.to_thread(self.result_store.resolve_json, text)
+
+    async def load_result(self, value: Any, node_id: str) -> Any:
+        """Returns a stored node output, fetching it from the blob store when it is a reference"""
+        if not self.result_store.is_ref(value):
+            return value
+        try:
+            return await asyncio.to_thread(self.result_store.load, value)
+        except FileNotFoundError:
+            raise NodeResultNotFoundError(f"Stored output of node {node_id} is missing")
@@ -1,33 +1,64 @@
-from sqlalchemy.orm import Session
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.engine.plan import validate_workflow_graph
 from app.models import models, schemas
 
 class WorkflowHandler:
-    def create_workflow(self, db: Session, workflow: schemas.WorkflowCreate, user_id: int):
+    async def create_workflow(self, db: AsyncSession, workflow: schemas.WorkflowCreate, user_id: int):
+        validate_workflow_graph(workflow.nodes, workflow.edges)
         db_workflow = models.Workflow(**workflow.dict(), owner_id=user_id)
         db.add(db_workflow)
-        db.commit()
-        db.refresh(db_workflow)
+        await db.commit()
+        await db.refresh(db_workflow)
         return db_workflow
 
-    def get_workflows(self, db: Session, user_id: int, skip: int = 0, limit: int = 100):
-        return db.query(models.Workflow).filter(models.Workflow.owner_id == user_id).offset(skip).limit(limit).all()
+    async def get_workflows(self, db: AsyncSession, user_id: int, skip: int = 0, limit: int = 100):
+        result = await db.scalars(
+            select(models.Workflow).where(models.Workflow.owner_id == user_id).order_by(models.Workflow.id).offset(skip).limit(limit)
+        )
+        return result.all()
+
+    async def get_workflow_versions(self, db: AsyncSession, user_id: int, skip: int = 0, limit: int = 100):
+        """(id, version) of the same page get_workflows returns, without loading the graphs"""
+        result = await db.execute(
+            select(models.Workflow.id, models.Workflow.version)
+            .where(models.Workflow.owner_id == user_id)
+            .order_by(models.Workflow.id)
+            .offset(skip)
+            .limit(limit)
+        )
+        return result.all()
         
-    def get_workflow_by_id(self, db: Session, workflow_id: int, user_id: int):
-        return db.query(models.Workflow).filter(models.Workflow.id == workflow_id, models.Workflow.owner_id == user_id).first()
+    async def get_workflow_by_id(self, db: AsyncSession, workflow_id: int, user_id: int):
+        return await db.scalar(select(models.Workflow).where(models.Workflow.id == workflow_id, models.Workflow.owner_id == user_id))
+
+    async def get_workflow_version(self, db: AsyncSession, workflow_id: int, user_id: int):
+        """(version, updated_at) of a workflow owned by the user, or None"""
+        result = await db.execute(
+            select(models.Workflow.version, models.Workflow.updated_at)
+            .where(models.Workflow.id == workflow_id, models.Workflow.owner_id == user_id)
+        )
+        return result.first()
     
-    def update_workflow(self, db: Session, workflow_id: int, user_id: int, workflow_data: schemas.WorkflowCreate):
-        workflow = db.query(models.Workflow).filter(
+    async def update_workflow(self, db: AsyncSession, workflow_id: int, user_id: int, workflow_data: schemas.WorkflowCreate):
+        workflow = await db.scalar(select(models.Workflow).where(
             models.Workflow.id == workflow_id,
             models.Workflow.owner_id == user_id
-        ).first()
+        ))
 
         if not workflow:
             return None
 
+        validate_workflow_graph(workflow_data.nodes, workflow_data.edges)
         workflow.name = workflow_data.name
         workflow.nodes = workflow_data.nodes
         workflow.edges = workflow_data.edges
+        if "cache_enabled" in workflow_data.model_fields_set:
+            workflow.cache_enabled = workflow_data.cache_enabled
+        # Incremented in the UPDATE itself: concurrent saves must each get their own version,
+        # as compiled plans are cached per (workflow, version).
+        workflow.version = func.coalesce(models.Workflow.version, 1) + 1
 
-        db.commit()
-        db.refresh(workflow)
-        return workflow
\ No newline at end of file
+        await db.commit()
+        await db.refresh(workflow)
+        return workflow
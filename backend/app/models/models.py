@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, JSON, ForeignKey, DateTime, Enum as SQLAlchemyEnum, Boolean
+from sqlalchemy import Column, Integer, String, Text, JSON, ForeignKey, DateTime, Enum as SQLAlchemyEnum, Boolean, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from datetime import datetime
@@ -11,6 +11,15 @@ class ExecutionStatus(str, enum.Enum):
     RUNNING = "RUNNING"
     COMPLETED = "COMPLETED"
     FAILED = "FAILED"
+    CANCELLED = "CANCELLED"
+    TIMED_OUT = "TIMED_OUT"
+
+TERMINAL_EXECUTION_STATUSES = {
+    ExecutionStatus.COMPLETED,
+    ExecutionStatus.FAILED,
+    ExecutionStatus.CANCELLED,
+    ExecutionStatus.TIMED_OUT,
+}
 
 class User(Base):
     __tablename__ = "users"
@@ -27,6 +36,10 @@ class Workflow(Base):
     name = Column(String, index=True)
     nodes = Column(JSON)
     edges = Column(JSON)
+    cache_enabled = Column(Boolean, default=True, nullable=False)
+    # Bumped on every update; compiled plans are cached per (id, version).
+    version = Column(Integer, default=1, server_default="1", nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=True)
     owner_id = Column(Integer, ForeignKey("users.id"))
     
     owner = relationship("User", back_populates="workflows")
@@ -36,9 +49,33 @@ class Execution(Base):
     __tablename__ = "executions"
     id = Column(Integer, primary_key=True, index=True)
     workflow_id = Column(Integer, ForeignKey("workflows.id"))
-    status = Column(SQLAlchemyEnum(ExecutionStatus), default=ExecutionStatus.PENDING)
+    status = Column(SQLAlchemyEnum(ExecutionStatus), default=ExecutionStatus.PENDING, index=True)
     results = Column(JSON, default={})
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    # Per-node `data` overrides for this run, e.g. the text of a batch item.
+    inputs = Column(JSON, nullable=True)
+    # node id -> {"type", "status", "started_at", "finished_at", "duration_ms"} for every node that ran.
+    node_timings = Column(JSON, nullable=True)
+    # node id -> fingerprint of the node's config and upstream fingerprints (see app.engine.incremental).
+    fingerprints = Column(JSON, nullable=True)
+    # Set for "rerun from node" executions: the node to re-execute from and the run the rest is taken from.
+    rerun_from = Column(String, nullable=True)
+    parent_execution_id = Column(Integer, ForeignKey("executions.id"), nullable=True)
+    # Set client-side as well, so new rows have the same precision as updated_at.
+    created_at = Column(DateTime(timezone=True), default=datetime.utcnow, server_default=func.now())
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+    claimed_by = Column(String, nullable=True)
+    heartbeat_at = Column(DateTime, nullable=True)
+    attempts = Column(Integer, default=0, nullable=False)
     
-    workflow = relationship("Workflow", back_populates="executions")
\ No newline at end of file
+    workflow = relationship("Workflow", back_populates="executions")
+
+    __table_args__ = (
+        Index("ix_executions_workflow_id_id", "workflow_id", "id"),
+    )
+
+class CachedResponse(Base):
+    __tablename__ = "gemini_response_cache"
+    key = Column(String, primary_key=True)
+    model = Column(String, nullable=False)
+    response = Column(Text, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
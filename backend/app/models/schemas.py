@@ -1,5 +1,5 @@
 from pydantic import BaseModel, EmailStr, ConfigDict
-from typing import List, Optional, Any, Dict
+from typing import List, Optional, Any, Dict, Union
 from datetime import datetime
 
 from app.models.models import ExecutionStatus
@@ -23,10 +23,17 @@ class Token(BaseModel):
 class TokenData(BaseModel):
     email: Optional[str] = None
 
+class Principal(BaseModel):
+    """Identity of the authenticated caller"""
+    id: int
+    email: str
+    is_active: bool = True
+
 class WorkflowBase(BaseModel):
     name: str
     nodes: List[Dict[str, Any]]
     edges: List[Dict[str, Any]]
+    cache_enabled: bool = True
 
 class WorkflowCreate(WorkflowBase):
     pass
@@ -34,12 +41,17 @@ class WorkflowCreate(WorkflowBase):
 class Workflow(WorkflowBase):
     id: int
     owner_id: int
+    version: int = 1
+    updated_at: Optional[datetime] = None
 
     model_config = ConfigDict(from_attributes=True) 
 
 class ExecutionBase(BaseModel):
     status: ExecutionStatus
     results: Optional[Dict[str, Any]] = None
+    node_timings: Optional[Dict[str, Any]] = None
+    rerun_from: Optional[str] = None
+    parent_execution_id: Optional[int] = None
     created_at: datetime
     updated_at: Optional[datetime] = None
 
@@ -49,5 +61,24 @@ class Execution(ExecutionBase):
     
     model_config = ConfigDict(from_attributes=True)
 
+class ExecutionSummary(BaseModel):
+    id: int
+    workflow_id: int
+    status: ExecutionStatus
+    created_at: datetime
+    updated_at: Optional[datetime] = None
+
+    model_config = ConfigDict(from_attributes=True)
+
+class ExecutionPage(BaseModel):
+    items: List[Union[Execution, ExecutionSummary]]
+    next_cursor: Optional[str] = None
+
+class BatchExecutionRequest(BaseModel):
+    # A string replaces the text of the workflow's only text_input node; an
+    # object maps text_input node ids to their text.
+    items: List[Union[str, Dict[str, str]]]
+    concurrency: Optional[int] = None
+
 class ExecutionCreate(ExecutionBase):
     pass
\ No newline at end of file
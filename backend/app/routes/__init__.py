@@ -1,12 +1,18 @@
+from app.config import settings
 from app.custom_fastapi import CustomFastAPI
 
 from app.routes.auth import auth_router
 from app.routes.workflow import workflow_router
 from app.routes.execution import execution_router
+from app.routes.metrics import metrics_router
+from app.routes.health import health_router
 
 def init_routes(app: CustomFastAPI):
     """Initiate routes in the app state"""
 
     app.include_router(auth_router)
     app.include_router(workflow_router)
-    app.include_router(execution_router)
\ No newline at end of file
+    app.include_router(execution_router)
+    app.include_router(health_router)
+    if settings.METRICS_ENABLED:
+        app.include_router(metrics_router)
\ No newline at end of file
@@ -1,29 +1,29 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models import schemas
-from app.utils.database import get_db
+from app.utils.database import get_async_db
 from app.utils.app_utils import get_app
 from app.utils.exceptions import EmailAlreadyExistsError
 
 auth_router = APIRouter(prefix="/auth", tags=["auth"])
 
 @auth_router.post("/signup", response_model=schemas.User)
-def create_user(user: schemas.UserCreate, db: Session = Depends(get_db)):
+async def create_user(user: schemas.UserCreate, db: AsyncSession = Depends(get_async_db)):
     app = get_app()
 
-    db_user = app.auth_handler.get_user_by_email(db, email=user.email)
+    db_user = await app.auth_handler.get_user_by_email(db, email=user.email)
     if db_user:
         raise EmailAlreadyExistsError()
     
-    return app.auth_handler.create_user(db=db, user=user)
+    return await app.auth_handler.create_user(db=db, user=user)
 
 @auth_router.post("/token", response_model=schemas.Token)
-def login_for_access_token(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
+async def login_for_access_token(form_data: OAuth2PasswordRequestForm = Depends(), db: AsyncSession = Depends(get_async_db)):
     app = get_app()
 
-    token_data = app.auth_service.login_for_access_token(form_data, db)
+    token_data = await app.auth_service.login_for_access_token(form_data, db)
     if not token_data:
         raise HTTPException( 
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -1,59 +1,194 @@
-from fastapi import APIRouter, Depends, BackgroundTasks
-from sqlalchemy.orm import Session
-from typing import List
+from fastapi import APIRouter, Depends, BackgroundTasks, File, Query, Request, UploadFile
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional
 
-from app.models import models, schemas
+from app.models import schemas
 from app.utils.auth import get_current_user
-from app.utils.database import get_db
+from app.utils.database import get_async_db
 from app.utils.app_utils import get_app
 
 execution_router = APIRouter(prefix="/execution", tags=["execution"])
 
 @execution_router.post("/workflow/{workflow_id}")
-def execute_workflow(
+async def execute_workflow(
     workflow_id: int,
     background_tasks: BackgroundTasks,
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user)
+    rerun_from: Optional[str] = Query(None, description="Re-execute only this node and its downstream"),
+    from_execution: Optional[int] = Query(None, description="Completed execution the other outputs come from; defaults to the latest"),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: schemas.Principal = Depends(get_current_user)
 ):
+    """
+    Start an execution. Nodes whose config and inputs are unchanged since a
+    recent completed execution reuse its output instead of running again;
+    Gemini nodes only when the response cache is on or they set `cache: true`.
+    """
     app = get_app()
-    return app.execution_service.execute_workflow(
+    return await app.execution_service.execute_workflow(
         workflow_id=workflow_id,
         user_id=current_user.id,
         background_tasks=background_tasks,
+        rerun_from=rerun_from,
+        from_execution=from_execution,
         db=db
     )
 
-@execution_router.get("/workflow/{workflow_id}", response_model=List[schemas.Execution])
-def get_workflow_executions_list(
+@execution_router.post("/workflow/{workflow_id}/batch")
+async def execute_workflow_batch(
     workflow_id: int,
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user)
+    batch: schemas.BatchExecutionRequest,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: schemas.Principal = Depends(get_current_user)
 ):
     """
-    Retrieve a list of all executions for a specific workflow owned by the current user.
+    Run a workflow once per item. Streams one JSON line per execution
+    ({index, execution_id, status, results}) in the order they finish.
     """
     app = get_app()
-    return app.execution_service.get_workflow_executions(
+    stream = await app.execution_service.execute_batch(
         workflow_id=workflow_id,
         user_id=current_user.id,
+        items=batch.items,
+        concurrency=batch.concurrency,
         db=db
     )
+    return StreamingResponse(stream, media_type="application/x-ndjson")
 
+@execution_router.post("/workflow/{workflow_id}/batch/upload")
+async def upload_workflow_batch(
+    workflow_id: int,
+    file: UploadFile = File(...),
+    concurrency: Optional[int] = Query(None, ge=1),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: schemas.Principal = Depends(get_current_user)
+):
+    """
+    Same as /batch with the items read from an uploaded JSONL file, one
+    string or object per line.
+    """
+    app = get_app()
+    items = app.execution_service.parse_batch_file(await file.read())
+    stream = await app.execution_service.execute_batch(
+        workflow_id=workflow_id,
+        user_id=current_user.id,
+        items=items,
+        concurrency=concurrency,
+        db=db
+    )
+    return StreamingResponse(stream, media_type="application/x-ndjson")
+
+@execution_router.get("/workflow/{workflow_id}", response_model=schemas.ExecutionPage)
+async def get_workflow_executions_list(
+    workflow_id: int,
+    limit: int = Query(50, ge=1, le=500),
+    cursor: Optional[str] = None,
+    include_results: bool = False,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: schemas.Principal = Depends(get_current_user)
+):
+    """
+    Retrieve a page of executions for a specific workflow owned by the current user, newest first.
+    Items are summaries without results unless include_results is set, in which case large node outputs
+    appear as blob references; pass next_cursor back to continue.
+    """
+    app = get_app()
+    return await app.execution_service.get_workflow_executions(
+        workflow_id=workflow_id,
+        user_id=current_user.id,
+        limit=limit,
+        cursor=cursor,
+        include_results=include_results,
+        db=db
+    )
+
+@execution_router.get("/cache/stats")
+async def get_response_cache_stats(current_user: schemas.Principal = Depends(get_current_user)):
+    """
+    Hit, miss and eviction counters of the Gemini response cache in this process.
+    """
+    app = get_app()
+    return app.execution_service.get_response_cache_stats()
 
 @execution_router.get("/{execution_id}", response_model=schemas.Execution)
-def get_single_execution_details(
+async def get_single_execution_details(
     execution_id: int,
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user)
+    request: Request,
+    resolve_results: bool = True,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: schemas.Principal = Depends(get_current_user)
 ):
     """
     Retrieve the details of a single execution, ensuring it belongs to a workflow
-    owned by the current user.
+    owned by the current user. Large node outputs are loaded from the blob store
+    unless resolve_results is false, in which case they stay as {"$blob": ...}
+    references that /{execution_id}/results/{node_id} fetches one at a time.
+    Responses carry ETag and Last-Modified; conditional requests get 304 while
+    the execution is unchanged.
     """
     app = get_app()
-    return app.execution_service.get_execution_details(
+    return await app.execution_service.get_execution_response(
         execution_id=execution_id,
         user_id=current_user.id,
+        request=request,
+        resolve_results=resolve_results,
         db=db
-    )
\ No newline at end of file
+    )
+
+@execution_router.get("/{execution_id}/results/{node_id}")
+async def get_node_result(
+    execution_id: int,
+    node_id: str,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: schemas.Principal = Depends(get_current_user)
+):
+    """
+    Retrieve one node's output of an execution, as {execution_id, node_id, output}.
+    """
+    app = get_app()
+    return await app.execution_service.get_node_result(
+        execution_id=execution_id,
+        node_id=node_id,
+        user_id=current_user.id,
+        db=db
+    )
+
+@execution_router.post("/{execution_id}/cancel")
+async def cancel_execution(
+    execution_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: schemas.Principal = Depends(get_current_user)
+):
+    """
+    Cancel a pending or running execution. In-flight nodes are stopped and
+    the execution ends as CANCELLED; finished executions answer 409.
+    """
+    app = get_app()
+    return await app.execution_service.cancel_execution(
+        execution_id=execution_id,
+        user_id=current_user.id,
+        db=db
+    )
+
+@execution_router.get("/{execution_id}/stream")
+async def stream_execution_progress(
+    execution_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: schemas.Principal = Depends(get_current_user)
+):
+    """
+    Stream the progress of an execution as Server-Sent Events: node_started,
+    token, node_completed and finally execution_completed, execution_failed,
+    execution_cancelled or execution_timed_out.
+    """
+    app = get_app()
+    events = await app.execution_service.stream_execution(
+        execution_id=execution_id,
+        user_id=current_user.id,
+        db=db
+    )
+    return StreamingResponse(
+        events,
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
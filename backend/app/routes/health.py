@@ -0,0 +1,25 @@
+from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+
+from app.utils.app_utils import get_app
+from app.utils.health import readiness_checks
+
+health_router = APIRouter(prefix="/health", tags=["health"])
+
+@health_router.get("/live")
+def live():
+    """The process is up and serving requests"""
+    return {"status": "ok"}
+
+@health_router.get("/ready")
+async def ready():
+    """
+    Whether this process should get traffic: the database answers, the
+    schema is migrated and the worker is not being recycled. 503 otherwise.
+    """
+    checks = await readiness_checks(get_app())
+    is_ready = all(result == "ok" for result in checks.values())
+    return JSONResponse(
+        {"status": "ready" if is_ready else "unavailable", "checks": checks},
+        status_code=200 if is_ready else 503,
+    )
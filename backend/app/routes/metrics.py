@@ -0,0 +1,10 @@
+from fastapi import APIRouter, Response
+
+from app.utils.metrics import render_metrics
+
+metrics_router = APIRouter(tags=["metrics"])
+
+@metrics_router.get("/metrics", include_in_schema=False)
+def metrics():
+    body, content_type = render_metrics()
+    return Response(content=body, media_type=content_type)
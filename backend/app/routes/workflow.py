@@ -1,54 +1,64 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
 from typing import List
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.models import schemas, models
+from app.models import schemas
 from app.utils.auth import get_current_user
-from app.utils.database import get_db
+from app.utils.database import get_async_db
 from app.utils.app_utils import get_app
 
 workflow_router = APIRouter(prefix="/workflow", tags=["workflow"])
 
 @workflow_router.post("/", response_model=schemas.Workflow)
-def create_workflow(
+async def create_workflow(
     workflow: schemas.WorkflowCreate,
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: schemas.Principal = Depends(get_current_user)
 ):
     app = get_app()
-    return app.workflow_service.create_workflow(workflow=workflow, user_id=current_user.id, db=db)
+    return await app.workflow_service.create_workflow(workflow=workflow, user_id=current_user.id, db=db)
 
 @workflow_router.get("/", response_model=List[schemas.Workflow])
-def read_workflows(
+async def read_workflows(
+    request: Request,
+    response: Response,
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: schemas.Principal = Depends(get_current_user)
 ):
+    """Returns an ETag; send it back as If-None-Match to get 304 while the page is unchanged."""
     app = get_app()
-    return app.workflow_service.get_workflows(user_id=current_user.id, skip=skip, limit=limit, db=db)
+    return await app.workflow_service.get_workflows(
+        user_id=current_user.id, skip=skip, limit=limit, request=request, response=response, db=db
+    )
 
 @workflow_router.get("/{workflow_id}", response_model=schemas.Workflow)
-def read_workflow(
+async def read_workflow(
     workflow_id: int,
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user)
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: schemas.Principal = Depends(get_current_user)
 ):
+    """Returns ETag and Last-Modified; conditional requests get 304 while the workflow is unchanged."""
     app = get_app()
-    workflow = app.workflow_service.get_workflow_by_id(workflow_id=workflow_id, user_id=current_user.id, db=db)
+    workflow = await app.workflow_service.get_workflow_by_id(
+        workflow_id=workflow_id, user_id=current_user.id, request=request, response=response, db=db
+    )
     if not workflow:
         raise HTTPException(status_code=404, detail="Workflow not found")
     return workflow
 
 @workflow_router.put("/{workflow_id}", response_model=schemas.Workflow)
-def update_workflow(
+async def update_workflow(
     workflow_id: int,
     workflow_data: schemas.WorkflowCreate,
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: schemas.Principal = Depends(get_current_user)
 ):
     app = get_app()
-    workflow = app.workflow_service.update_workflow(
+    workflow = await app.workflow_service.update_workflow(
         workflow_id=workflow_id,
         user_id=current_user.id,
         workflow_data=workflow_data,
@@ -1,10 +1,10 @@
 from datetime import timedelta
 from fastapi import Depends
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.config import settings
-from app.utils.auth import create_access_token, verify_password
-from app.utils.database import get_db
+from app.utils.auth import create_access_token, principal_claims
+from app.utils.database import get_async_db
 from app.utils.app_utils import get_app
 from app.utils.exceptions import InvalidCredentialsError
 
@@ -12,14 +12,14 @@ class AuthService:
     def __init__(self):
         pass
 
-    def login_for_access_token(self, form_data, db: Session = Depends(get_db)):
+    async def login_for_access_token(self, form_data, db: AsyncSession = Depends(get_async_db)):
         app = get_app()
-        user = app.auth_handler.get_user_by_email(db, email=form_data.username)
-        if not user or not verify_password(form_data.password, user.hashed_password):
+        user = await app.auth_handler.authenticate_user(db, email=form_data.username, password=form_data.password)
+        if not user:
             raise InvalidCredentialsError()
         
         access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
         access_token = create_access_token(
-            data={"sub": user.email}, expires_delta=access_token_expires
+            data=principal_claims(user), expires_delta=access_token_expires
         )
         return {"access_token": access_token, "token_type": "bearer"}
\ No newline at end of file
@@ -1,43 +1,235 @@
-from fastapi import HTTPException, status, BackgroundTasks, Depends
-from sqlalchemy.orm import Session
+import json
+from typing import Any, List, Optional
+from fastapi import HTTPException, status, BackgroundTasks, Depends, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.utils.database import get_db
+from app.config import settings
+from app.engine.events import format_sse
+from app.utils.database import get_async_db
 from app.utils.app_utils import get_app
-from app.utils.exceptions import WorkflowNotFoundError, ExecutionNotFoundError
+from app.models.models import TERMINAL_EXECUTION_STATUSES, ExecutionStatus
+from app.utils.exceptions import ExecutionNotCancellableError, InvalidBatchInputError, InvalidRerunRequestError, WorkflowNotFoundError, ExecutionNotFoundError, NodeResultNotFoundError
+from app.utils.http_cache import cache_headers, is_not_modified, make_etag, not_modified_response
+from app.utils.serialization import dumps, json_array, json_object
 
 class ExecutionService:
     def __init__(self):
         pass
 
-    def execute_workflow(self, workflow_id: int, user_id: int, background_tasks: BackgroundTasks, db: Session = Depends(get_db)):
+    async def execute_workflow(
+        self,
+        workflow_id: int,
+        user_id: int,
+        background_tasks: BackgroundTasks,
+        rerun_from: Optional[str] = None,
+        from_execution: Optional[int] = None,
+        db: AsyncSession = Depends(get_async_db),
+    ):
+        """
+        Starts an execution. With `rerun_from`, only that node and its
+        downstream run again; everything else is taken from `from_execution`,
+        or from the workflow's latest completed execution.
+        """
         app = get_app()
 
-        workflow = app.workflow_handler.get_workflow_by_id(db, workflow_id, user_id)
+        workflow = await app.workflow_handler.get_workflow_by_id(db, workflow_id, user_id)
         if not workflow:
             raise WorkflowNotFoundError()
+
+        # Compiling here (or hitting the plan cache) rejects unrunnable graphs before a PENDING row is created.
+        plan = app.execution_handler.get_plan(workflow)
+        parent_execution_id = None
+        if rerun_from is not None:
+            if rerun_from not in plan.graph.nodes:
+                raise InvalidRerunRequestError(f"Node {rerun_from} is not part of the workflow")
+            parent_execution_id = await app.execution_handler.get_rerun_base(db, workflow_id, from_execution)
+            if parent_execution_id is None:
+                raise InvalidRerunRequestError("No completed execution of this workflow to rerun from")
+        elif from_execution is not None:
+            raise InvalidRerunRequestError("from_execution requires rerun_from")
+        execution = await app.execution_handler.create_execution_entry(db, workflow_id, rerun_from, parent_execution_id)
         
-        execution = app.execution_handler.create_execution_entry(db, workflow_id)
-        
-        background_tasks.add_task(app.execution_handler.run_workflow, workflow_id, execution.id)
+        # With EXECUTION_BACKEND=queue the PENDING row is claimed by a worker process (worker.py).
+        if settings.EXECUTION_BACKEND == "background":
+            if settings.EXECUTION_MODE == "async":
+                background_tasks.add_task(app.execution_handler.arun_workflow, workflow_id, execution.id)
+            else:
+                background_tasks.add_task(app.execution_handler.run_workflow, workflow_id, execution.id)
         
         return {"message": "Workflow execution started", "execution_id": execution.id}
     
-    def get_workflow_executions(self, workflow_id: int, user_id: int, db: Session = Depends(get_db)):
-        """Service to get all executions for a specific workflow"""
+    async def execute_batch(
+        self,
+        workflow_id: int,
+        user_id: int,
+        items: List[Any],
+        concurrency: Optional[int] = None,
+        db: AsyncSession = Depends(get_async_db),
+    ):
+        """
+        Creates one execution per item in a single insert and returns a
+        generator of JSON lines, one per execution as it finishes.
+        """
+        app = get_app()
+
+        workflow = await app.workflow_handler.get_workflow_by_id(db, workflow_id, user_id)
+        if not workflow:
+            raise WorkflowNotFoundError()
+        if not items:
+            raise InvalidBatchInputError("Batch has no items")
+        if len(items) > settings.BATCH_MAX_ITEMS:
+            raise InvalidBatchInputError(f"Batch has {len(items)} items; the limit is {settings.BATCH_MAX_ITEMS}")
+
+        plan = app.execution_handler.get_plan(workflow)
+        inputs = app.execution_handler.resolve_batch_inputs(plan, items)
+        concurrency = max(1, min(concurrency or settings.BATCH_CONCURRENCY, settings.BATCH_CONCURRENCY))
+
+        # Batches run inside this request, except with EXECUTION_BACKEND=queue where workers pick the rows up.
+        queued = settings.EXECUTION_BACKEND == "queue"
+        execution_ids = await app.execution_handler.create_batch_entries(
+            db, workflow_id, inputs, ExecutionStatus.PENDING if queued else ExecutionStatus.RUNNING
+        )
+        if queued:
+            outcomes = app.execution_handler.await_batch(execution_ids)
+        else:
+            outcomes = app.execution_handler.arun_batch(plan, list(zip(execution_ids, inputs)), concurrency)
+
+        async def jsonl():
+            async for outcome in outcomes:
+                yield json.dumps(outcome, default=str) + "\n"
+
+        return jsonl()
+
+    def parse_batch_file(self, content: bytes) -> List[Any]:
+        """Reads a JSONL upload: one item (string or object) per line, blank lines ignored"""
+        items = []
+        try:
+            lines = content.decode("utf-8").splitlines()
+        except UnicodeDecodeError:
+            raise InvalidBatchInputError("Batch file must be UTF-8 encoded JSONL")
+        for line_number, line in enumerate(lines, start=1):
+            if not line.strip():
+                continue
+            try:
+                items.append(json.loads(line))
+            except json.JSONDecodeError as e:
+                raise InvalidBatchInputError(f"Line {line_number} is not valid JSON: {e.msg}")
+        return items
+
+    async def get_workflow_executions(
+        self,
+        workflow_id: int,
+        user_id: int,
+        limit: int = 50,
+        cursor: Optional[str] = None,
+        include_results: bool = False,
+        db: AsyncSession = Depends(get_async_db),
+    ):
+        """Service to get a page of executions for a specific workflow"""
         app = get_app()
         
-        workflow = app.workflow_handler.get_workflow_by_id(db, workflow_id, user_id)
+        workflow = await app.workflow_handler.get_workflow_by_id(db, workflow_id, user_id)
         if not workflow:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Workflow not found")
         
-        return app.execution_handler.get_executions_by_workflow_id(db, workflow_id, user_id)
+        items, next_cursor = await app.execution_handler.get_executions_page(
+            db, workflow_id, user_id, limit, cursor=cursor, include_results=include_results
+        )
+        if not include_results:
+            return {"items": items, "next_cursor": next_cursor}
+        # Results pages are assembled from the stored JSON instead of validating and re-encoding every row.
+        body = json_object((
+            ("items", json_array(app.execution_handler.execution_json(row) for row in items)),
+            ("next_cursor", dumps(next_cursor)),
+        ))
+        return Response(content=body, media_type="application/json")
 
-    def get_execution_details(self, execution_id: int, user_id: int, db: Session = Depends(get_db)):
-        """Service to get the details of a single execution"""
+    async def get_execution_response(
+        self,
+        execution_id: int,
+        user_id: int,
+        request: Request,
+        resolve_results: bool = True,
+        db: AsyncSession = Depends(get_async_db),
+    ) -> Response:
+        """
+        Serves GET /execution/{id} with ETag / Last-Modified validators taken
+        from the row's status and updated_at, so a conditional poll costs one
+        narrow query and no serialisation. Finished executions never change,
+        so their serialised body is kept and served without touching the
+        database at all.
+        """
         app = get_app()
-        
-        execution = app.execution_handler.get_execution_by_id(db, execution_id, user_id)
+        cache_key = (user_id, execution_id, resolve_results)
+
+        cached = app.execution_handler.responses.get(cache_key)
+        if cached is not None:
+            etag, last_modified, body = cached
+        else:
+            current = await app.execution_handler.get_execution_version(db, execution_id, user_id)
+            if current is None:
+                raise ExecutionNotFoundError()
+            etag = make_etag("execution", execution_id, current.status.value, current.updated_at.isoformat(), resolve_results)
+            last_modified = current.updated_at
+            if is_not_modified(request.headers, etag, last_modified):
+                return not_modified_response(cache_headers(etag, last_modified))
+
+            row = await app.execution_handler.get_execution_document(db, execution_id, user_id)
+            if row is None:
+                raise ExecutionNotFoundError()
+            results = await app.execution_handler.resolve_results_json(row.results) if resolve_results else None
+            body = app.execution_handler.execution_json(row, results)
+            # The row may have moved on since the version query; only cache what was actually served as final.
+            if row.status in TERMINAL_EXECUTION_STATUSES and row.updated_at == current.updated_at:
+                app.execution_handler.responses.put(cache_key, etag, last_modified, body)
+
+        headers = cache_headers(etag, last_modified)
+        if is_not_modified(request.headers, etag, last_modified):
+            return not_modified_response(headers)
+        return Response(content=body, media_type="application/json", headers=headers)
+
+    async def cancel_execution(self, execution_id: int, user_id: int, db: AsyncSession = Depends(get_async_db)):
+        """Service to cancel an execution the user owns"""
+        app = get_app()
+
+        execution = await app.execution_handler.get_execution_by_id(db, execution_id, user_id)
         if not execution:
             raise ExecutionNotFoundError()
-        
-        return execution
\ No newline at end of file
+        if execution.status in TERMINAL_EXECUTION_STATUSES:
+            raise ExecutionNotCancellableError(f"Execution has already finished as {execution.status.value}")
+
+        previous = await app.execution_handler.cancel_execution(db, execution_id)
+        return {"message": "Execution cancelled", "execution_id": execution_id, "previous_status": previous.value}
+
+    async def get_node_result(self, execution_id: int, node_id: str, user_id: int, db: AsyncSession = Depends(get_async_db)):
+        """Service to get one node's output of an execution"""
+        app = get_app()
+
+        execution = await app.execution_handler.get_execution_by_id(db, execution_id, user_id)
+        if not execution:
+            raise ExecutionNotFoundError()
+        results = execution.results or {}
+        if node_id not in results:
+            raise NodeResultNotFoundError()
+
+        output = await app.execution_handler.load_result(results[node_id], node_id)
+        return {"execution_id": execution_id, "node_id": node_id, "output": output}
+
+    async def stream_execution(self, execution_id: int, user_id: int, db: AsyncSession = Depends(get_async_db)):
+        """Service to stream the progress of a single execution as Server-Sent Events"""
+        app = get_app()
+
+        execution = await app.execution_handler.get_execution_by_id(db, execution_id, user_id)
+        if not execution:
+            raise ExecutionNotFoundError()
+
+        async def event_stream():
+            async for event in app.execution_handler.stream_events(execution_id):
+                yield format_sse(event)
+
+        return event_stream()
+
+    def get_response_cache_stats(self):
+        """Service to report the Gemini response cache counters"""
+        app = get_app()
+        return app.gemini_client.cache_stats()
@@ -1,26 +1,65 @@
-from sqlalchemy.orm import Session
-from fastapi import Depends
+from typing import Optional
+from sqlalchemy.ext.asyncio import AsyncSession
+from fastapi import Depends, Request, Response
 
 from app.models import schemas
-from app.utils.database import get_db
+from app.utils.database import get_async_db
 from app.utils.app_utils import get_app
+from app.utils.http_cache import cache_headers, is_not_modified, make_etag, not_modified_response
 
 class WorkflowService:
     def __init__(self):
         pass
 
-    def create_workflow(self, workflow: schemas.WorkflowCreate, user_id: int, db: Session = Depends(get_db)):
+    async def create_workflow(self, workflow: schemas.WorkflowCreate, user_id: int, db: AsyncSession = Depends(get_async_db)):
         app = get_app()
-        return app.workflow_handler.create_workflow(db, workflow, user_id)
+        return await app.workflow_handler.create_workflow(db, workflow, user_id)
 
-    def get_workflows(self, user_id: int, skip: int, limit: int, db: Session = Depends(get_db)):
+    async def get_workflows(
+        self,
+        user_id: int,
+        skip: int,
+        limit: int,
+        request: Optional[Request] = None,
+        response: Optional[Response] = None,
+        db: AsyncSession = Depends(get_async_db),
+    ):
+        """
+        With a request, the page's ETag is computed from the ids and versions
+        alone and a matching If-None-Match is answered with 304 before any
+        graph is loaded.
+        """
         app = get_app()
-        return app.workflow_handler.get_workflows(db, user_id, skip, limit)
+        if request is not None:
+            versions = await app.workflow_handler.get_workflow_versions(db, user_id, skip, limit)
+            etag = make_etag("workflows", user_id, skip, limit, *(f"{row.id}:{row.version}" for row in versions))
+            headers = cache_headers(etag)
+            if is_not_modified(request.headers, etag):
+                return not_modified_response(headers)
+            response.headers.update(headers)
+        return await app.workflow_handler.get_workflows(db, user_id, skip, limit)
     
-    def get_workflow_by_id(self, workflow_id: int, user_id: int, db: Session = Depends(get_db)):
+    async def get_workflow_by_id(
+        self,
+        workflow_id: int,
+        user_id: int,
+        request: Optional[Request] = None,
+        response: Optional[Response] = None,
+        db: AsyncSession = Depends(get_async_db),
+    ):
+        """Like get_workflows, answers a matching If-None-Match / If-Modified-Since with 304"""
         app = get_app()
-        return app.workflow_handler.get_workflow_by_id(db, workflow_id, user_id)
+        if request is not None:
+            current = await app.workflow_handler.get_workflow_version(db, workflow_id, user_id)
+            if current is None:
+                return None
+            etag = make_etag("workflow", workflow_id, current.version)
+            headers = cache_headers(etag, current.updated_at)
+            if is_not_modified(request.headers, etag, current.updated_at):
+                return not_modified_response(headers)
+            response.headers.update(headers)
+        return await app.workflow_handler.get_workflow_by_id(db, workflow_id, user_id)
     
-    def update_workflow(self, workflow_id: int, user_id: int, workflow_data: schemas.WorkflowCreate, db: Session = Depends(get_db)):
+    async def update_workflow(self, workflow_id: int, user_id: int, workflow_data: schemas.WorkflowCreate, db: AsyncSession = Depends(get_async_db)):
         app = get_app()
-        return app.workflow_handler.update_workflow(db, workflow_id, user_id, workflow_data)
\ No newline at end of file
+        return await app.workflow_handler.update_workflow(db, workflow_id, user_id, workflow_data)
@@ -1,4 +1,42 @@
+import threading
+from contextlib import contextmanager
+from typing import Optional
+
 from app.custom_fastapi import CustomFastAPI
 
-def get_app():
-    return CustomFastAPI()
\ No newline at end of file
+_app: Optional[CustomFastAPI] = None
+_app_lock = threading.RLock()
+
+def set_app(app: Optional[CustomFastAPI]):
+    """Register the process-wide application instance"""
+    global _app
+    with _app_lock:
+        _app = app
+
+def get_app() -> CustomFastAPI:
+    """
+    Returns the process-wide application. Services, handlers and external clients
+    are built once by create_app() and shared by every request.
+    """
+    if _app is None:
+        with _app_lock:
+            if _app is None:
+                from app import create_app
+                create_app()
+    return _app
+
+@contextmanager
+def override_app(**overrides):
+    """
+    Temporarily replaces registered services, handlers or clients, e.g.
+    `with override_app(gemini_client=StubClient()): ...` in tests and benchmarks.
+    """
+    app = get_app()
+    originals = {name: getattr(app, name) for name in overrides}
+    for name, value in overrides.items():
+        setattr(app, name, value)
+    try:
+        yield app
+    finally:
+        for name, value in originals.items():
+            setattr(app, name, value)
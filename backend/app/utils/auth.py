@@ -1,13 +1,24 @@
+import threading
 from datetime import datetime, timedelta, timezone
 from typing import Optional
-from fastapi import Request, HTTPException, status
-from jose import jwt
-from passlib.context import CryptContext
+from cachetools import TTLCache
+from fastapi import Depends, HTTPException, status
+from fastapi.security import OAuth2PasswordBearer
+from jose import jwt, JWTError
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.config import settings
-from app.models import models
+from app.models import models, schemas
+from app.utils.database import AsyncSessionLocal, get_async_db
+from app.utils.password_hasher import build_crypt_context
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+pwd_context = build_crypt_context(settings.PASSWORD_HASH_ROUNDS)
+
+oauth2_scheme = OAuth2PasswordBearer(tokenUrl='auth/token', auto_error=False)
+
+_principal_cache = TTLCache(maxsize=settings.AUTH_PRINCIPAL_CACHE_SIZE, ttl=settings.AUTH_PRINCIPAL_CACHE_TTL_SECONDS)
+_principal_cache_lock = threading.Lock()
 
 def verify_password(plain_password, hashed_password):
     return pwd_context.verify(plain_password, hashed_password)
@@ -25,11 +36,75 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
     return encoded_jwt
 
-def get_current_user(request: Request) -> models.User:
-    if not hasattr(request.state, "user") or request.state.user is None:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Not authenticated",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
-    return request.state.user
\ No newline at end of file
+def principal_claims(user: models.User) -> dict:
+    """Token claims identifying the user; `active` is informational, see get_current_user"""
+    return {"sub": user.email, "uid": user.id, "active": bool(user.is_active)}
+
+def invalidate_principal(email: str):
+    """Drops a cached principal; call whenever a user row changes"""
+    with _principal_cache_lock:
+        _principal_cache.pop(email, None)
+
+async def _load_principal(email: str) -> Optional[schemas.Principal]:
+    with _principal_cache_lock:
+        principal = _principal_cache.get(email)
+    if principal is not None:
+        return principal
+
+    async with AsyncSessionLocal() as db:
+        row = (await db.execute(
+            select(models.User.id, models.User.email, models.User.is_active).where(models.User.email == email)
+        )).first()
+    if row is None:
+        return None
+
+    principal = schemas.Principal(id=row.id, email=row.email, is_active=row.is_active is not False)
+    with _principal_cache_lock:
+        _principal_cache[email] = principal
+    return principal
+
+def _credentials_error(detail: str = "Not authenticated") -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail=detail,
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+
+async def get_current_user(token: Optional[str] = Depends(oauth2_scheme)) -> schemas.Principal:
+    """
+    Resolves the caller from the bearer token through a small TTL cache of
+    principals in front of the users table, so most requests need no
+    database access. Whether the user is active comes from that cache, not
+    from the token: a deactivated user is refused within
+    AUTH_PRINCIPAL_CACHE_TTL_SECONDS (at once in the process that calls
+    invalidate_principal) rather than when the token expires.
+    """
+    if not token:
+        raise _credentials_error()
+    try:
+        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+    except JWTError:
+        raise _credentials_error()
+
+    email = payload.get("sub")
+    if not email:
+        raise _credentials_error()
+
+    principal = await _load_principal(email)
+    # A token for a deleted account must not carry over to a new one with the same email.
+    if principal is None or payload.get("uid", principal.id) != principal.id:
+        raise _credentials_error()
+
+    if not principal.is_active:
+        raise _credentials_error("Inactive user")
+    return principal
+
+async def get_current_user_model(
+    principal: schemas.Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+) -> models.User:
+    """For routes that need the full User row rather than just the caller's identity"""
+    user = await db.get(models.User, principal.id)
+    if user is None:
+        raise _credentials_error()
+    return user
@@ -17,6 +17,11 @@ class EmailAlreadyExistsError(AppError):
     def __init__(self, detail: str = "Email is already registered"):
         super().__init__(status_code=status.HTTP_400_BAD_REQUEST, detail=detail)
 
+class PasswordHasherBusyError(AppError):
+    def __init__(self, detail: str = "Too many authentication requests, retry shortly"):
+        super().__init__(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=detail)
+        self.headers = {"Retry-After": "1"}
+
 class WorkflowNotFoundError(AppError):
     def __init__(self, detail: str = "Workflow not found"):
         super().__init__(status_code=status.HTTP_404_NOT_FOUND, detail=detail)
@@ -25,9 +30,33 @@ class ExecutionNotFoundError(AppError):
     def __init__(self, detail: str = "Execution not found"):
         super().__init__(status_code=status.HTTP_404_NOT_FOUND, detail=detail)
 
+class NodeResultNotFoundError(AppError):
+    def __init__(self, detail: str = "Node result not found"):
+        super().__init__(status_code=status.HTTP_404_NOT_FOUND, detail=detail)
+
+class InvalidCursorError(AppError):
+    def __init__(self, detail: str = "Invalid pagination cursor"):
+        super().__init__(status_code=status.HTTP_400_BAD_REQUEST, detail=detail)
+
+class InvalidBatchInputError(AppError):
+    def __init__(self, detail: str = "Invalid batch input"):
+        super().__init__(status_code=status.HTTP_400_BAD_REQUEST, detail=detail)
+
+class InvalidRerunRequestError(AppError):
+    def __init__(self, detail: str = "Invalid rerun request"):
+        super().__init__(status_code=status.HTTP_400_BAD_REQUEST, detail=detail)
+
+class ExecutionNotCancellableError(AppError):
+    def __init__(self, detail: str = "Execution has already finished"):
+        super().__init__(status_code=status.HTTP_409_CONFLICT, detail=detail)
+
+class UpstreamUnavailableError(AppError):
+    def __init__(self, detail: str = "Gemini is temporarily unavailable after repeated failures; try again shortly"):
+        super().__init__(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=detail)
+
 class WorkflowExecutionError(AppError):
-    def __init__(self, detail: str = "An error occurred during workflow execution"):
-        super().__init__(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=detail)
+    def __init__(self, detail: str = "An error occurred during workflow execution", status_code: int = status.HTTP_500_INTERNAL_SERVER_ERROR):
+        super().__init__(status_code=status_code, detail=detail)
 
 class MissingStartNodeError(WorkflowExecutionError):
     def __init__(self, detail: str = "Workflow has no defined starting point"):
@@ -35,4 +64,24 @@ class MissingStartNodeError(WorkflowExecutionError):
 
 class InvalidNodeInputError(WorkflowExecutionError):
     def __init__(self, detail: str = "A node received an invalid input type"):
-        super().__init__(status_code=status.HTTP_400_BAD_REQUEST, detail=detail)
\ No newline at end of file
+        super().__init__(status_code=status.HTTP_400_BAD_REQUEST, detail=detail)
+
+class InvalidNodeOutputError(WorkflowExecutionError):
+    def __init__(self, detail: str = "A node returned an output of the wrong type"):
+        super().__init__(detail=detail)
+
+class InvalidWorkflowGraphError(WorkflowExecutionError):
+    def __init__(self, detail: str = "Workflow graph is invalid"):
+        super().__init__(status_code=status.HTTP_400_BAD_REQUEST, detail=detail)
+
+class ExecutionCancelledError(WorkflowExecutionError):
+    def __init__(self, detail: str = "Execution was cancelled"):
+        super().__init__(status_code=status.HTTP_409_CONFLICT, detail=detail)
+
+class ExecutionTimeoutError(WorkflowExecutionError):
+    def __init__(self, detail: str = "Execution exceeded its deadline"):
+        super().__init__(status_code=status.HTTP_504_GATEWAY_TIMEOUT, detail=detail)
+
+class NodeTimeoutError(ExecutionTimeoutError):
+    def __init__(self, detail: str = "A node exceeded its deadline"):
+        super().__init__(detail=detail)
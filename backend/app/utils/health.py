@@ -0,0 +1,34 @@
+from typing import Dict
+
+from sqlalchemy import text
+from starlette.concurrency import run_in_threadpool
+
+from app.utils.database import AsyncSessionLocal, engine
+from app.utils.migrations import pending_changes
+
+_schema_current = False
+
+async def _check_database() -> str:
+    async with AsyncSessionLocal() as db:
+        await db.execute(text("SELECT 1"))
+    return "ok"
+
+async def _check_schema() -> str:
+    # Schema changes only come from `migrate.py`, so once current it stays current for this process.
+    global _schema_current
+    if not _schema_current:
+        pending = await run_in_threadpool(pending_changes, engine)
+        if pending:
+            return f"migrations pending: {', '.join(pending)}"
+        _schema_current = True
+    return "ok"
+
+async def readiness_checks(app) -> Dict[str, str]:
+    """Check name -> "ok" or the reason this process should not receive traffic"""
+    checks = {"accepting": "draining" if app.recycler.draining else "ok"}
+    for name, check in (("database", _check_database), ("schema", _check_schema)):
+        try:
+            checks[name] = await check()
+        except Exception as e:
+            checks[name] = f"error: {e}"
+    return checks
@@ -0,0 +1,78 @@
+import hashlib
+import threading
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Any, Mapping, Optional, Tuple
+
+from cachetools import LRUCache
+from fastapi import Response, status
+
+def make_etag(*parts: Any) -> str:
+    """Weak validator derived from whatever identifies the representation (ids, versions, timestamps)"""
+    digest = hashlib.sha1("|".join(map(str, parts)).encode("utf-8")).hexdigest()[:24]
+    return f'W/"{digest}"'
+
+def _opaque(tag: str) -> str:
+    tag = tag.strip()
+    return tag[2:] if tag.startswith("W/") else tag
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """Weak comparison against an If-None-Match header, which may list several tags or be '*'"""
+    if if_none_match.strip() == "*":
+        return True
+    return any(_opaque(tag) == _opaque(etag) for tag in if_none_match.split(","))
+
+def _utc(value: datetime) -> datetime:
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value.astimezone(timezone.utc)
+
+def is_not_modified(headers: Mapping[str, str], etag: str, last_modified: Optional[datetime] = None) -> bool:
+    """If-None-Match wins when present; If-Modified-Since is only consulted without it (RFC 9110)"""
+    if_none_match = headers.get("if-none-match")
+    if if_none_match is not None:
+        return etag_matches(if_none_match, etag)
+
+    if_modified_since = headers.get("if-modified-since")
+    if if_modified_since and last_modified is not None:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        return _utc(last_modified).replace(microsecond=0) <= _utc(since)
+    return False
+
+def cache_headers(etag: str, last_modified: Optional[datetime] = None) -> dict:
+    # Responses are per user, and clients must revalidate rather than reuse them blindly.
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if last_modified is not None:
+        headers["Last-Modified"] = format_datetime(_utc(last_modified), usegmt=True)
+    return headers
+
+def not_modified_response(headers: dict) -> Response:
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+class SerializedResponseCache:
+    """
+    LRU of already-serialised response bodies for representations that can no
+    longer change (terminal executions). Entries are (etag, last_modified, body).
+    Keys must include the caller, since bodies are only valid for their owner.
+    """
+    def __init__(self, max_entries: int):
+        self._entries: LRUCache = LRUCache(maxsize=max(1, max_entries))
+        self._lock = threading.Lock()
+        self.enabled = max_entries > 0
+
+    def get(self, key: Tuple) -> Optional[Tuple[str, Optional[datetime], bytes]]:
+        if not self.enabled:
+            return None
+        with self._lock:
+            return self._entries.get(key)
+
+    def put(self, key: Tuple, etag: str, last_modified: Optional[datetime], body: bytes):
+        if not self.enabled:
+            return
+        with self._lock:
+            self._entries[key] = (etag, last_modified, body)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
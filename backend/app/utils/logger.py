@@ -1,7 +1,124 @@
+import atexit
+import json
 import logging
+import logging.handlers
+import queue
+import random
+import reprlib
 import sys
 import os
-from typing import Optional
+from datetime import datetime, timezone
+from typing import List, Optional
+
+from app.config import settings
+
+# Attributes every LogRecord has; anything else was passed through `extra=` and is kept as a field.
+_RECORD_ATTRIBUTES = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime"}
+
+_listeners: List[logging.handlers.QueueListener] = []
+
+class _ShortRepr(reprlib.Repr):
+    def __init__(self, max_chars: int):
+        super().__init__()
+        self.maxstring = self.maxother = self.maxlong = max_chars
+        self.maxdict = self.maxlist = self.maxtuple = self.maxset = self.maxfrozenset = self.maxdeque = 50
+        self.maxlevel = 4
+
+def truncate(text: str, max_chars: int) -> str:
+    if max_chars <= 0 or len(text) <= max_chars:
+        return text
+    return f"{text[:max_chars]}...[{len(text) - max_chars} more chars]"
+
+class TruncatingFormatter(logging.Formatter):
+    """
+    Renders the message with every argument capped at `max_chars` (containers
+    through a bounded repr, so a large result dict is never fully rendered),
+    then caps the message itself.
+    """
+    def __init__(self, fmt: Optional[str] = None, datefmt: Optional[str] = None, max_chars: int = 0):
+        super().__init__(fmt, datefmt)
+        self.max_chars = max_chars
+        self._repr = _ShortRepr(max_chars) if max_chars > 0 else None
+
+    def _shorten(self, arg):
+        if isinstance(arg, str):
+            return truncate(arg, self.max_chars)
+        if arg is None or isinstance(arg, (bool, int, float)):
+            return arg
+        return self._repr.repr(arg)
+
+    def render_message(self, record: logging.LogRecord) -> str:
+        if self._repr is not None and record.args and isinstance(record.args, tuple):
+            message = str(record.msg) % tuple(self._shorten(arg) for arg in record.args)
+        else:
+            message = record.getMessage()
+        return truncate(message, self.max_chars)
+
+    def format(self, record: logging.LogRecord) -> str:
+        record.message = self.render_message(record)
+        if self.usesTime():
+            record.asctime = self.formatTime(record, self.datefmt)
+        text = self.formatMessage(record)
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            text = f"{text}\n{record.exc_text}"
+        return text
+
+class JsonFormatter(TruncatingFormatter):
+    """One JSON object per line: timestamp, level, logger, message, `extra=` fields and the traceback"""
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": self.render_message(record),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRIBUTES and not key.startswith("_"):
+                entry[key] = self._shorten(value) if self._repr is not None else value
+        if record.exc_info or record.exc_text:
+            entry["exc_info"] = record.exc_text or self.formatException(record.exc_info)
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+class SamplingFilter(logging.Filter):
+    """Keeps INFO and DEBUG records with probability `rate`; warnings and errors always pass"""
+    def __init__(self, rate: float):
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        return record.levelno >= logging.WARNING or self.rate >= 1 or random.random() < self.rate
+
+class DeferredQueueHandler(logging.handlers.QueueHandler):
+    """
+    Enqueues records without formatting them; the listener thread renders
+    them, so the caller pays only for creating the record. Arguments are
+    therefore rendered a moment later and must not be mutated after logging.
+    """
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        if record.exc_info:
+            # Tracebacks reference live frames; render them while they are still accurate.
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+def _restart_listeners():
+    # A forked child (process pools) inherits the queues but not the listener threads.
+    # Records still queued are the parent's, which writes them itself.
+    for listener in _listeners:
+        try:
+            while True:
+                listener.queue.get_nowait()
+        except queue.Empty:
+            pass
+        listener._thread = None
+        listener.start()
+
+def stop_logging():
+    """Drains queued records and stops the listener threads; safe to call more than once"""
+    while _listeners:
+        _listeners.pop().stop()
 
 def configure_logger(
     name: str = "app",
@@ -9,9 +126,20 @@ def configure_logger(
     log_format: Optional[str] = None,
     date_format: Optional[str] = None,
     log_to_file: bool = False,
-    log_file_path: Optional[str] = None
+    log_file_path: Optional[str] = None,
+    json_format: bool = False,
+    use_queue: bool = False,
+    max_field_chars: int = 0,
+    max_file_bytes: int = 0,
+    backup_count: int = 5,
+    sample_rate: float = 1.0,
 ) -> logging.Logger:
-
+    """
+    `json_format` writes structured JSON lines, `use_queue` moves formatting
+    and I/O to a background QueueListener, `max_field_chars` truncates large
+    payloads, `max_file_bytes` rotates the log file and `sample_rate` keeps
+    only that fraction of INFO and DEBUG records.
+    """
     if log_format is None:
         log_format = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
     if date_format is None:
@@ -22,11 +150,15 @@ def configure_logger(
     if logger.handlers:
         return logger
 
-    formatter = logging.Formatter(log_format, datefmt=date_format)
+    if json_format:
+        formatter = JsonFormatter(max_chars=max_field_chars)
+    else:
+        formatter = TruncatingFormatter(log_format, datefmt=date_format, max_chars=max_field_chars)
 
+    handlers = []
     stream_handler = logging.StreamHandler(sys.stdout)
     stream_handler.setFormatter(formatter)
-    logger.addHandler(stream_handler)
+    handlers.append(stream_handler)
 
     if log_to_file:
         if not log_file_path:
@@ -35,13 +167,45 @@ def configure_logger(
             os.makedirs(logs_dir, exist_ok=True)
             log_file_path = os.path.join(logs_dir, "app.log")
 
-        file_handler = logging.FileHandler(log_file_path, encoding='utf-8')
+        if max_file_bytes > 0:
+            file_handler = logging.handlers.RotatingFileHandler(
+                log_file_path, maxBytes=max_file_bytes, backupCount=backup_count, encoding='utf-8'
+            )
+        else:
+            file_handler = logging.FileHandler(log_file_path, encoding='utf-8')
         file_handler.setFormatter(formatter)
-        logger.addHandler(file_handler)
+        handlers.append(file_handler)
+
+    if use_queue:
+        log_queue: "queue.SimpleQueue" = queue.SimpleQueue()
+        queue_handler = DeferredQueueHandler(log_queue)
+        if sample_rate < 1:
+            queue_handler.addFilter(SamplingFilter(sample_rate))
+        logger.addHandler(queue_handler)
+        listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+        listener.start()
+        _listeners.append(listener)
+    else:
+        for handler in handlers:
+            if sample_rate < 1:
+                handler.addFilter(SamplingFilter(sample_rate))
+            logger.addHandler(handler)
 
     logger.setLevel(log_level)
     logger.propagate = False
 
     return logger
 
-logger = configure_logger("app", log_to_file=True)
\ No newline at end of file
+logger = configure_logger(
+    "app",
+    log_level=logging.getLevelName(settings.LOG_LEVEL.upper()),
+    log_to_file=True,
+    json_format=settings.LOG_FORMAT == "json",
+    use_queue=settings.LOG_ASYNC,
+    max_field_chars=settings.LOG_MAX_FIELD_CHARS,
+    max_file_bytes=settings.LOG_FILE_MAX_BYTES,
+    backup_count=settings.LOG_FILE_BACKUP_COUNT,
+    sample_rate=settings.LOG_SAMPLE_RATE,
+)
+atexit.register(stop_logging)
+os.register_at_fork(after_in_child=_restart_listeners)
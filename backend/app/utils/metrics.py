@@ -0,0 +1,113 @@
+import os
+import time
+from datetime import datetime, timezone
+from typing import Optional
+
+from prometheus_client import CONTENT_TYPE_LATEST, CollectorRegistry, Counter, Histogram, generate_latest, multiprocess
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+DB_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5)
+TOKEN_BUCKETS = (16, 64, 256, 1024, 4096, 16384, 65536, 262144)
+
+HTTP_REQUEST_SECONDS = Histogram(
+    "http_request_duration_seconds", "HTTP request latency by route template",
+    ["method", "route", "status"], buckets=LATENCY_BUCKETS,
+)
+QUEUE_WAIT_SECONDS = Histogram(
+    "execution_queue_wait_seconds", "Time from an execution being created to it starting to run",
+    buckets=LATENCY_BUCKETS,
+)
+NODE_SECONDS = Histogram(
+    "workflow_node_duration_seconds", "Workflow node execution time by node type",
+    ["node_type", "status"], buckets=LATENCY_BUCKETS,
+)
+GEMINI_CALL_SECONDS = Histogram(
+    "gemini_call_duration_seconds", "Gemini call latency, retries and throttling included",
+    ["outcome"], buckets=LATENCY_BUCKETS,
+)
+GEMINI_TOKENS = Histogram(
+    "gemini_tokens_per_call", "Tokens used per Gemini call as reported by the API",
+    buckets=TOKEN_BUCKETS,
+)
+GEMINI_CACHE_HITS = Counter("gemini_cache_hits_total", "Gemini prompts answered from the response cache")
+DB_QUERY_SECONDS = Histogram(
+    "db_query_duration_seconds", "Database statement execution time by statement type",
+    ["operation"], buckets=DB_BUCKETS,
+)
+
+_DB_OPERATIONS = {"select", "insert", "update", "delete", "pragma", "with"}
+
+def utc_naive(value: datetime) -> datetime:
+    """Converts aware datetimes to naive UTC so they compare with datetime.utcnow()"""
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+def observe_queue_wait(created_at: Optional[datetime]):
+    if created_at is not None:
+        QUEUE_WAIT_SECONDS.observe(max(0.0, (datetime.utcnow() - utc_naive(created_at)).total_seconds()))
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info["query_start"].pop()
+    operation = statement.lstrip().split(None, 1)[0].lower() if statement.strip() else "other"
+    DB_QUERY_SECONDS.labels(operation if operation in _DB_OPERATIONS else "other").observe(time.perf_counter() - started)
+
+def _handle_error(context):
+    # A failed statement never reaches after_cursor_execute; drop its start time.
+    connection = context.connection
+    if connection is not None and connection.info.get("query_start"):
+        connection.info["query_start"].pop()
+
+def instrument_engine(engine: Engine):
+    """Times every statement run on `engine` (pass async_engine.sync_engine for async engines)"""
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(engine, "handle_error", _handle_error)
+
+class MetricsMiddleware:
+    """
+    Records request latency per route template (/execution/{execution_id},
+    not the concrete path), so cardinality stays bounded. Requests that match
+    no route are grouped under "unmatched". Streaming responses are timed
+    until the stream ends.
+    """
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = scope.get("route")
+            HTTP_REQUEST_SECONDS.labels(
+                scope["method"], getattr(route, "path", "unmatched"), str(status)
+            ).observe(time.perf_counter() - start)
+
+def render_metrics() -> tuple:
+    """
+    Returns (body, content type) in the Prometheus text format. With
+    PROMETHEUS_MULTIPROC_DIR set (several server or worker processes),
+    samples from every process are aggregated.
+    """
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry), CONTENT_TYPE_LATEST
+    return generate_latest(), CONTENT_TYPE_LATEST
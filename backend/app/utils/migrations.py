@@ -0,0 +1,80 @@
+from typing import List
+
+from sqlalchemy import Column, inspect, literal, text
+from sqlalchemy.engine import Connection, Engine
+
+from app.utils.database import Base
+from app.utils.logger import logger
+
+def _models():
+    # Registers every table on Base.metadata.
+    from app.models import models  # noqa: F401
+
+def _default_sql(column: Column, connection: Connection):
+    """SQL literal for the value existing rows get in a new column, or None"""
+    if column.server_default is not None and isinstance(getattr(column.server_default, "arg", None), str):
+        value = column.server_default.arg
+    elif column.default is not None and column.default.is_scalar:
+        value = column.default.arg
+    else:
+        return None
+    return str(literal(value, column.type).compile(dialect=connection.dialect, compile_kwargs={"literal_binds": True}))
+
+def _add_column_sql(column: Column, connection: Connection) -> str:
+    preparer = connection.dialect.identifier_preparer
+    sql = (
+        f"ALTER TABLE {preparer.format_table(column.table)} "
+        f"ADD COLUMN {preparer.format_column(column)} {column.type.compile(dialect=connection.dialect)}"
+    )
+    default = _default_sql(column, connection)
+    # Existing rows need a value, so NOT NULL is only kept when there is a default to fill them with.
+    if default is not None:
+        sql += f" DEFAULT {default}"
+        if not column.nullable:
+            sql += " NOT NULL"
+    return sql
+
+def _missing(connection: Connection) -> List[tuple]:
+    """("table" | "column" | "index", schema object) for everything the models have and the database lacks"""
+    _models()
+    inspector = inspect(connection)
+    existing_tables = set(inspector.get_table_names())
+    missing = []
+    for table in Base.metadata.sorted_tables:
+        if table.name not in existing_tables:
+            missing.append(("table", table))
+            continue
+        columns = {column["name"] for column in inspector.get_columns(table.name)}
+        missing.extend(("column", column) for column in table.columns if column.name not in columns)
+        indexes = {index["name"] for index in inspector.get_indexes(table.name)}
+        missing.extend(("index", index) for index in table.indexes if index.name not in indexes)
+    return missing
+
+def _describe(kind: str, item) -> str:
+    if kind == "column":
+        return f"column {item.table.name}.{item.name}"
+    return f"{kind} {item.name}"
+
+def pending_changes(engine: Engine) -> List[str]:
+    """What `migrate` would change, e.g. ["column executions.fingerprints"]; empty when the schema is current"""
+    with engine.connect() as connection:
+        return [_describe(kind, item) for kind, item in _missing(connection)]
+
+def migrate(engine: Engine) -> List[str]:
+    """
+    Brings the database up to the models: creates missing tables, adds
+    missing columns and creates missing indexes. Only additive changes are
+    made; nothing is dropped or altered. Returns what was changed.
+    """
+    applied = []
+    with engine.begin() as connection:
+        for kind, item in _missing(connection):
+            if kind == "table":
+                item.create(connection)
+            elif kind == "column":
+                connection.execute(text(_add_column_sql(item, connection)))
+            else:
+                item.create(connection)
+            applied.append(_describe(kind, item))
+            logger.info("Migration: added %s", applied[-1])
+    return applied
@@ -0,0 +1,21 @@
+import base64
+import json
+
+from app.utils.exceptions import InvalidCursorError
+
+def encode_cursor(row_id: int) -> str:
+    """Encodes a keyset position (the last id served) as an opaque URL-safe token."""
+    raw = json.dumps([row_id]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> int:
+    """
+    Decodes a token produced by encode_cursor, raising InvalidCursorError on
+    garbage. Tokens from the former [created_at, id] format still decode to their id.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        position = json.loads(base64.urlsafe_b64decode(padded))
+        return int(position[-1])
+    except (ValueError, TypeError, IndexError, KeyError):
+        raise InvalidCursorError()
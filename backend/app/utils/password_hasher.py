@@ -0,0 +1,70 @@
+import asyncio
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from typing import Optional, Tuple
+
+from passlib.context import CryptContext
+
+from app.utils.exceptions import PasswordHasherBusyError
+from app.utils.logger import logger
+
+@lru_cache(maxsize=None)
+def build_crypt_context(rounds: int) -> CryptContext:
+    return CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=rounds)
+
+# Module-level so they can be pickled into the worker processes.
+def _hash(password: str, rounds: int) -> str:
+    return build_crypt_context(rounds).hash(password)
+
+def _verify_and_update(password: str, hashed_password: str, rounds: int) -> Tuple[bool, Optional[str]]:
+    return build_crypt_context(rounds).verify_and_update(password, hashed_password)
+
+class PasswordHasher:
+    """
+    Runs bcrypt off the event loop in a small process pool so password work
+    neither blocks request threads nor contends for the GIL. At most
+    `queue_limit` operations may be in flight; beyond that callers get a 503
+    instead of piling up behind a login storm.
+    """
+    def __init__(self, rounds: int, workers: int, queue_limit: int):
+        self.rounds = rounds
+        self.workers = workers
+        self.queue_limit = queue_limit
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._in_flight = 0
+
+    def _get_executor(self) -> Optional[ProcessPoolExecutor]:
+        if self.workers <= 0:
+            return None
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+            return self._executor
+
+    async def _submit(self, fn, *args):
+        with self._lock:
+            if self._in_flight >= self.queue_limit:
+                logger.warning(f"Password hasher saturated ({self._in_flight} in flight), shedding request")
+                raise PasswordHasherBusyError()
+            self._in_flight += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._get_executor(), fn, *args)
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+
+    async def hash(self, password: str) -> str:
+        return await self._submit(_hash, password, self.rounds)
+
+    async def verify_and_update(self, password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+        """Returns (valid, new_hash); new_hash is set when the stored hash uses outdated parameters."""
+        return await self._submit(_verify_and_update, password, hashed_password, self.rounds)
+
+    def close(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
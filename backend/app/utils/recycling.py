@@ -0,0 +1,71 @@
+import os
+import random
+import signal
+import sys
+import time
+
+from app.utils.logger import logger
+
+MEMORY_CHECK_SECONDS = 1.0
+
+def rss_bytes() -> int:
+    """Resident memory of this process (peak resident memory where /proc is unavailable)"""
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+
+class WorkerRecycler:
+    """
+    Retires a server worker after `max_requests` requests (plus a random
+    share of `jitter`, so workers started together do not all restart at
+    once) or when its resident memory passes `max_memory_mb`. The worker
+    sends itself SIGTERM, so uvicorn stops accepting, finishes in-flight
+    requests and runs shutdown hooks; the production launcher then starts a
+    replacement. Zero disables a limit.
+    """
+    def __init__(self, max_requests: int = 0, jitter: int = 0, max_memory_mb: int = 0):
+        self.max_requests = max_requests + random.randint(0, max(0, jitter)) if max_requests > 0 else 0
+        self.max_memory_bytes = max_memory_mb * 1024 * 1024
+        self.handled = 0
+        self.draining = False
+        self._next_memory_check = 0.0
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.max_requests or self.max_memory_bytes)
+
+    def request_finished(self):
+        self.handled += 1
+        if self.draining:
+            return
+        if self.max_requests and self.handled >= self.max_requests:
+            self.drain(f"served {self.handled} requests")
+        elif self.max_memory_bytes and time.monotonic() >= self._next_memory_check:
+            self._next_memory_check = time.monotonic() + MEMORY_CHECK_SECONDS
+            rss = rss_bytes()
+            if rss > self.max_memory_bytes:
+                self.drain(f"resident memory is {rss / 1048576:.0f} MiB")
+
+    def drain(self, reason: str):
+        self.draining = True
+        logger.info("Recycling worker %s: %s", os.getpid(), reason)
+        os.kill(os.getpid(), signal.SIGTERM)
+
+class RecycleMiddleware:
+    """Counts finished HTTP requests towards the worker's recycle limits"""
+    def __init__(self, app, recycler: WorkerRecycler):
+        self.app = app
+        self.recycler = recycler
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.recycler.request_finished()
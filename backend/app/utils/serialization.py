@@ -0,0 +1,28 @@
+from typing import Any, Iterable, Optional, Tuple
+
+import orjson
+
+def dumps(value: Any) -> bytes:
+    """Compact JSON via orjson; datetimes as ISO 8601, enums as their values"""
+    return orjson.dumps(value, default=str, option=orjson.OPT_NON_STR_KEYS)
+
+def raw_json(text: Optional[str]) -> bytes:
+    """A JSON column read as text, passed through without being parsed; SQL NULL becomes null"""
+    return b"null" if text is None else text.encode("utf-8")
+
+def json_object(fields: Iterable[Tuple[str, bytes]]) -> bytes:
+    """
+    Joins (key, already-encoded JSON value) pairs into a JSON object without
+    touching the values. Built with a single join, so multi-megabyte values
+    are copied once rather than once per concatenation.
+    """
+    parts = [b"{"]
+    for key, value in fields:
+        if len(parts) > 1:
+            parts.append(b",")
+        parts += (dumps(key), b":", value)
+    parts.append(b"}")
+    return b"".join(parts)
+
+def json_array(items: Iterable[bytes]) -> bytes:
+    return b"[" + b",".join(items) + b"]"
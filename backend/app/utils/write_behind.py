@@ -0,0 +1,117 @@
+import queue
+import threading
+import time
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import update
+
+from app.models import models
+from app.models.models import ExecutionStatus
+from app.utils.database import SessionLocal
+from app.utils.logger import logger
+
+_STOP = object()
+
+class ExecutionStatusWriter:
+    """
+    Write-behind buffer for execution status and result updates. Updates from
+    any number of concurrent executions are queued and applied by one
+    background thread, several at a time in a single transaction, so the
+    SQLite write lock is taken once per batch rather than once per update.
+
+    Updates still in the buffer are lost if the process dies; with the queue
+    backend those executions are recovered through their expired lease.
+    """
+    def __init__(self, flush_interval_ms: int, max_batch: int):
+        self.flush_interval = flush_interval_ms / 1000
+        self.max_batch = max_batch
+        self._queue: "queue.Queue" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self.batches = 0
+        self.updates = 0
+
+    def submit(
+        self,
+        execution_id: int,
+        status: ExecutionStatus,
+        results: Optional[dict] = None,
+        node_timings: Optional[dict] = None,
+        fingerprints: Optional[dict] = None,
+    ):
+        self._ensure_started()
+        self._queue.put((execution_id, status, results, node_timings, fingerprints, datetime.utcnow()))
+
+    def close(self):
+        """Flushes everything queued so far and stops the writer thread"""
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            self._queue.put(_STOP)
+            thread.join()
+
+    def _ensure_started(self):
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="execution-status-writer", daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        stopping = False
+        while not stopping:
+            item = self._queue.get()
+            if item is _STOP:
+                break
+
+            batch = [item]
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.max_batch:
+                try:
+                    item = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+
+            self._flush(batch)
+
+    def _flush(self, batch):
+        # Later updates to the same execution supersede earlier ones in the batch.
+        rows = {}
+        for execution_id, status, results, node_timings, fingerprints, updated_at in batch:
+            row = rows.setdefault(execution_id, {"id": execution_id, "results": None})
+            row["status"] = status
+            row["updated_at"] = updated_at
+            if results is not None:
+                row["results"] = results
+                row["node_timings"] = node_timings
+                row["fingerprints"] = fingerprints
+
+        with_results = [row for row in rows.values() if row["results"] is not None]
+        status_only = [{k: v for k, v in row.items() if k != "results"} for row in rows.values() if row["results"] is None]
+
+        # A cancellation written directly (POST /execution/{id}/cancel) is final.
+        statement = (
+            update(models.Execution)
+            .where(models.Execution.status != ExecutionStatus.CANCELLED)
+            .execution_options(synchronize_session=None)
+        )
+        db = SessionLocal()
+        try:
+            if with_results:
+                db.execute(statement, with_results)
+            if status_only:
+                db.execute(statement, status_only)
+            db.commit()
+            self.batches += 1
+            self.updates += len(batch)
+        except Exception as e:
+            db.rollback()
+            logger.error(f"Failed to write {len(batch)} buffered execution updates: {e}", exc_info=True)
+        finally:
+            db.close()
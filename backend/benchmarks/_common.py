@@ -0,0 +1,59 @@
+import gc
+import os
+import statistics
+import sys
+import tempfile
+import time
+from typing import Callable, Dict, List
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def prepare_environment():
+    """
+    Points the app at a throwaway working directory (and so a fresh sqlite file)
+    and fills in the settings a benchmark needs when no .env is present.
+    """
+    if BACKEND_DIR not in sys.path:
+        sys.path.insert(0, BACKEND_DIR)
+    os.environ.setdefault("SECRET_KEY", "benchmark-secret")
+    os.environ.setdefault("ALGORITHM", "HS256")
+    os.environ.setdefault("ACCESS_TOKEN_EXPIRE_MINUTES", "60")
+    os.environ.setdefault("GEMINI_API_KEY", "benchmark-key")
+    workdir = tempfile.mkdtemp(prefix="wf-bench-")
+    os.chdir(workdir)
+    return workdir
+
+def summarize(samples: List[float]) -> Dict[str, float]:
+    """Latency summary in milliseconds for a list of durations in seconds"""
+    ordered = sorted(samples)
+
+    def percentile(p: float) -> float:
+        index = min(len(ordered) - 1, int(round(p * (len(ordered) - 1))))
+        return ordered[index] * 1000
+
+    return {
+        "count": len(ordered),
+        "mean_ms": statistics.fmean(ordered) * 1000,
+        "p50_ms": percentile(0.50),
+        "p95_ms": percentile(0.95),
+        "p99_ms": percentile(0.99),
+    }
+
+def time_calls(fn: Callable[[], object], iterations: int) -> List[float]:
+    samples = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - started)
+        # Collect outside the timed region so cyclic garbage from one call
+        # does not land in the next sample.
+        gc.collect()
+    return samples
+
+def print_table(title: str, rows: Dict[str, Dict[str, float]]):
+    print(f"\n{title}")
+    for name, stats in rows.items():
+        print(
+            f"  {name:<40} mean={stats['mean_ms']:8.3f}ms  p50={stats['p50_ms']:8.3f}ms  "
+            f"p95={stats['p95_ms']:8.3f}ms  p99={stats['p99_ms']:8.3f}ms  n={stats['count']}"
+        )
@@ -0,0 +1,85 @@
+"""
+Compares the process-wide application registry with the previous behaviour of
+building a new CustomFastAPI (and GeminiClient) on every get_app() call.
+
+    python -m benchmarks.bench_app_registry [--iterations 200]
+"""
+import argparse
+import sys
+from contextlib import contextmanager
+
+from benchmarks._common import prepare_environment, print_table, summarize, time_calls
+
+@contextmanager
+def legacy_get_app():
+    """Patches every imported `get_app` to build a fresh application per call"""
+    from app import create_app
+    from app.utils.app_utils import get_app, set_app
+
+    registered = get_app()
+
+    def build_per_call():
+        app = create_app()
+        set_app(registered)
+        return app
+
+    patched = []
+    for module in list(sys.modules.values()):
+        if getattr(module, "__name__", "").startswith("app.") and getattr(module, "get_app", None) is get_app:
+            module.get_app = build_per_call
+            patched.append(module)
+    try:
+        yield
+    finally:
+        for module in patched:
+            module.get_app = get_app
+
+def run(iterations: int):
+    prepare_environment()
+
+    from fastapi.testclient import TestClient
+    from app import create_app
+    from app.utils.app_utils import get_app, set_app
+    import main
+
+    client = TestClient(main.app)
+    with client:
+        client.post("/auth/signup", json={"email": "bench@example.com", "password": "bench"})
+        token = client.post("/auth/token", data={"username": "bench@example.com", "password": "bench"}).json()
+        headers = {"Authorization": f"Bearer {token['access_token']}"}
+        workflow = client.post("/workflow/", headers=headers, json={
+            "name": "bench",
+            "nodes": [
+                {"id": "in", "type": "text_input", "data": {"text": "hello"}},
+                {"id": "out", "type": "output", "data": {}},
+            ],
+            "edges": [{"id": "e1", "source": "in", "target": "out"}],
+        }).json()
+        execution = client.post(f"/execution/workflow/{workflow['id']}", headers=headers).json()
+
+        requests = {
+            "GET /workflow/": lambda: client.get("/workflow/", headers=headers),
+            "GET /execution/workflow/{id}": lambda: client.get(f"/execution/workflow/{workflow['id']}", headers=headers),
+            "GET /execution/{id}": lambda: client.get(f"/execution/{execution['execution_id']}", headers=headers),
+        }
+
+        startup = {
+            "get_app() registry": summarize(time_calls(get_app, iterations)),
+            "create_app() per call (legacy)": summarize(time_calls(create_app, max(1, iterations // 10))),
+        }
+        set_app(main.app)
+
+        per_request = {}
+        for name, call in requests.items():
+            per_request[f"{name} registry"] = summarize(time_calls(call, iterations))
+        with legacy_get_app():
+            for name, call in requests.items():
+                per_request[f"{name} legacy"] = summarize(time_calls(call, iterations))
+
+    print_table("Application lookup", startup)
+    print_table("Per-request latency", per_request)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--iterations", type=int, default=200)
+    run(parser.parse_args().iterations)
@@ -0,0 +1,84 @@
+"""
+Per-item cost of running one workflow over many inputs: N separate
+POST /execution/workflow/{id} requests (each with its own row, plan lookup
+and commits) against one POST /execution/workflow/{id}/batch carrying the
+same N items. The workflow is a text input feeding an output node, so the
+numbers are pure engine and database overhead.
+
+    python -m benchmarks.bench_batch [--items 1000] [--concurrency 8]
+"""
+import argparse
+import asyncio
+import json
+import time
+
+from benchmarks._common import prepare_environment
+
+WORKFLOW = {
+    "name": "bench-batch",
+    "nodes": [
+        {"id": "in", "type": "text_input", "data": {"text": "hello"}},
+        {"id": "out", "type": "output", "data": {}},
+    ],
+    "edges": [{"id": "e1", "source": "in", "target": "out"}],
+}
+
+async def separate_requests(client, headers, workflow_id: int, items: int, concurrency: int) -> float:
+    remaining = iter(range(items))
+
+    async def user():
+        for _ in remaining:
+            (await client.post(f"/execution/workflow/{workflow_id}", headers=headers)).raise_for_status()
+
+    started = time.perf_counter()
+    # ASGITransport returns once background tasks are done, so each request includes its execution.
+    await asyncio.gather(*(user() for _ in range(concurrency)))
+    return time.perf_counter() - started
+
+async def one_batch(client, headers, workflow_id: int, items: int, concurrency: int) -> float:
+    body = {"items": [f"item {index}" for index in range(items)], "concurrency": concurrency}
+    started = time.perf_counter()
+    response = await client.post(f"/execution/workflow/{workflow_id}/batch", headers=headers, json=body)
+    response.raise_for_status()
+    elapsed = time.perf_counter() - started
+    outcomes = [json.loads(line) for line in response.text.splitlines()]
+    assert len(outcomes) == items and all(outcome["status"] == "COMPLETED" for outcome in outcomes)
+    return elapsed
+
+async def run(items: int, concurrency: int):
+    prepare_environment()
+
+    import httpx
+    import main
+    from app.config import settings
+    from app.utils.database import Base, async_engine, engine
+
+    settings.BATCH_CONCURRENCY = max(settings.BATCH_CONCURRENCY, concurrency)
+    Base.metadata.create_all(bind=engine)
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        await client.post("/auth/signup", json={"email": "bench@example.com", "password": "bench"})
+        token = (await client.post("/auth/token", data={"username": "bench@example.com", "password": "bench"})).json()
+        headers = {"Authorization": f"Bearer {token['access_token']}"}
+        workflow_id = (await client.post("/workflow/", headers=headers, json=WORKFLOW)).json()["id"]
+
+        for label, scenario in (("separate requests", separate_requests), ("batch endpoint", one_batch)):
+            elapsed = await scenario(client, headers, workflow_id, items, concurrency)
+            print(json.dumps({
+                "scenario": label,
+                "items": items,
+                "concurrency": concurrency,
+                "seconds": round(elapsed, 3),
+                "items_per_second": round(items / elapsed, 1),
+                "ms_per_item": round(elapsed * 1000 / items, 3),
+            }))
+
+    main.app.execution_handler.close()
+    await async_engine.dispose()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--items", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=8)
+    args = parser.parse_args()
+    asyncio.run(run(args.items, args.concurrency))
@@ -0,0 +1,66 @@
+"""
+Wall-clock time of a fan-out workflow (one text input feeding N Gemini prompts
+joined by an output node) with sequential versus concurrent branch execution,
+on threads and on the event loop. Gemini calls are replaced by a stub that
+sleeps for a fixed latency.
+
+    python -m benchmarks.bench_dag_fanout [--branches 5] [--latency 0.2]
+"""
+import argparse
+import asyncio
+import time
+
+from benchmarks._common import prepare_environment
+
+class SleepingGeminiClient:
+    def __init__(self, latency: float):
+        self.latency = latency
+
+    def generate_text(self, prompt: str, use_cache: bool = True, on_chunk=None, timeout=None) -> str:
+        time.sleep(self.latency)
+        return f"echo: {prompt}"
+
+    async def agenerate_text(self, prompt: str, use_cache: bool = True, on_chunk=None) -> str:
+        await asyncio.sleep(self.latency)
+        return f"echo: {prompt}"
+
+def fanout_workflow(branches: int):
+    nodes = [{"id": "in", "type": "text_input", "data": {"text": "hello"}}]
+    edges = []
+    for index in range(branches):
+        nodes.append({"id": f"g{index}", "type": "gemini_prompt", "data": {}})
+        edges.append({"id": f"in-g{index}", "source": "in", "target": f"g{index}"})
+        edges.append({"id": f"g{index}-out", "source": f"g{index}", "target": "out"})
+    nodes.append({"id": "out", "type": "output", "data": {}})
+    return nodes, edges
+
+def run(branches: int, latency: float):
+    prepare_environment()
+
+    from app.engine.graph import WorkflowGraph
+    from app.engine.runner import arun_graph, run_graph
+    from app.utils.app_utils import get_app, override_app
+
+    graph = WorkflowGraph(*fanout_workflow(branches))
+    handler = get_app().execution_handler
+
+    print(f"fan-out of {branches} branches, {latency * 1000:.0f}ms per Gemini call "
+          f"(critical path ~{latency * 1000:.0f}ms)")
+    with override_app(gemini_client=SleepingGeminiClient(latency)):
+        for concurrency in sorted({1, branches}):
+            started = time.perf_counter()
+            run_graph(graph, handler.execute_node, max_concurrency=concurrency)
+            elapsed = time.perf_counter() - started
+            print(f"  threads    max_concurrency={concurrency:<3} wall-clock={elapsed * 1000:8.1f}ms")
+
+            started = time.perf_counter()
+            asyncio.run(arun_graph(graph, handler.aexecute_node, max_concurrency=concurrency))
+            elapsed = time.perf_counter() - started
+            print(f"  event loop max_concurrency={concurrency:<3} wall-clock={elapsed * 1000:8.1f}ms")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--branches", type=int, default=5)
+    parser.add_argument("--latency", type=float, default=0.2)
+    args = parser.parse_args()
+    run(args.branches, args.latency)
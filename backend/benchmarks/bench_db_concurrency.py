@@ -0,0 +1,82 @@
+"""
+Load test of GET /workflow/ on the async SQLAlchemy stack against the same
+query served by a sync route on a blocking Session (the previous stack), at
+increasing client concurrency. Sync routes run on Starlette's thread pool
+(40 threads by default), so they queue behind it; async routes are limited by
+the connection pool (DB_POOL_SIZE + DB_MAX_OVERFLOW) instead.
+
+    python -m benchmarks.bench_db_concurrency [--requests 2000] [--concurrency 1 16 64 256]
+"""
+import argparse
+import asyncio
+import time
+
+from benchmarks._common import prepare_environment, print_table, summarize
+
+def add_sync_baseline_route(app):
+    from fastapi import Depends
+    from sqlalchemy.orm import Session
+
+    from app.models import models, schemas
+    from app.utils.auth import get_current_user
+    from app.utils.database import get_db
+
+    @app.get("/bench/sync-workflows")
+    def sync_workflows(db: Session = Depends(get_db), current_user: schemas.Principal = Depends(get_current_user)):
+        rows = db.query(models.Workflow).filter(models.Workflow.owner_id == current_user.id).limit(100).all()
+        return [schemas.Workflow.model_validate(row) for row in rows]
+
+async def drive(client, path: str, headers: dict, total: int, concurrency: int):
+    samples = []
+    remaining = iter(range(total))
+
+    async def user():
+        for _ in remaining:
+            started = time.perf_counter()
+            response = await client.get(path, headers=headers)
+            response.raise_for_status()
+            samples.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(user() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    return samples, total / elapsed
+
+async def run(total: int, levels):
+    prepare_environment()
+
+    import httpx
+    import main
+    from app.utils.database import Base, async_engine, engine
+
+    Base.metadata.create_all(bind=engine)
+    add_sync_baseline_route(main.app)
+
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        await client.post("/auth/signup", json={"email": "bench@example.com", "password": "bench"})
+        token = (await client.post("/auth/token", data={"username": "bench@example.com", "password": "bench"})).json()
+        headers = {"Authorization": f"Bearer {token['access_token']}"}
+        for index in range(20):
+            await client.post("/workflow/", headers=headers, json={
+                "name": f"bench-{index}",
+                "nodes": [{"id": "in", "type": "text_input", "data": {"text": "hello"}}],
+                "edges": [],
+            })
+
+        rows = {}
+        for concurrency in levels:
+            for label, path in (("async", "/workflow/"), ("sync", "/bench/sync-workflows")):
+                samples, rps = await drive(client, path, headers, total, concurrency)
+                stats = summarize(samples)
+                rows[f"{label:<5} c={concurrency:<4} rps={rps:8.1f}"] = stats
+
+    await async_engine.dispose()
+    print_table(f"GET workflows, {total} requests per run", rows)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 16, 64, 256])
+    args = parser.parse_args()
+    asyncio.run(run(args.requests, args.concurrency))
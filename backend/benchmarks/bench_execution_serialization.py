@@ -0,0 +1,91 @@
+"""
+Cost of producing the GET /execution/{id} body for an execution with
+--nodes outputs of --output-kb kilobytes of LLM-like text: the previous path
+(ORM row with parsed JSON, pydantic validation of the results tree, blob
+outputs parsed back in, model_dump_json) against the raw one (JSON columns
+read as text and blob contents spliced into the body unparsed). Both run
+with every output inline in the row and with large outputs in the blob
+store; the database query is included.
+
+    python -m benchmarks.bench_execution_serialization [--nodes 3] [--output-kb 256] [--iterations 200]
+"""
+import argparse
+import json
+import random
+
+from benchmarks._common import prepare_environment, summarize, time_calls
+
+WORDS = "the model returned a long answer about workflow automation with several paragraphs of detail".split()
+
+def make_output(rng: random.Random, size: int) -> str:
+    words = []
+    length = 0
+    while length < size:
+        word = rng.choice(WORDS)
+        words.append(word)
+        length += len(word) + 1
+    return " ".join(words)
+
+def main(nodes: int, output_kb: int, iterations: int):
+    prepare_environment()
+
+    from sqlalchemy import select
+
+    from app.handlers.execution_handler import execution_document_columns
+    from app.models import models, schemas
+    from app.utils.app_utils import get_app
+    from app.utils.database import Base, SessionLocal, engine
+    from app.utils.result_store import FileBlobStore, ResultStore
+
+    Base.metadata.create_all(bind=engine)
+    handler = get_app().execution_handler
+    blobs = FileBlobStore("./result_blobs")
+    stores = {"inline": ResultStore(blobs, 0, "gzip"), "blob": ResultStore(blobs, 8192, "gzip")}
+
+    rng = random.Random(1)
+    results = {f"node-{index}": make_output(rng, output_kb * 1024) for index in range(nodes)}
+    with SessionLocal() as db:
+        user = models.User(email="bench@example.com", hashed_password="x")
+        db.add(user)
+        db.commit()
+        workflow = models.Workflow(name="bench", owner_id=user.id, nodes=[], edges=[])
+        db.add(workflow)
+        db.commit()
+        execution_ids = {}
+        for name, store in stores.items():
+            execution = models.Execution(workflow_id=workflow.id, status=models.ExecutionStatus.COMPLETED, results=store.offload(results))
+            db.add(execution)
+            db.commit()
+            execution_ids[name] = execution.id
+
+    for name, store in stores.items():
+        execution_id = execution_ids[name]
+
+        def pydantic_path():
+            with SessionLocal() as db:
+                row = db.scalar(select(models.Execution).where(models.Execution.id == execution_id))
+                details = schemas.Execution.model_validate(row)
+                details.results = store.resolve(details.results)
+                return schemas.Execution.model_validate(details).model_dump_json().encode("utf-8")
+
+        def raw_path():
+            with SessionLocal() as db:
+                row = db.execute(select(*execution_document_columns()).where(models.Execution.id == execution_id)).first()
+                return handler.execution_json(row, store.resolve_json(row.results))
+
+        previous, raw = pydantic_path(), raw_path()
+        assert json.loads(previous) == json.loads(raw)
+        for path, fn in (("pydantic", pydantic_path), ("raw", raw_path)):
+            stats = summarize(time_calls(fn, iterations))
+            print(json.dumps({
+                "storage": name, "path": path, "nodes": nodes, "output_kb": output_kb, "body_bytes": len(fn()),
+                **{key: round(value, 3) for key, value in stats.items()},
+            }))
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--nodes", type=int, default=3)
+    parser.add_argument("--output-kb", type=int, default=256)
+    parser.add_argument("--iterations", type=int, default=200)
+    args = parser.parse_args()
+    main(args.nodes, args.output_kb, args.iterations)
@@ -0,0 +1,310 @@
+"""
+Load test of the HTTP API with Gemini answered by the local stub model
+(GEMINI_STUB), so no API key is needed. Each scenario runs --users virtual
+users in a loop for --duration seconds:
+
+    auth      sign up a new account, then log in
+    crud      create, list, read and update workflows
+    execute   start an execution of text input -> Gemini -> transform ->
+              output and poll it until it finishes
+    poll      conditionally re-read a finished execution (If-None-Match)
+              and the workflow's execution list
+
+By default the app runs in-process behind httpx.ASGITransport, which only
+returns from a request once its background tasks are done, so an in-process
+POST /execution includes the execution itself. With --base-url the scenarios
+run against a server started separately, e.g. with GEMINI_STUB=true; the
+--latency-ms, --jitter-ms and --error-rate options then have no effect,
+since the server's own GEMINI_STUB_* settings apply.
+
+Every scenario prints one JSON line (also written to --output) with
+requests per second, p50/p95/p99 latency overall and per endpoint, and for
+`execute` executions per second. Pass the output of an earlier run as --baseline to compare builds: the run
+exits with status 1 when a scenario's RPS drops, or its p95 grows, by more
+than --tolerance.
+
+    python -m benchmarks.bench_load [--users 20] [--duration 10] [--scenarios auth,crud,execute,poll]
+        [--latency-ms 50] [--jitter-ms 20] [--error-rate 0] [--base-url URL] [--output FILE] [--baseline FILE] [--tolerance 0.2]
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+import uuid
+from collections import defaultdict
+
+from benchmarks._common import prepare_environment, summarize
+
+SCENARIOS = ("auth", "crud", "execute", "poll")
+
+# The response cache is off so every execution reaches the (stub) model and
+# nothing is reused from earlier runs.
+WORKFLOW = {
+    "name": "bench-load",
+    "cache_enabled": False,
+    "nodes": [
+        {"id": "in", "type": "text_input", "data": {"text": "Summarise the quarterly report"}},
+        {"id": "llm", "type": "gemini_prompt", "data": {}},
+        {"id": "upper", "type": "text_transform", "data": {"operation": "upper"}},
+        {"id": "out", "type": "output", "data": {}},
+    ],
+    "edges": [
+        {"id": "e1", "source": "in", "target": "llm"},
+        {"id": "e2", "source": "llm", "target": "upper"},
+        {"id": "e3", "source": "upper", "target": "out"},
+    ],
+}
+
+# ExecutionStatus values a run ends in; spelled out so --base-url runs never import the app.
+TERMINAL_STATUSES = {"COMPLETED", "FAILED", "CANCELLED", "TIMED_OUT"}
+
+class Recorder:
+    """Request latencies per endpoint, plus failed requests"""
+    def __init__(self):
+        self.samples = defaultdict(list)
+        self.errors = 0
+
+    async def request(self, client, endpoint: str, method: str, url: str, expected=(200,), **kwargs):
+        started = time.perf_counter()
+        try:
+            response = await client.request(method, url, **kwargs)
+        except Exception:
+            self.errors += 1
+            return None
+        self.samples[endpoint].append(time.perf_counter() - started)
+        if response.status_code not in expected:
+            self.errors += 1
+            return None
+        return response
+
+    def report(self, elapsed: float) -> dict:
+        everything = [sample for samples in self.samples.values() for sample in samples]
+        overall = summarize(everything) if everything else {"count": 0, "p50_ms": 0, "p95_ms": 0, "p99_ms": 0}
+        return {
+            "requests": len(everything),
+            "errors": self.errors,
+            "seconds": round(elapsed, 3),
+            "rps": round(len(everything) / elapsed, 1),
+            **{key: round(overall[key], 2) for key in ("p50_ms", "p95_ms", "p99_ms")},
+            "endpoints": {
+                endpoint: {key: round(value, 2) for key, value in summarize(samples).items() if key != "mean_ms"}
+                for endpoint, samples in sorted(self.samples.items())
+            },
+        }
+
+async def sign_in(client, email: str) -> dict:
+    await client.post("/auth/signup", json={"email": email, "password": "bench"})
+    token = (await client.post("/auth/token", data={"username": email, "password": "bench"})).json()
+    return {"Authorization": f"Bearer {token['access_token']}"}
+
+async def create_workflow(client, headers) -> int:
+    response = await client.post("/workflow/", headers=headers, json=WORKFLOW)
+    response.raise_for_status()
+    return response.json()["id"]
+
+async def wait_for_execution(client, headers, execution_id: int, poll_interval: float, recorder=None) -> str:
+    while True:
+        url = f"/execution/{execution_id}"
+        if recorder is None:
+            response = await client.get(url, headers=headers)
+        else:
+            response = await recorder.request(client, "GET /execution/{id}", "GET", url, headers=headers)
+        if response is None:
+            return "ERROR"
+        status = response.json()["status"]
+        if status in TERMINAL_STATUSES:
+            return status
+        await asyncio.sleep(poll_interval)
+
+class Scenario:
+    """Per-user setup, done before the clock starts, and the action each user repeats"""
+    def __init__(self, client, headers, options):
+        self.client = client
+        self.headers = headers
+        self.options = options
+        self.recorder = Recorder()
+
+    async def setup(self, user: int):
+        return None
+
+    async def step(self, state):
+        raise NotImplementedError
+
+    def extra(self, elapsed: float) -> dict:
+        return {}
+
+class AuthScenario(Scenario):
+    async def step(self, state):
+        email = f"load-{uuid.uuid4().hex}@example.com"
+        credentials = {"email": email, "password": "bench"}
+        await self.recorder.request(self.client, "POST /auth/signup", "POST", "/auth/signup", json=credentials)
+        await self.recorder.request(
+            self.client, "POST /auth/token", "POST", "/auth/token", data={"username": email, "password": "bench"}
+        )
+
+class CrudScenario(Scenario):
+    async def step(self, state):
+        request, client, headers = self.recorder.request, self.client, self.headers
+        response = await request(client, "POST /workflow/", "POST", "/workflow/", headers=headers, json=WORKFLOW)
+        if response is None:
+            return
+        workflow_id = response.json()["id"]
+        await request(client, "GET /workflow/", "GET", "/workflow/", headers=headers)
+        await request(client, "GET /workflow/{id}", "GET", f"/workflow/{workflow_id}", headers=headers)
+        renamed = {**WORKFLOW, "name": f"bench-load-{workflow_id}"}
+        await request(client, "PUT /workflow/{id}", "PUT", f"/workflow/{workflow_id}", headers=headers, json=renamed)
+
+class ExecuteScenario(Scenario):
+    def __init__(self, client, headers, options):
+        super().__init__(client, headers, options)
+        self.executions = []
+        self.failed = 0
+
+    async def setup(self, user: int):
+        return await create_workflow(self.client, self.headers)
+
+    async def step(self, workflow_id):
+        started = time.perf_counter()
+        response = await self.recorder.request(
+            self.client, "POST /execution/workflow/{id}", "POST", f"/execution/workflow/{workflow_id}", headers=self.headers
+        )
+        if response is None:
+            return
+        execution_id = response.json()["execution_id"]
+        status = await wait_for_execution(self.client, self.headers, execution_id, self.options.poll_interval, self.recorder)
+        if status == "COMPLETED":
+            self.executions.append(time.perf_counter() - started)
+        else:
+            self.failed += 1
+
+    def extra(self, elapsed: float) -> dict:
+        stats = summarize(self.executions) if self.executions else {"p50_ms": 0, "p95_ms": 0, "p99_ms": 0}
+        return {
+            "executions": len(self.executions),
+            "failed_executions": self.failed,
+            "executions_per_second": round(len(self.executions) / elapsed, 1),
+            **{f"execution_{key}": round(stats[key], 2) for key in ("p50_ms", "p95_ms", "p99_ms")},
+        }
+
+class PollScenario(Scenario):
+    async def setup(self, user: int):
+        workflow_id = await create_workflow(self.client, self.headers)
+        execution_id = (await self.client.post(f"/execution/workflow/{workflow_id}", headers=self.headers)).json()["execution_id"]
+        await wait_for_execution(self.client, self.headers, execution_id, self.options.poll_interval)
+        etag = (await self.client.get(f"/execution/{execution_id}", headers=self.headers)).headers.get("etag", "")
+        return workflow_id, execution_id, etag
+
+    async def step(self, state):
+        workflow_id, execution_id, etag = state
+        await self.recorder.request(
+            self.client, "GET /execution/{id} (conditional)", "GET", f"/execution/{execution_id}",
+            expected=(200, 304), headers={**self.headers, "If-None-Match": etag},
+        )
+        await self.recorder.request(
+            self.client, "GET /execution/workflow/{id}", "GET", f"/execution/workflow/{workflow_id}", headers=self.headers
+        )
+
+SCENARIO_CLASSES = {"auth": AuthScenario, "crud": CrudScenario, "execute": ExecuteScenario, "poll": PollScenario}
+
+async def run_scenario(name: str, client, headers, options) -> dict:
+    scenario = SCENARIO_CLASSES[name](client, headers, options)
+    states = await asyncio.gather(*(scenario.setup(user) for user in range(options.users)))
+    deadline = time.perf_counter() + options.duration
+
+    async def user(state):
+        while time.perf_counter() < deadline:
+            await scenario.step(state)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(user(state) for state in states))
+    elapsed = time.perf_counter() - started
+    return {"scenario": name, "users": options.users, **scenario.recorder.report(elapsed), **scenario.extra(elapsed)}
+
+def compare(result: dict, baseline: dict, tolerance: float) -> list:
+    regressions = []
+    if baseline.get("rps") and result["rps"] < baseline["rps"] * (1 - tolerance):
+        regressions.append(f"rps {result['rps']} < baseline {baseline['rps']}")
+    if baseline.get("p95_ms") and result["p95_ms"] > baseline["p95_ms"] * (1 + tolerance):
+        regressions.append(f"p95_ms {result['p95_ms']} > baseline {baseline['p95_ms']}")
+    return regressions
+
+def load_baseline(path: str) -> dict:
+    """Scenario results from an earlier run's output; other lines (e.g. captured logs) are skipped"""
+    baseline = {}
+    with open(path) as file:
+        for line in file:
+            try:
+                result = json.loads(line)
+            except ValueError:
+                continue
+            if isinstance(result, dict) and "scenario" in result:
+                baseline[result["scenario"]] = result
+    return baseline
+
+async def run(options) -> int:
+    import httpx
+
+    if options.base_url:
+        client = httpx.AsyncClient(base_url=options.base_url, timeout=60)
+    else:
+        prepare_environment()
+        os.environ.update({
+            "GEMINI_STUB": "true",
+            "GEMINI_STUB_LATENCY_MS": str(options.latency_ms),
+            "GEMINI_STUB_JITTER_MS": str(options.jitter_ms),
+            "GEMINI_STUB_ERROR_RATE": str(options.error_rate),
+            "LOG_LEVEL": os.environ.get("LOG_LEVEL", "ERROR"),
+        })
+        import main
+        from app.utils.database import Base, engine
+
+        Base.metadata.create_all(bind=engine)
+        client = httpx.AsyncClient(transport=httpx.ASGITransport(app=main.app), base_url="http://bench", timeout=None)
+
+    baseline = load_baseline(options.baseline) if options.baseline else {}
+    regressed = False
+    output = open(options.output, "w") if options.output else None
+    async with client:
+        headers = await sign_in(client, f"load-owner-{uuid.uuid4().hex}@example.com")
+        for name in options.scenarios:
+            result = await run_scenario(name, client, headers, options)
+            if name in baseline:
+                result["regressions"] = compare(result, baseline[name], options.tolerance)
+                regressed = regressed or bool(result["regressions"])
+            print(json.dumps(result), flush=True)
+            if output:
+                output.write(json.dumps(result) + "\n")
+    if output:
+        output.close()
+
+    if not options.base_url:
+        from app.utils.database import async_engine
+
+        main.app.execution_handler.close()
+        main.app.auth_handler.close()
+        await async_engine.dispose()
+    return 1 if regressed else 0
+
+def parse_scenarios(value: str) -> list:
+    names = [name.strip() for name in value.split(",") if name.strip()]
+    unknown = sorted(set(names) - set(SCENARIOS))
+    if unknown:
+        raise argparse.ArgumentTypeError(f"unknown scenarios {unknown}; choose from {', '.join(SCENARIOS)}")
+    return list(dict.fromkeys(names))
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--duration", type=float, default=10, help="seconds per scenario")
+    parser.add_argument("--scenarios", type=parse_scenarios, default=list(SCENARIOS))
+    parser.add_argument("--latency-ms", type=float, default=50)
+    parser.add_argument("--jitter-ms", type=float, default=20)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--poll-interval", type=float, default=0.05)
+    parser.add_argument("--base-url", default=None)
+    parser.add_argument("--output", default=None, help="also write the JSON lines to this file")
+    parser.add_argument("--baseline", default=None, help="JSON lines from an earlier run")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    sys.exit(asyncio.run(run(parser.parse_args())))
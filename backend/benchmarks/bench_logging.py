@@ -0,0 +1,67 @@
+"""
+Caller-side cost of logging a node result of --payload-kb kilobytes, as the
+execution hot path does. Compares the previous setup (f-string formatted
+eagerly, written synchronously to stdout and app.log) with the queue-based
+pipeline in text and JSON form, with truncation. stdout goes to /dev/null so
+only formatting and file I/O are measured.
+
+    python -m benchmarks.bench_logging [--iterations 2000] [--payload-kb 64]
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+from benchmarks._common import prepare_environment, summarize
+
+def measure(log, payload: str, iterations: int, eager: bool) -> dict:
+    samples = []
+    for index in range(iterations):
+        started = time.perf_counter()
+        if eager:
+            log.info(f"Stored result for node-{index}: {payload}")
+        else:
+            log.info("Stored result for %s: %s", f"node-{index}", payload)
+        samples.append(time.perf_counter() - started)
+    return summarize(samples)
+
+def main(iterations: int, payload_kb: int):
+    workdir = prepare_environment()
+    from app.utils.logger import configure_logger, stop_logging
+
+    payload = "x" * (payload_kb * 1024)
+    variants = {
+        "sync-eager": dict(),
+        "queue-text-truncated": dict(use_queue=True, max_field_chars=2000),
+        "queue-json-truncated": dict(use_queue=True, json_format=True, max_field_chars=2000),
+    }
+    real_stdout, sys.stdout = sys.stdout, open(os.devnull, "w")
+    try:
+        results = {}
+        for name, options in variants.items():
+            log = configure_logger(f"bench.{name}", log_to_file=True, log_file_path=os.path.join(workdir, f"{name}.log"), **options)
+            started = time.perf_counter()
+            stats = measure(log, payload, iterations, eager=name == "sync-eager")
+            caller_seconds = time.perf_counter() - started
+            stop_logging()
+            results[name] = {
+                "caller_p50_us": round(stats["p50_ms"] * 1000, 1),
+                "caller_p99_us": round(stats["p99_ms"] * 1000, 1),
+                "caller_total_ms": round(caller_seconds * 1000, 1),
+                "drained_total_ms": round((time.perf_counter() - started) * 1000, 1),
+                "log_bytes": os.path.getsize(os.path.join(workdir, f"{name}.log")),
+            }
+    finally:
+        sys.stdout.close()
+        sys.stdout = real_stdout
+
+    for name, result in results.items():
+        print(json.dumps({"variant": name, "iterations": iterations, "payload_kb": payload_kb, **result}))
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--iterations", type=int, default=2000)
+    parser.add_argument("--payload-kb", type=int, default=64)
+    args = parser.parse_args()
+    main(args.iterations, args.payload_kb)
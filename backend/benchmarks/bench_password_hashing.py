@@ -0,0 +1,103 @@
+"""
+Login throughput during a burst of POST /auth/token requests, and the latency
+of GET /workflow/ probes issued while the burst is running. Compares bcrypt on
+the default thread pool (the previous behaviour) with the process pool.
+Probes that land while the hasher is saturated show the back-pressure cost on
+the rest of the app; shed logins (503) are counted separately.
+
+Each variant runs in its own process because the hasher is built with the app.
+
+    python -m benchmarks.bench_password_hashing [--logins 200] [--concurrency 32] [--rounds 12]
+"""
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import time
+
+from benchmarks._common import BACKEND_DIR, prepare_environment, summarize
+
+VARIANTS = [
+    ("thread-pool", {"PASSWORD_HASH_WORKERS": "0", "PASSWORD_HASH_QUEUE_LIMIT": "100000"}),
+    ("process-pool", {"PASSWORD_HASH_WORKERS": str(os.cpu_count() or 2)}),
+]
+
+async def measure(logins: int, concurrency: int) -> dict:
+    import httpx
+    import main
+    from app.utils.database import Base, async_engine, engine
+
+    Base.metadata.create_all(bind=engine)
+    transport = httpx.ASGITransport(app=main.app)
+    credentials = {"username": "bench@example.com", "password": "bench"}
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        await client.post("/auth/signup", json={"email": credentials["username"], "password": credentials["password"]})
+        token = (await client.post("/auth/token", data=credentials)).json()
+        headers = {"Authorization": f"Bearer {token['access_token']}"}
+
+        remaining = iter(range(logins))
+        statuses = {}
+        probes = []
+        finished = asyncio.Event()
+
+        async def login():
+            for _ in remaining:
+                response = await client.post("/auth/token", data=credentials)
+                statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+        async def probe():
+            while not finished.is_set():
+                started = time.perf_counter()
+                (await client.get("/workflow/", headers=headers)).raise_for_status()
+                probes.append(time.perf_counter() - started)
+                await asyncio.sleep(0.01)
+
+        prober = asyncio.create_task(probe())
+        started = time.perf_counter()
+        await asyncio.gather(*(login() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+        finished.set()
+        await prober
+
+    main.app.auth_handler.close()
+    await async_engine.dispose()
+    probe_stats = summarize(probes)
+    return {
+        "logins": logins,
+        "ok": statuses.get(200, 0),
+        "shed": statuses.get(503, 0),
+        "logins_per_second": round(statuses.get(200, 0) / elapsed, 1),
+        "probe_p50_ms": round(probe_stats["p50_ms"], 2),
+        "probe_p99_ms": round(probe_stats["p99_ms"], 2),
+        "probes": probe_stats["count"],
+    }
+
+def run_child(logins: int, concurrency: int):
+    prepare_environment()
+    result = asyncio.run(measure(logins, concurrency))
+    print("RESULT " + json.dumps(result))
+
+def run_parent(logins: int, concurrency: int, rounds: int):
+    for name, env in VARIANTS:
+        output = subprocess.run(
+            [sys.executable, "-m", "benchmarks.bench_password_hashing", "--child",
+             "--logins", str(logins), "--concurrency", str(concurrency)],
+            cwd=BACKEND_DIR, env={**os.environ, "PASSWORD_HASH_ROUNDS": str(rounds), **env},
+            capture_output=True, text=True, check=True,
+        ).stdout
+        result = json.loads(next(line for line in output.splitlines() if line.startswith("RESULT "))[7:])
+        print(json.dumps({"variant": name, "rounds": rounds, **result}))
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--logins", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--rounds", type=int, default=12)
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        run_child(args.logins, args.concurrency)
+    else:
+        run_parent(args.logins, args.concurrency, args.rounds)
@@ -0,0 +1,117 @@
+"""
+Size of the executions table and latency of a results-loading list query
+(20 newest rows, as GET /execution/workflow/{id}?include_results=true runs
+it) with every node output inline in the row (RESULT_INLINE_MAX_BYTES=0, the
+previous behaviour) and with large outputs in the compressed blob store.
+
+Each execution has --nodes node outputs of --output-kb kilobytes of
+LLM-like text.
+
+    python -m benchmarks.bench_result_store [--executions 2000] [--nodes 3] [--output-kb 16]
+"""
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+
+from benchmarks._common import BACKEND_DIR, prepare_environment, summarize, time_calls
+
+VARIANTS = [
+    ("inline", {"RESULT_INLINE_MAX_BYTES": "0"}),
+    ("blob-gzip", {"RESULT_INLINE_MAX_BYTES": "8192", "RESULT_BLOB_CODEC": "gzip"}),
+]
+
+WORDS = "the model returned a long answer about workflow automation with several paragraphs of detail".split()
+
+def make_output(rng: random.Random, size: int) -> str:
+    words = []
+    length = 0
+    while length < size:
+        word = rng.choice(WORDS)
+        words.append(word)
+        length += len(word) + 1
+    return " ".join(words)
+
+def directory_size(path: str) -> int:
+    return sum(os.path.getsize(os.path.join(root, name)) for root, _, names in os.walk(path) for name in names)
+
+def measure(executions: int, nodes: int, output_kb: int) -> dict:
+    from sqlalchemy import insert, select
+
+    from app.config import settings
+    from app.models import models
+    from app.utils.app_utils import get_app
+    from app.utils.database import Base, SessionLocal, engine
+
+    Base.metadata.create_all(bind=engine)
+    with SessionLocal() as db:
+        user = models.User(email="bench@example.com", hashed_password="x")
+        db.add(user)
+        db.commit()
+        workflow = models.Workflow(name="bench", owner_id=user.id, nodes=[], edges=[])
+        db.add(workflow)
+        db.commit()
+        workflow_id = workflow.id
+
+    store = get_app().execution_handler.result_store
+    rng = random.Random(1)
+    started = time.perf_counter()
+    with SessionLocal() as db:
+        for _ in range(executions // 100):
+            rows = []
+            for _ in range(100):
+                results = {f"node-{index}": make_output(rng, output_kb * 1024) for index in range(nodes)}
+                rows.append({"workflow_id": workflow_id, "status": models.ExecutionStatus.COMPLETED, "results": store.offload(results)})
+            db.execute(insert(models.Execution), rows)
+        db.commit()
+    write_seconds = time.perf_counter() - started
+
+    def list_page():
+        with SessionLocal() as db:
+            db.scalars(
+                select(models.Execution)
+                .where(models.Execution.workflow_id == workflow_id)
+                .order_by(models.Execution.created_at.desc(), models.Execution.id.desc())
+                .limit(20)
+            ).all()
+
+    list_stats = summarize(time_calls(list_page, 200))
+    with engine.connect() as connection:
+        connection.exec_driver_sql("VACUUM")
+    return {
+        "db_bytes": os.path.getsize("sql_app.db"),
+        "blob_bytes": directory_size(settings.RESULT_BLOB_DIR) if os.path.isdir(settings.RESULT_BLOB_DIR) else 0,
+        "write_seconds": round(write_seconds, 2),
+        "list_p50_ms": round(list_stats["p50_ms"], 2),
+        "list_p99_ms": round(list_stats["p99_ms"], 2),
+    }
+
+def run_child(executions: int, nodes: int, output_kb: int):
+    prepare_environment()
+    result = measure(executions, nodes, output_kb)
+    print("RESULT " + json.dumps(result))
+
+def run_parent(executions: int, nodes: int, output_kb: int):
+    for name, env in VARIANTS:
+        output = subprocess.run(
+            [sys.executable, "-m", "benchmarks.bench_result_store", "--child",
+             "--executions", str(executions), "--nodes", str(nodes), "--output-kb", str(output_kb)],
+            cwd=BACKEND_DIR, env={**os.environ, **env}, capture_output=True, text=True, check=True,
+        ).stdout
+        result = json.loads(next(line for line in output.splitlines() if line.startswith("RESULT "))[7:])
+        print(json.dumps({"variant": name, "executions": executions, "nodes": nodes, "output_kb": output_kb, **result}))
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--executions", type=int, default=2000)
+    parser.add_argument("--nodes", type=int, default=3)
+    parser.add_argument("--output-kb", type=int, default=16)
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        run_child(args.executions, args.nodes, args.output_kb)
+    else:
+        run_parent(args.executions, args.nodes, args.output_kb)
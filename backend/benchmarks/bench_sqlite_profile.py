@@ -0,0 +1,112 @@
+"""
+Executions per second on the SQLite file backend with the default settings,
+the production profile (WAL, synchronous=NORMAL, busy_timeout, mmap, cache),
+and the production profile plus write-behind status updates. A reader polls
+execution rows throughout, as the /execution/workflow/{id} endpoint would.
+
+Each variant runs in its own process because the profile is applied when the
+engines are created.
+
+    python -m benchmarks.bench_sqlite_profile [--executions 500] [--concurrency 50]
+"""
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import time
+
+from benchmarks._common import BACKEND_DIR, prepare_environment
+
+VARIANTS = [
+    ("default", {"SQLITE_PROFILE": "default", "EXECUTION_WRITE_BEHIND": "false"}),
+    ("production", {"SQLITE_PROFILE": "production", "EXECUTION_WRITE_BEHIND": "false"}),
+    ("production+write-behind", {"SQLITE_PROFILE": "production", "EXECUTION_WRITE_BEHIND": "true"}),
+]
+
+async def measure(executions: int, concurrency: int) -> dict:
+    from sqlalchemy import select
+
+    from app.models import models
+    from app.utils.app_utils import get_app
+    from app.utils.database import AsyncSessionLocal, Base, SessionLocal, async_engine, engine
+
+    Base.metadata.create_all(bind=engine)
+    with SessionLocal() as db:
+        user = models.User(email="bench@example.com", hashed_password="x")
+        db.add(user)
+        db.flush()
+        workflow = models.Workflow(
+            name="bench",
+            owner_id=user.id,
+            nodes=[{"id": "in", "type": "text_input", "data": {"text": "hello"}}, {"id": "out", "type": "output", "data": {}}],
+            edges=[{"id": "e1", "source": "in", "target": "out"}],
+        )
+        db.add(workflow)
+        db.commit()
+        workflow_id = workflow.id
+
+    handler = get_app().execution_handler
+    semaphore = asyncio.Semaphore(concurrency)
+    finished = asyncio.Event()
+    reads = 0
+
+    async def execute():
+        async with semaphore:
+            async with AsyncSessionLocal() as db:
+                execution = await handler.create_execution_entry(db, workflow_id)
+            await handler.arun_workflow(workflow_id, execution.id)
+
+    async def poll():
+        nonlocal reads
+        while not finished.is_set():
+            async with AsyncSessionLocal() as db:
+                await db.scalars(select(models.Execution).where(models.Execution.workflow_id == workflow_id).limit(20))
+            reads += 1
+
+    started = time.perf_counter()
+    reader = asyncio.create_task(poll())
+    await asyncio.gather(*(execute() for _ in range(executions)))
+    handler.close()
+    elapsed = time.perf_counter() - started
+    finished.set()
+    await reader
+
+    with SessionLocal() as db:
+        completed = db.query(models.Execution).filter(models.Execution.status == models.ExecutionStatus.COMPLETED).count()
+    await async_engine.dispose()
+
+    return {
+        "executions": executions,
+        "completed": completed,
+        "seconds": round(elapsed, 3),
+        "executions_per_second": round(executions / elapsed, 1),
+        "reads_per_second": round(reads / elapsed, 1),
+    }
+
+def run_child(executions: int, concurrency: int):
+    prepare_environment()
+    result = asyncio.run(measure(executions, concurrency))
+    print("RESULT " + json.dumps(result))
+
+def run_parent(executions: int, concurrency: int):
+    for name, env in VARIANTS:
+        output = subprocess.run(
+            [sys.executable, "-m", "benchmarks.bench_sqlite_profile", "--child",
+             "--executions", str(executions), "--concurrency", str(concurrency)],
+            cwd=BACKEND_DIR, env={**os.environ, **env}, capture_output=True, text=True, check=True,
+        ).stdout
+        result = json.loads(next(line for line in output.splitlines() if line.startswith("RESULT "))[7:])
+        print(json.dumps({"variant": name, **result}))
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--executions", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        run_child(args.executions, args.concurrency)
+    else:
+        run_parent(args.executions, args.concurrency)
@@ -3,9 +3,10 @@ import uvicorn
 from fastapi.middleware.cors import CORSMiddleware
 
 from app import create_app
-from app.middlewares.auth_middleware import auth_middleware
-from app.utils.database import Base, engine
+from app.config import settings
+from app.utils.database import async_engine, engine
 from app.utils.logger import logger
+from app.utils.migrations import migrate
 
 app = create_app()
 
@@ -17,25 +18,34 @@ app.add_middleware(
     allow_headers=["*"]
 )
 
-app.middleware("http")(auth_middleware)
-
 port = int(os.getenv("PORT", 8000))
 
 def run_dev_server():
     uvicorn.run("main:app", host="0.0.0.0", port=port, reload=True)
 
 def run_prod_server():
-    uvicorn.run(app, host="0.0.0.0", port=port)
+    # Prefer `python serve.py`: workers spawned from here import this module twice.
+    from serve import run_server
+    run_server("0.0.0.0", port, settings.WEB_WORKERS or os.cpu_count() or 1)
 
 @app.on_event("startup")
 def startup():
+    # Production deploys run `python migrate.py` once instead of every worker racing on DDL at boot.
+    if not (settings.DEV_MODE or settings.AUTO_MIGRATE):
+        return
     try:
-        Base.metadata.create_all(bind=engine, checkfirst=True)
+        migrate(engine)
     except Exception as e:
-        logger.warning(f"Warning: Error during table creation: {e}")
+        logger.warning(f"Warning: Error during schema migration: {e}")
+
+@app.on_event("shutdown")
+async def shutdown():
+    app.execution_handler.close()
+    app.auth_handler.close()
+    await async_engine.dispose()
 
 if __name__ == "__main__":
-    if os.getenv("DEV_MODE", "true").lower() == "true":
+    if settings.DEV_MODE:
         run_dev_server()
     else:
         run_prod_server()
\ No newline at end of file
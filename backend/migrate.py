@@ -0,0 +1,20 @@
+import argparse
+import sys
+
+from app.utils.database import engine
+from app.utils.logger import logger
+from app.utils.migrations import migrate, pending_changes
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Create and migrate the database schema. Run once per deploy, before starting the servers.")
+    parser.add_argument("--check", action="store_true", help="only list pending changes; exit 1 if there are any")
+    args = parser.parse_args()
+
+    if args.check:
+        pending = pending_changes(engine)
+        for change in pending:
+            print(f"pending: {change}")
+        sys.exit(1 if pending else 0)
+
+    applied = migrate(engine)
+    logger.info("Schema is up to date (%s changes applied)", len(applied))
@@ -0,0 +1,46 @@
+import argparse
+import importlib.util
+import os
+import tempfile
+
+import uvicorn
+from uvicorn.supervisors import Multiprocess
+
+from app.config import settings
+from app.utils.logger import logger
+
+def run_server(host: str, port: int, workers: int):
+    """
+    Pre-forks `workers` server processes sharing one listening socket, on
+    uvloop and httptools when they are installed. The supervisor restarts
+    any worker that exits, which is how workers retired by the request and
+    memory limits (WEB_MAX_REQUESTS, WEB_MAX_MEMORY_MB) are replaced. The
+    schema is not touched; run `python migrate.py` before starting.
+    """
+    loop = "uvloop" if importlib.util.find_spec("uvloop") else "asyncio"
+    http = "httptools" if importlib.util.find_spec("httptools") else "h11"
+    if settings.METRICS_ENABLED and "PROMETHEUS_MULTIPROC_DIR" not in os.environ:
+        # Workers write their samples here so /metrics on any of them covers all.
+        os.environ["PROMETHEUS_MULTIPROC_DIR"] = tempfile.mkdtemp(prefix="prometheus-")
+
+    config = uvicorn.Config(
+        "main:app",
+        host=host,
+        port=port,
+        workers=workers,
+        loop=loop,
+        http=http,
+        timeout_graceful_shutdown=settings.WEB_GRACEFUL_TIMEOUT_SECONDS,
+    )
+    logger.info("Starting %s server workers on %s:%s (loop=%s, http=%s)", workers, host, port, loop, http)
+    # Supervised even with one worker, so a recycled worker is always replaced.
+    Multiprocess(config, target=uvicorn.Server(config).run, sockets=[config.bind_socket()]).run()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the API with one server process per CPU (or --workers).")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=settings.PORT)
+    parser.add_argument("--workers", type=int, default=settings.WEB_WORKERS or os.cpu_count() or 1, help="server processes")
+    args = parser.parse_args()
+
+    run_server(args.host, args.port, args.workers)
@@ -0,0 +1,53 @@
+import os
+import uuid
+
+import pytest
+
+from benchmarks._common import prepare_environment
+
+# Settings are read at import time, so the environment and a throwaway
+# working directory (fresh sqlite file, blob store) come before any app import.
+prepare_environment()
+os.environ.setdefault("PASSWORD_HASH_ROUNDS", "4")
+
+@pytest.fixture(scope="session")
+def client():
+    """The API behind a TestClient; a POST returns once its background execution has finished"""
+    from fastapi.testclient import TestClient
+
+    import main
+
+    with TestClient(main.app) as test_client:
+        yield test_client
+
+@pytest.fixture
+def auth_headers(client):
+    email = f"{uuid.uuid4().hex}@example.com"
+    client.post("/auth/signup", json={"email": email, "password": "pw"})
+    token = client.post("/auth/token", data={"username": email, "password": "pw"}).json()["access_token"]
+    return {"Authorization": f"Bearer {token}"}
+
+@pytest.fixture
+def stub_model(client):
+    """Answers Gemini prompts with the local echo model; `calls` counts upstream calls"""
+    from app.external_services.stub_model import StubGenerativeModel
+    from app.utils.app_utils import get_app
+
+    gemini_client = get_app().gemini_client
+    original, gemini_client.model = gemini_client.model, StubGenerativeModel(latency_ms=1)
+    yield gemini_client.model
+    gemini_client.model = original
+
+@pytest.fixture
+def fresh_sessions(tmp_path):
+    """A session factory on an empty database of its own, for code that must not see other tests' rows"""
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+
+    from app.models import models  # noqa: F401  (registers the tables)
+    from app.utils.database import Base
+
+    engine = create_engine(f"sqlite:///{tmp_path / 'isolated.db'}", connect_args={"check_same_thread": False, "timeout": 30})
+    Base.metadata.create_all(bind=engine)
+    yield sessionmaker(bind=engine, autocommit=False, autoflush=False)
+    engine.dispose()
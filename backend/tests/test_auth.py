@@ -0,0 +1,19 @@
+from sqlalchemy import update
+
+from app.models import models
+from app.utils.auth import invalidate_principal
+from app.utils.database import SessionLocal
+
+def test_deactivation_is_not_overridden_by_the_token_claim(client):
+    client.post("/auth/signup", json={"email": "leaver@example.com", "password": "pw"})
+    token = client.post("/auth/token", data={"username": "leaver@example.com", "password": "pw"}).json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+    assert client.get("/workflow/", headers=headers).status_code == 200
+
+    with SessionLocal() as db:
+        db.execute(update(models.User).where(models.User.email == "leaver@example.com").values(is_active=False))
+        db.commit()
+    invalidate_principal("leaver@example.com")
+
+    response = client.get("/workflow/", headers=headers)
+    assert response.status_code == 401 and response.json()["detail"] == "Inactive user"
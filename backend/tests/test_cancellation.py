@@ -0,0 +1,112 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from app.config import settings
+from app.models.models import ExecutionStatus
+from app.utils.app_utils import get_app
+from app.utils.database import AsyncSessionLocal
+
+def _workflow(llm_data: dict) -> dict:
+    return {
+        "name": "cancellation",
+        "nodes": [
+            {"id": "in", "type": "text_input", "data": {"text": "hello"}},
+            {"id": "llm", "type": "gemini_prompt", "data": llm_data},
+            {"id": "out", "type": "output", "data": {}},
+        ],
+        "edges": [{"id": "e1", "source": "in", "target": "llm"}, {"id": "e2", "source": "llm", "target": "out"}],
+    }
+
+def _pending_execution(client, headers, llm_data: dict = None):
+    """A workflow and a PENDING execution of it that nothing runs yet"""
+    workflow_id = client.post("/workflow/", json=_workflow(llm_data or {}), headers=headers).json()["id"]
+
+    async def create():
+        async with AsyncSessionLocal() as db:
+            return (await get_app().execution_handler.create_execution_entry(db, workflow_id)).id
+
+    return workflow_id, asyncio.run(create())
+
+def _run(mode: str, workflow_id: int, execution_id: int, while_running=None):
+    """Runs the execution the way the background runner does, calling `while_running` alongside it"""
+    handler = get_app().execution_handler
+    if mode == "thread":
+        runner = threading.Thread(target=handler.run_workflow, args=(workflow_id, execution_id))
+        runner.start()
+        if while_running:
+            while_running()
+        runner.join(timeout=10)
+        return
+
+    async def scenario():
+        task = asyncio.create_task(handler.arun_workflow(workflow_id, execution_id))
+        if while_running:
+            await asyncio.to_thread(while_running)
+        await asyncio.wait_for(task, timeout=10)
+
+    asyncio.run(scenario())
+
+def _wait_until_running(execution_id: int):
+    while execution_id not in get_app().execution_handler.cancellations._scopes:
+        time.sleep(0.01)
+    # Let the run reach the slow node.
+    time.sleep(0.2)
+
+def _status(client, headers, execution_id: int) -> dict:
+    return client.get(f"/execution/{execution_id}", headers=headers).json()
+
+def test_cancel_endpoint(client, auth_headers):
+    _, execution_id = _pending_execution(client, auth_headers)
+    other = client.post("/auth/signup", json={"email": "stranger@example.com", "password": "pw"})
+    assert other.status_code == 200
+    token = client.post("/auth/token", data={"username": "stranger@example.com", "password": "pw"}).json()["access_token"]
+    assert client.post(f"/execution/{execution_id}/cancel", headers={"Authorization": f"Bearer {token}"}).status_code == 404
+
+    response = client.post(f"/execution/{execution_id}/cancel", headers=auth_headers)
+    assert response.status_code == 200 and response.json()["previous_status"] == "PENDING"
+    assert _status(client, auth_headers, execution_id)["status"] == "CANCELLED"
+    assert client.post(f"/execution/{execution_id}/cancel", headers=auth_headers).status_code == 409
+
+@pytest.mark.parametrize("mode", ["thread", "async"])
+def test_cancelling_a_running_execution_stops_it(mode, client, auth_headers, stub_model):
+    stub_model.latency_ms = 5000
+    workflow_id, execution_id = _pending_execution(client, auth_headers)
+
+    def cancel():
+        _wait_until_running(execution_id)
+        assert client.post(f"/execution/{execution_id}/cancel", headers=auth_headers).status_code == 200
+
+    start = time.monotonic()
+    _run(mode, workflow_id, execution_id, cancel)
+    assert time.monotonic() - start < 4
+    details = _status(client, auth_headers, execution_id)
+    assert details["status"] == "CANCELLED"
+    assert stub_model.calls == 0 and "out" not in (details["node_timings"] or {})
+
+@pytest.mark.parametrize("mode", ["thread", "async"])
+def test_execution_deadline(mode, client, auth_headers, stub_model, monkeypatch):
+    monkeypatch.setattr(settings, "EXECUTION_TIMEOUT_SECONDS", 0.5)
+    stub_model.latency_ms = 5000
+    workflow_id, execution_id = _pending_execution(client, auth_headers)
+
+    start = time.monotonic()
+    _run(mode, workflow_id, execution_id)
+    assert time.monotonic() - start < 4
+    details = _status(client, auth_headers, execution_id)
+    assert details["status"] == ExecutionStatus.TIMED_OUT.value
+    assert "0.5s deadline" in details["results"]["error"]
+
+@pytest.mark.parametrize("mode", ["thread", "async"])
+def test_node_deadline(mode, client, auth_headers, stub_model):
+    stub_model.latency_ms = 5000
+    workflow_id, execution_id = _pending_execution(client, auth_headers, {"timeout_seconds": 0.3})
+
+    start = time.monotonic()
+    _run(mode, workflow_id, execution_id)
+    assert time.monotonic() - start < 4
+    details = _status(client, auth_headers, execution_id)
+    assert details["status"] == ExecutionStatus.TIMED_OUT.value
+    assert "Node llm exceeded its 0.3s deadline" in details["results"]["error"]
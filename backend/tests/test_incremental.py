@@ -0,0 +1,65 @@
+def _workflow(text: str) -> dict:
+    return {
+        "name": "incremental",
+        "nodes": [
+            {"id": "in", "type": "text_input", "data": {"text": text}},
+            {"id": "llm", "type": "gemini_prompt", "data": {}},
+            {"id": "upper", "type": "text_transform", "data": {"operation": "upper"}},
+            {"id": "out", "type": "output", "data": {}},
+        ],
+        "edges": [
+            {"id": "e1", "source": "in", "target": "llm"},
+            {"id": "e2", "source": "llm", "target": "upper"},
+            {"id": "e3", "source": "upper", "target": "out"},
+        ],
+    }
+
+def _run(client, headers, workflow_id: int, query: str = "") -> dict:
+    response = client.post(f"/execution/workflow/{workflow_id}{query}", headers=headers)
+    assert response.status_code == 200, response.json()
+    return client.get(f"/execution/{response.json()['execution_id']}", headers=headers).json()
+
+def test_rerun_after_an_edit_does_not_poison_later_runs(client, auth_headers, stub_model):
+    workflow_id = client.post("/workflow/", json=_workflow("hello"), headers=auth_headers).json()["id"]
+    _run(client, auth_headers, workflow_id)
+    client.put(f"/workflow/{workflow_id}", json=_workflow("world"), headers=auth_headers)
+
+    rerun = _run(client, auth_headers, workflow_id, "?rerun_from=llm")
+    # Upstream of the rerun node comes from the parent, as it was.
+    assert rerun["results"]["in"] == "hello" and rerun["results"]["llm"] == "echo: hello"
+
+    plain = _run(client, auth_headers, workflow_id)
+    assert plain["status"] == "COMPLETED"
+    assert plain["results"]["in"] == "world"
+    assert plain["results"]["out"] == "ECHO: WORLD"
+
+def test_default_rerun_base_skips_batch_items(client, auth_headers, stub_model):
+    workflow_id = client.post("/workflow/", json=_workflow("hello"), headers=auth_headers).json()["id"]
+    first = _run(client, auth_headers, workflow_id)
+    batch = client.post(f"/execution/workflow/{workflow_id}/batch", json={"items": ["zzz"]}, headers=auth_headers)
+    assert batch.status_code == 200 and '"COMPLETED"' in batch.text
+
+    rerun = _run(client, auth_headers, workflow_id, "?rerun_from=llm")
+    assert rerun["parent_execution_id"] == first["id"]
+    assert rerun["results"]["in"] == "hello"
+
+    plain = _run(client, auth_headers, workflow_id)
+    assert plain["results"]["in"] == "hello" and plain["results"]["out"] == "ECHO: HELLO"
+
+def test_plain_rerun_samples_the_model_again_by_default(client, auth_headers, stub_model):
+    workflow_id = client.post("/workflow/", json=_workflow("hello"), headers=auth_headers).json()["id"]
+    _run(client, auth_headers, workflow_id)
+    calls = stub_model.calls
+    again = _run(client, auth_headers, workflow_id)
+    assert stub_model.calls == calls + 1
+    assert again["node_timings"]["in"]["status"] == "reused"
+    assert again["node_timings"]["llm"]["status"] == "completed"
+
+    opted_in = _workflow("hello")
+    opted_in["nodes"][1]["data"] = {"cache": True}
+    client.put(f"/workflow/{workflow_id}", json=opted_in, headers=auth_headers)
+    _run(client, auth_headers, workflow_id)
+    calls = stub_model.calls
+    reused = _run(client, auth_headers, workflow_id)
+    assert stub_model.calls == calls
+    assert reused["node_timings"]["llm"]["status"] == "reused"
@@ -0,0 +1,79 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.engine import job_queue
+from app.engine.job_queue import ExecutionQueue
+from app.models import models
+from app.models.models import ExecutionStatus
+
+@pytest.fixture
+def sessions(monkeypatch, fresh_sessions):
+    """Rows left by other tests must not be claimed"""
+    monkeypatch.setattr(job_queue, "SessionLocal", fresh_sessions)
+    return fresh_sessions
+
+def _add(sessions, *rows: dict):
+    with sessions() as db:
+        executions = [models.Execution(workflow_id=1, updated_at=datetime.utcnow(), **row) for row in rows]
+        db.add_all(executions)
+        db.commit()
+        return [execution.id for execution in executions]
+
+def _get(sessions, execution_id: int) -> models.Execution:
+    with sessions() as db:
+        return db.get(models.Execution, execution_id)
+
+def test_claim_takes_pending_rows_oldest_first(sessions):
+    first, second, third = _add(sessions, *[{"status": ExecutionStatus.PENDING}] * 3)
+    _add(sessions, {"status": ExecutionStatus.COMPLETED})
+    queue = ExecutionQueue()
+
+    assert queue.claim("w1", 2) == [(first, 1), (second, 1)]
+    assert queue.claim("w2", 5) == [(third, 1)]
+    assert queue.claim("w2", 5) == []
+
+    claimed = _get(sessions, first)
+    assert claimed.status == ExecutionStatus.RUNNING
+    assert claimed.claimed_by == "w1" and claimed.attempts == 1 and claimed.heartbeat_at is not None
+
+def test_concurrent_workers_never_share_a_row(sessions):
+    ids = _add(sessions, *[{"status": ExecutionStatus.PENDING}] * 20)
+    queue = ExecutionQueue()
+
+    def drain(worker_id: str):
+        mine = []
+        while batch := queue.claim(worker_id, 2):
+            mine.extend(execution_id for execution_id, _ in batch)
+        return mine
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        claims = list(pool.map(drain, [f"w{index}" for index in range(4)]))
+    everything = [execution_id for mine in claims for execution_id in mine]
+    assert sorted(everything) == ids
+
+def test_recover_stale_requeues_or_gives_up(sessions):
+    old = datetime.utcnow() - timedelta(minutes=10)
+    running = {"status": ExecutionStatus.RUNNING, "claimed_by": "dead"}
+    requeued, exhausted, fresh, unleased = _add(
+        sessions,
+        {**running, "heartbeat_at": old, "attempts": 1},
+        {**running, "heartbeat_at": old, "attempts": 3},
+        {**running, "heartbeat_at": old, "attempts": 1},
+        {"status": ExecutionStatus.RUNNING, "attempts": 0},
+    )
+    with sessions() as db:
+        db.get(models.Execution, unleased).updated_at = old
+        db.commit()
+    queue = ExecutionQueue()
+    queue.heartbeat("dead", [fresh])
+
+    assert queue.recover_stale(lease_seconds=60, max_attempts=3) == 3
+
+    back = _get(sessions, requeued)
+    assert back.status == ExecutionStatus.PENDING and back.claimed_by is None and back.heartbeat_at is None
+    given_up = _get(sessions, exhausted)
+    assert given_up.status == ExecutionStatus.FAILED and "3 attempts" in given_up.results["error"]
+    assert _get(sessions, fresh).status == ExecutionStatus.RUNNING
+    assert _get(sessions, unleased).status == ExecutionStatus.PENDING
@@ -0,0 +1,35 @@
+import time
+
+from app.engine.node_pool import NodePool
+
+def test_abandoned_node_does_not_starve_the_pool():
+    pool = NodePool(workers=1)
+    try:
+        stuck = pool.submit(time.sleep, 30)
+        time.sleep(0.5)  # let the worker pick it up
+        retired = pool._executor
+        processes = list(retired._processes.values())
+        pool.abandon(stuck)
+
+        assert pool.submit(pow, 2, 10).result(timeout=10) == 1024
+        assert pool._executor is not retired
+        for process in processes:
+            process.join(timeout=5)
+            assert not process.is_alive()
+    finally:
+        pool.close()
+
+def test_retired_pool_lets_other_nodes_finish():
+    pool = NodePool(workers=2)
+    try:
+        stuck = pool.submit(time.sleep, 30)
+        other = pool.submit(sum, [1, 2, 3])
+        assert other.result(timeout=10) == 6
+        busy = pool.submit(time.sleep, 1)
+        time.sleep(0.3)
+        retired = pool._executor
+        pool.abandon(stuck)
+        assert busy.result(timeout=10) is None
+        assert retired not in pool._running
+    finally:
+        pool.close()
@@ -0,0 +1,28 @@
+import asyncio
+
+import pytest
+
+from app.engine.nodes import CostClass, NodeSpec, node_registry
+from app.engine.plan import compile_workflow, validate_workflow_graph
+from app.utils.app_utils import get_app
+from app.utils.exceptions import InvalidNodeOutputError, InvalidWorkflowGraphError
+
+node_registry.register(NodeSpec("test_wrong_output", execute=lambda ctx, input_data: 42, output_type=str, cost=CostClass.INLINE))
+
+def test_output_is_checked_against_output_type():
+    handler = get_app().execution_handler
+    node = {"id": "n", "type": "test_wrong_output", "data": {}}
+    with pytest.raises(InvalidNodeOutputError):
+        handler.execute_node(node, None)
+    with pytest.raises(InvalidNodeOutputError):
+        asyncio.run(handler.aexecute_node(node, None))
+    assert handler.execute_node({"id": "t", "type": "text_input", "data": {"text": "hi"}}, None) == "hi"
+
+def test_unknown_node_types_are_rejected_on_save():
+    nodes = [{"id": "a", "type": "text_input", "data": {"text": "hi"}}, {"id": "b", "type": "no_such_type", "data": {}}]
+    edges = [{"id": "e", "source": "a", "target": "b"}]
+    with pytest.raises(InvalidWorkflowGraphError) as error:
+        validate_workflow_graph(nodes, edges)
+    assert "no_such_type" in error.value.detail
+    # Already stored workflows keep running; the unknown node passes its input through.
+    assert compile_workflow(nodes, edges).specs["b"] is None
@@ -0,0 +1,62 @@
+import asyncio
+import base64
+import json
+
+import pytest
+from sqlalchemy import text
+
+from app.models import models  # noqa: F401  (registers the tables)
+from app.utils.app_utils import get_app
+from app.utils.database import AsyncSessionLocal, Base, SessionLocal, engine
+from app.utils.exceptions import InvalidCursorError
+from app.utils.pagination import decode_cursor, encode_cursor
+
+def _legacy_executions(count: int):
+    """Inserts executions the way the old server_default=func.now() stored them: same second, no microseconds"""
+    Base.metadata.create_all(bind=engine)
+    with SessionLocal() as db:
+        db.execute(text("INSERT INTO users (email, hashed_password, is_active) VALUES ('pages@example.com', 'x', 1)"))
+        user_id = db.execute(text("SELECT id FROM users WHERE email = 'pages@example.com'")).scalar_one()
+        db.execute(text("INSERT INTO workflows (name, nodes, edges, owner_id, cache_enabled, version) VALUES ('w', '[]', '[]', :user_id, 1, 1)"), {"user_id": user_id})
+        workflow_id = db.execute(text("SELECT max(id) FROM workflows")).scalar_one()
+        for _ in range(count):
+            db.execute(text(
+                "INSERT INTO executions (workflow_id, status, results, created_at, updated_at, attempts) "
+                "VALUES (:workflow_id, 'COMPLETED', '{}', '2024-05-01 12:00:00', '2024-05-01 12:00:00', 0)"
+            ), {"workflow_id": workflow_id})
+        db.commit()
+    return user_id, workflow_id
+
+def _all_pages(user_id: int, workflow_id: int, limit: int, include_results: bool):
+    handler = get_app().execution_handler
+
+    async def collect():
+        pages, cursor = [], None
+        async with AsyncSessionLocal() as db:
+            while len(pages) <= 10:
+                items, cursor = await handler.get_executions_page(
+                    db, workflow_id, user_id, limit, cursor=cursor, include_results=include_results
+                )
+                pages.append([item.id for item in items])
+                if cursor is None:
+                    return pages
+        raise AssertionError(f"pagination did not terminate: {pages}")
+
+    return asyncio.run(collect())
+
+def test_pages_legacy_rows_without_microseconds_once_each():
+    user_id, workflow_id = _legacy_executions(5)
+    for include_results in (False, True):
+        pages = _all_pages(user_id, workflow_id, limit=2, include_results=include_results)
+        ids = [execution_id for page in pages for execution_id in page]
+        assert ids == sorted(ids, reverse=True)
+        assert len(ids) == len(set(ids)) == 5
+        assert [len(page) for page in pages] == [2, 2, 1]
+
+def test_cursor_round_trips_and_accepts_former_format():
+    assert decode_cursor(encode_cursor(42)) == 42
+    former = base64.urlsafe_b64encode(json.dumps(["2024-05-01T12:00:00", 7]).encode()).decode().rstrip("=")
+    assert decode_cursor(former) == 7
+    for garbage in ("", "not-a-cursor", base64.urlsafe_b64encode(b"{}").decode()):
+        with pytest.raises(InvalidCursorError):
+            decode_cursor(garbage)
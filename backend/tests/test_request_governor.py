@@ -0,0 +1,111 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from google.api_core import exceptions as google_exceptions
+
+from app.external_services.request_governor import CircuitBreaker, RequestGovernor
+from app.utils.exceptions import UpstreamUnavailableError
+
+def _open_governor() -> RequestGovernor:
+    governor = RequestGovernor(max_retries=0, breaker_threshold=1, breaker_reset_seconds=0.05)
+
+    def unavailable():
+        raise google_exceptions.ServiceUnavailable("down")
+
+    try:
+        governor.call(unavailable)
+    except google_exceptions.ServiceUnavailable:
+        pass
+    assert governor.breaker.state == CircuitBreaker.OPEN
+    time.sleep(0.06)
+    return governor
+
+def test_cancelled_half_open_trial_releases_the_slot():
+    governor = _open_governor()
+
+    async def scenario():
+        started = asyncio.Event()
+
+        async def slow():
+            started.set()
+            await asyncio.sleep(10)
+
+        trial = asyncio.create_task(governor.acall(slow))
+        await started.wait()
+        assert governor.breaker.state == CircuitBreaker.HALF_OPEN
+        trial.cancel()
+        try:
+            await trial
+        except asyncio.CancelledError:
+            pass
+
+        async def ok():
+            return "ok"
+
+        return await governor.acall(ok)
+
+    assert asyncio.run(scenario()) == "ok"
+    assert governor.breaker.state == CircuitBreaker.CLOSED
+
+def test_sync_waits_do_not_outlive_the_deadline():
+    governor = RequestGovernor(requests_per_minute=6, max_retries=3, backoff_base_seconds=5, breaker_threshold=0)
+    governor.requests.tokens = 0
+    start = time.monotonic()
+    try:
+        governor.call(lambda: "ok", deadline=start + 1)
+    except TimeoutError:
+        pass
+    else:
+        raise AssertionError("a 10s quota wait should not fit a 1s deadline")
+    assert governor.calls == 0
+
+    attempts = []
+
+    def flaky():
+        attempts.append(time.monotonic())
+        raise google_exceptions.ServiceUnavailable("down")
+
+    governor = RequestGovernor(max_retries=3, backoff_base_seconds=5, backoff_max_seconds=5, breaker_threshold=0)
+    governor._backoff = lambda attempt: 5.0
+    try:
+        governor.call(flaky, deadline=time.monotonic() + 1)
+    except google_exceptions.ServiceUnavailable:
+        pass
+    assert len(attempts) == 1 and governor.retries == 0
+    assert time.monotonic() - start < 1
+
+def test_failed_half_open_trial_raises_the_upstream_error_without_retrying():
+    governor = _open_governor()
+    governor.max_retries = 3
+    governor._backoff = lambda attempt: 5.0
+    attempts = []
+
+    def unavailable():
+        attempts.append(time.monotonic())
+        raise google_exceptions.ServiceUnavailable("still down")
+
+    start = time.monotonic()
+    with pytest.raises(google_exceptions.ServiceUnavailable):
+        governor.call(unavailable)
+    assert len(attempts) == 1 and governor.retries == 0
+    assert time.monotonic() - start < 1
+    assert governor.breaker.state == CircuitBreaker.OPEN
+    with pytest.raises(UpstreamUnavailableError):
+        governor.call(unavailable)
+
+def test_counters_are_exact_under_concurrent_calls():
+    governor = RequestGovernor(requests_per_minute=10**9, max_in_flight=64, breaker_threshold=0)
+
+    def hammer():
+        for _ in range(500):
+            governor.call(lambda: "ok")
+
+    threads = [threading.Thread(target=hammer) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert governor.stats()["calls"] == 4000
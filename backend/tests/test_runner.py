@@ -0,0 +1,99 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from app.engine.graph import WorkflowGraph
+from app.engine.runner import arun_graph, run_graph
+
+# a fans out to b (slow) and c (fast), which join in d; edges are declared b first.
+DIAMOND = WorkflowGraph(
+    [{"id": node_id} for node_id in "abcd"],
+    [
+        {"source": "a", "target": "b"},
+        {"source": "a", "target": "c"},
+        {"source": "b", "target": "d"},
+        {"source": "c", "target": "d"},
+    ],
+)
+DELAYS = {"b": 0.3, "c": 0.1}
+
+def _run(mode: str, graph: WorkflowGraph, behaviour, max_concurrency: int = 4, **kwargs):
+    """Runs `graph` with `behaviour(node_id, input)` as every node's body, on threads or the event loop"""
+    if mode == "thread":
+        return run_graph(graph, lambda node, node_input: behaviour(node["id"], node_input), max_concurrency, **kwargs)
+
+    async def execute(node, node_input):
+        return await asyncio.to_thread(behaviour, node["id"], node_input)
+
+    return asyncio.run(arun_graph(graph, execute, max_concurrency, **kwargs))
+
+def _echo(node_id, node_input):
+    time.sleep(DELAYS.get(node_id, 0))
+    return node_id.upper() if node_input is None else f"{node_input}>{node_id}"
+
+@pytest.mark.parametrize("mode", ["thread", "async"])
+def test_branches_run_concurrently_and_join_in_edge_order(mode):
+    start = time.monotonic()
+    results = _run(mode, DIAMOND, _echo)
+    elapsed = time.monotonic() - start
+
+    assert results["b"] == "A>b" and results["c"] == "A>c"
+    # c finished first, but the join follows the order the edges were declared in.
+    assert results["d"] == "A>b\n\nA>c>d"
+    assert elapsed < sum(DELAYS.values())
+
+@pytest.mark.parametrize("mode", ["thread", "async"])
+def test_join_of_non_strings_is_a_list(mode):
+    results = _run(mode, DIAMOND, lambda node_id, node_input: node_input if node_id == "d" else [node_id])
+    assert results["d"] == [["b"], ["c"]]
+
+@pytest.mark.parametrize("mode", ["thread", "async"])
+def test_completed_nodes_are_not_executed(mode):
+    executed = []
+
+    def record(node_id, node_input):
+        executed.append(node_id)
+        return _echo(node_id, node_input)
+
+    results = _run(mode, DIAMOND, record, completed={"a": "A", "b": "stored"})
+    assert sorted(executed) == ["c", "d"]
+    assert results["d"] == "stored\n\nA>c>d"
+
+@pytest.mark.parametrize("mode", ["thread", "async"])
+def test_failure_propagates_and_stops_downstream(mode):
+    executed = []
+
+    def fail_in_c(node_id, node_input):
+        executed.append(node_id)
+        if node_id == "c":
+            raise ValueError("c broke")
+        return _echo(node_id, node_input)
+
+    with pytest.raises(ValueError, match="c broke"):
+        _run(mode, DIAMOND, fail_in_c)
+    assert "d" not in executed
+
+def test_unthrottled_nodes_do_not_take_a_slot():
+    fan_out = WorkflowGraph(
+        [{"id": "root"}] + [{"id": f"leaf{index}"} for index in range(4)],
+        [{"source": "root", "target": f"leaf{index}"} for index in range(4)],
+    )
+    active = 0
+    peak = 0
+    lock = threading.Lock()
+
+    def track(node_id, node_input):
+        nonlocal active, peak
+        with lock:
+            active += 1
+            peak = max(peak, active)
+        time.sleep(0.1)
+        with lock:
+            active -= 1
+
+    _run("async", fan_out, track, max_concurrency=1)
+    assert peak == 1
+    _run("async", fan_out, track, max_concurrency=1, throttled=lambda node_id: False)
+    assert peak == 4
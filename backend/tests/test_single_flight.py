@@ -0,0 +1,120 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from app.external_services.single_flight import SingleFlight
+
+def _in_threads(count: int, target):
+    outcomes = [None] * count
+
+    def run(index):
+        try:
+            outcomes[index] = target()
+        except Exception as e:
+            outcomes[index] = e
+
+    threads = [threading.Thread(target=run, args=(index,)) for index in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return outcomes
+
+def test_concurrent_calls_share_one_execution():
+    flight = SingleFlight()
+    calls = []
+
+    def slow():
+        calls.append(1)
+        time.sleep(0.2)
+        return "answer"
+
+    outcomes = _in_threads(5, lambda: flight.do("key", slow))
+    assert len(calls) == 1
+    assert sorted(outcomes) == [("answer", False)] + [("answer", True)] * 4
+    assert flight.stats() == {"leaders": 1, "shared": 4}
+    # Nothing is kept once the call is over.
+    flight.do("key", slow)
+    assert len(calls) == 2
+
+def test_leader_error_reaches_every_follower():
+    flight = SingleFlight()
+
+    def broken():
+        time.sleep(0.2)
+        raise ValueError("upstream broke")
+
+    outcomes = _in_threads(3, lambda: flight.do("key", broken))
+    assert all(isinstance(outcome, ValueError) for outcome in outcomes)
+    assert flight.do("key", lambda: "recovered") == ("recovered", False)
+
+def test_async_calls_share_one_task_and_its_error():
+    flight = SingleFlight()
+    calls = []
+
+    async def slow():
+        calls.append(1)
+        await asyncio.sleep(0.1)
+        return "answer"
+
+    async def broken():
+        await asyncio.sleep(0.1)
+        raise ValueError("upstream broke")
+
+    async def scenario():
+        shared = await asyncio.gather(*(flight.ado("key", slow) for _ in range(5)))
+        failed = await asyncio.gather(*(flight.ado("bad", broken) for _ in range(3)), return_exceptions=True)
+        return shared, failed
+
+    shared, failed = asyncio.run(scenario())
+    assert len(calls) == 1
+    assert sorted(shared) == [("answer", False)] + [("answer", True)] * 4
+    assert all(isinstance(outcome, ValueError) for outcome in failed)
+
+def test_async_call_survives_a_cancelled_waiter_until_the_last_leaves():
+    flight = SingleFlight()
+    started = []
+    cancelled = []
+
+    async def slow():
+        started.append(1)
+        try:
+            await asyncio.sleep(0.2)
+        except asyncio.CancelledError:
+            cancelled.append(1)
+            raise
+        return "answer"
+
+    async def scenario():
+        first = asyncio.create_task(flight.ado("key", slow))
+        second = asyncio.create_task(flight.ado("key", slow))
+        await asyncio.sleep(0.05)
+        first.cancel()
+        assert await second == ("answer", True)
+
+        lonely = asyncio.create_task(flight.ado("other", slow))
+        await asyncio.sleep(0.05)
+        lonely.cancel()
+        await asyncio.gather(lonely, return_exceptions=True)
+        await asyncio.sleep(0)
+
+    asyncio.run(scenario())
+    assert len(started) == 2 and len(cancelled) == 1
+
+def test_follower_wait_is_bounded_by_its_own_timeout():
+    flight = SingleFlight()
+    release = threading.Event()
+    leader = threading.Thread(target=flight.do, args=("key", lambda: release.wait(10) and "late"))
+    leader.start()
+    time.sleep(0.05)
+
+    start = time.monotonic()
+    with pytest.raises(TimeoutError):
+        flight.do("key", lambda: "unused", timeout=0.2)
+    assert time.monotonic() - start < 1
+
+    release.set()
+    leader.join()
+    assert flight.do("key", lambda: "fresh") == ("fresh", False)
@@ -0,0 +1,26 @@
+import asyncio
+
+from sqlalchemy import select
+
+from app.models import models, schemas
+from app.utils.app_utils import get_app
+from app.utils.database import AsyncSessionLocal
+
+def _graph(text: str) -> schemas.WorkflowCreate:
+    return schemas.WorkflowCreate(name="versions", nodes=[{"id": "in", "type": "text_input", "data": {"text": text}}], edges=[])
+
+def test_concurrent_saves_get_distinct_versions(client, auth_headers):
+    created = client.post("/workflow/", json=_graph("v1").model_dump(), headers=auth_headers).json()
+    workflow_id, user_id = created["id"], created["owner_id"]
+    handler = get_app().workflow_handler
+
+    async def scenario():
+        async with AsyncSessionLocal() as stale, AsyncSessionLocal() as other:
+            # `stale` has read version 1 before the other save lands.
+            loaded = await stale.scalar(select(models.Workflow).where(models.Workflow.id == workflow_id))
+            first = await handler.update_workflow(other, workflow_id, user_id, _graph("a"))
+            second = await handler.update_workflow(stale, workflow_id, user_id, _graph("b"))
+            assert loaded is second
+            return first.version, second.version
+
+    assert asyncio.run(scenario()) == (2, 3)
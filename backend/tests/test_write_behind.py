@@ -0,0 +1,72 @@
+import threading
+from datetime import datetime
+
+import pytest
+
+from app.models import models
+from app.models.models import ExecutionStatus
+from app.utils import write_behind
+from app.utils.write_behind import ExecutionStatusWriter
+
+@pytest.fixture
+def sessions(monkeypatch, fresh_sessions):
+    monkeypatch.setattr(write_behind, "SessionLocal", fresh_sessions)
+    return fresh_sessions
+
+def _add(sessions, status: ExecutionStatus, count: int = 1):
+    with sessions() as db:
+        executions = [models.Execution(workflow_id=1, status=status, updated_at=datetime.utcnow()) for _ in range(count)]
+        db.add_all(executions)
+        db.commit()
+        return [execution.id for execution in executions]
+
+def _get(sessions, execution_id: int) -> models.Execution:
+    with sessions() as db:
+        return db.get(models.Execution, execution_id)
+
+def test_later_updates_in_a_batch_win_and_keep_results(sessions):
+    (execution_id,) = _add(sessions, ExecutionStatus.PENDING)
+    writer = ExecutionStatusWriter(flush_interval_ms=10, max_batch=10)
+    now = datetime.utcnow()
+    writer._flush([
+        (execution_id, ExecutionStatus.RUNNING, None, None, None, now),
+        (execution_id, ExecutionStatus.COMPLETED, {"out": "done"}, {"out": {"status": "completed"}}, {"out": "f"}, now),
+    ])
+
+    row = _get(sessions, execution_id)
+    assert row.status == ExecutionStatus.COMPLETED
+    assert row.results == {"out": "done"} and row.fingerprints == {"out": "f"}
+    assert (writer.batches, writer.updates) == (1, 2)
+
+def test_flush_never_overwrites_a_cancellation(sessions):
+    cancelled, running = _add(sessions, ExecutionStatus.CANCELLED), _add(sessions, ExecutionStatus.RUNNING)
+    writer = ExecutionStatusWriter(flush_interval_ms=10, max_batch=10)
+    now = datetime.utcnow()
+    writer._flush([
+        (cancelled[0], ExecutionStatus.COMPLETED, {"out": "late"}, {}, {}, now),
+        (running[0], ExecutionStatus.COMPLETED, {"out": "done"}, {}, {}, now),
+    ])
+
+    assert _get(sessions, cancelled[0]).status == ExecutionStatus.CANCELLED
+    assert _get(sessions, cancelled[0]).results != {"out": "late"}
+    assert _get(sessions, running[0]).status == ExecutionStatus.COMPLETED
+
+def test_close_flushes_updates_from_many_threads_in_batches(sessions):
+    ids = _add(sessions, ExecutionStatus.RUNNING, count=200)
+    writer = ExecutionStatusWriter(flush_interval_ms=50, max_batch=500)
+
+    def finish(chunk):
+        for execution_id in chunk:
+            writer.submit(execution_id, ExecutionStatus.COMPLETED, {"id": execution_id}, {}, {})
+
+    threads = [threading.Thread(target=finish, args=(ids[index::4],)) for index in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    writer.close()
+
+    assert writer.updates == 200 and writer.batches < 200
+    for execution_id in ids:
+        row = _get(sessions, execution_id)
+        assert row.status == ExecutionStatus.COMPLETED and row.results == {"id": execution_id}
@@ -0,0 +1,60 @@
+import argparse
+import asyncio
+import multiprocessing
+import signal
+
+from app import create_app
+from app.config import settings
+from app.engine.worker import ExecutionWorker
+from app.utils.database import async_engine
+from app.utils.logger import logger
+
+def run_worker(concurrency: int, poll_interval: float):
+    """Runs one worker process until SIGINT/SIGTERM, then drains its running executions"""
+    app = create_app()
+    worker = ExecutionWorker(concurrency=concurrency, poll_interval=poll_interval)
+
+    async def main():
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(sig, worker.stop)
+        try:
+            await worker.run()
+        finally:
+            app.execution_handler.close()
+            await async_engine.dispose()
+
+    asyncio.run(main())
+
+def run_workers(processes: int, concurrency: int, poll_interval: float):
+    if processes <= 1:
+        run_worker(concurrency, poll_interval)
+        return
+
+    children = [
+        multiprocessing.Process(target=run_worker, args=(concurrency, poll_interval), name=f"execution-worker-{index}")
+        for index in range(processes)
+    ]
+    for child in children:
+        child.start()
+
+    def forward(signum, _frame):
+        for child in children:
+            if child.is_alive():
+                child.terminate()
+
+    signal.signal(signal.SIGINT, forward)
+    signal.signal(signal.SIGTERM, forward)
+
+    for child in children:
+        child.join()
+    logger.info("All execution workers exited")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run execution workers that consume the database job queue (EXECUTION_BACKEND=queue).")
+    parser.add_argument("--processes", type=int, default=1, help="number of worker processes")
+    parser.add_argument("--concurrency", type=int, default=settings.WORKER_CONCURRENCY, help="executions in flight per process")
+    parser.add_argument("--poll-interval", type=float, default=settings.WORKER_POLL_INTERVAL_SECONDS, help="seconds between polls when the queue is empty")
+    args = parser.parse_args()
+
+    run_workers(args.processes, args.concurrency, args.poll_interval)
@@ -1,5 +1,5 @@
 import { api } from '../../../lib/api';
-import type { Workflow, WorkflowCreate, Execution, WorkflowNode, WorkflowEdge } from '../../../types';
+import type { Workflow, WorkflowCreate, Execution, ExecutionPage, WorkflowNode, WorkflowEdge } from '../../../types';
 
 export const getWorkflows = (): Promise<Workflow[]> => {
     return api('/workflow/');
@@ -32,8 +32,9 @@ export const executeWorkflow = (workflowId: number): Promise<{ message: string;
     });
 };
 
-export const getWorkflowExecutions = (workflowId: number): Promise<Execution[]> => {
-    return api(`/execution/workflow/${workflowId}`);
+export const getWorkflowExecutions = (workflowId: number, cursor?: string): Promise<ExecutionPage> => {
+    const query = cursor ? `?cursor=${encodeURIComponent(cursor)}` : '';
+    return api(`/execution/workflow/${workflowId}${query}`);
 };
 
 export const getExecutionDetails = (executionId: number): Promise<Execution> => {
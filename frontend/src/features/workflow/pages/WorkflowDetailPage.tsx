@@ -212,7 +212,7 @@ export const WorkflowDetailPage = () => {
                     clearPolling();
                     setIsExecuting(false);
                     showError('Workflow executed successfully!', 'success');
-                } else if (details.status === 'FAILED') {
+                } else if (details.status === 'FAILED' || details.status === 'CANCELLED' || details.status === 'TIMED_OUT') {
                     setNodes((nds) => 
                         nds.map((node) => {
                             const error = details.results?.error;
@@ -229,7 +229,10 @@ export const WorkflowDetailPage = () => {
                     );
                     clearPolling();
                     setIsExecuting(false);
-                    showError('Workflow execution failed.', 'error');
+                    showError(
+                        details.status === 'FAILED' ? 'Workflow execution failed.' : `Workflow execution ${details.status === 'CANCELLED' ? 'was cancelled' : 'timed out'}.`,
+                        'error'
+                    );
                 } else if (details.status === 'RUNNING') {
                     setNodes((nds) => 
                         nds.map((node) => {
@@ -21,7 +21,7 @@ export interface Workflow {
 
 export type WorkflowCreate = Omit<Workflow, 'id' | 'owner_id'>;
 
-export type ExecutionStatus = 'PENDING' | 'RUNNING' | 'COMPLETED' | 'FAILED';
+export type ExecutionStatus = 'PENDING' | 'RUNNING' | 'COMPLETED' | 'FAILED' | 'CANCELLED' | 'TIMED_OUT';
 
 export interface Execution {
     id: number;
@@ -31,6 +31,19 @@ export interface Execution {
     created_at: string;
 }
 
+export interface ExecutionSummary {
+    id: number;
+    workflow_id: number;
+    status: ExecutionStatus;
+    created_at: string;
+    updated_at: string | null;
+}
+
+export interface ExecutionPage {
+    items: ExecutionSummary[];
+    next_cursor: string | null;
+}
+
 export interface LoginCredentials {
     email: string;
     password: string;